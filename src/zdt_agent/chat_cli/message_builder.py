@@ -22,6 +22,7 @@ class TurnMessageBuilder:
             persona_prompt_path=self.state.persona_prompt_path,
             preset_segments_enabled=self.state.preset_segments_enabled,
             preset_segment_order=self.state.preset_segment_order,
+            recent_messages=self.state.conversation_history,
         )
         print_lorebook_injections(preset_result.injected_entries_with_order)
 
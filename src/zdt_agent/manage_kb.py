@@ -11,9 +11,24 @@ from pathlib import Path
 from typing import List, Optional
 
 from .paths import runtime_root
-from .utils.ekb import EKBConfig, EmbeddingKnowledgeBase
+from .utils.ekb import QUERY_SETTING_KEYS, EKBConfig, EmbeddingKnowledgeBase
+from .utils.ekb_catalog import list_summaries, read_summary
+from .utils.ekb_snapshot import export_snapshot, import_snapshot
+from .utils.ekb_tune import RERANK_PRESETS, apply_best, load_query_set, parse_weights, tune
 from .utils.regex_pattern_filter import FilterOrder
 
+# Build settings persisted in config.json that change what the index contains.
+_TRACKED_BUILD_KEYS = (
+    "chunk_size",
+    "chunk_overlap",
+    "embedding_model",
+    "processor_profile",
+    "json_record_path",
+    "dedup",
+    "dedup_threshold",
+    "shards",
+)
+
 
 def _vector_db_root() -> Path:
     return runtime_root() / "data" / "vector_db"
@@ -24,6 +39,17 @@ def parse_list_arg(arg: Optional[str]) -> Optional[List[str]]:
     return [item.strip() for item in arg.split(",")] if arg else None
 
 
+def _saved_settings(name: str) -> dict:
+    """Build and search settings recorded in config.json (e.g. by ``tune``), so ``update`` does not reset them."""
+    config_file = _vector_db_root() / name / "config.json"
+    try:
+        with open(config_file, "r", encoding="utf-8") as f:
+            saved_config = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {key: saved_config[key] for key in _TRACKED_BUILD_KEYS + QUERY_SETTING_KEYS if key in saved_config}
+
+
 def load_config_from_json(name: str) -> EKBConfig:
     """Load EKBConfig from saved JSON configuration file based on database name"""
     config_file = _vector_db_root() / name / "config.json"
@@ -46,6 +72,7 @@ def load_config_from_json(name: str) -> EKBConfig:
             include_patterns=saved_config.get("include_patterns"),
             filter_order=FilterOrder(saved_config.get("filter_order", "exclude_first")),
             use_gitignore=saved_config.get("use_gitignore", True),
+            **{key: saved_config[key] for key in _TRACKED_BUILD_KEYS + QUERY_SETTING_KEYS if key in saved_config},
         )
 
     except Exception as e:
@@ -56,6 +83,12 @@ def load_config_from_json(name: str) -> EKBConfig:
 
 def create_kb_config(args) -> EKBConfig:
     """Create EKBConfig from command line arguments"""
+    # Omitted build flags keep the saved value instead of the EKBConfig default, which would force a rebuild
+    settings = _saved_settings(args.name)
+    for key in _TRACKED_BUILD_KEYS:
+        value = getattr(args, key, None)
+        if value is not None:
+            settings[key] = value
     return EKBConfig(
         name=args.name,
         source_paths=parse_list_arg(args.source_paths),
@@ -63,6 +96,7 @@ def create_kb_config(args) -> EKBConfig:
         include_patterns=parse_list_arg(args.include),
         filter_order=FilterOrder(args.filter_order) if args.filter_order else FilterOrder.EXCLUDE_FIRST,
         use_gitignore=not getattr(args, "no_gitignore", False),
+        **settings,
     )
 
 
@@ -80,6 +114,12 @@ def cmd_update(args) -> int:
             print(f"📄 Processed {result['total_files_processed']} files")
             print(f"📝 Updated {len(result['updated_files'])} files")
             print(f"🔄 Created {result['new_documents_count']} document chunks")
+            if "dedup" in result:
+                dedup = result["dedup"]
+                print(
+                    f"♻️  Deduplicated {dedup['exact_duplicates']} exact / {dedup['near_duplicates']} near chunks "
+                    f"({dedup['chars_saved']} chars, ~{dedup['estimated_seconds_saved']}s embedding saved)"
+                )
             return 0
         else:
             print(f"❌ {result['message']}")
@@ -97,7 +137,14 @@ def cmd_search(args) -> int:
         config = load_config_from_json(args.name)
         kb = EmbeddingKnowledgeBase(config)
 
-        results = kb.search(args.query, k=args.limit)
+        filters = {
+            field: value
+            for field in ("file_type", "tags", "categories", "source_root")
+            if (value := getattr(args, field, None))
+        }
+        results = kb.search(args.query, k=args.limit, filters=filters, explain=args.explain)
+        if args.explain:
+            _print_search_metrics(kb.last_search_metrics or {})
 
         if not results:
             print(f"🔍 No results found for '{args.query}' in '{args.name}'")
@@ -112,6 +159,8 @@ def cmd_search(args) -> int:
 
             print(f"**{i}. {metadata.get('title', 'Untitled')}**")
             print(f"📁 Source: {metadata.get('source', 'Unknown')}")
+            if result.get("alternate_sources"):
+                print(f"📎 Also in: {', '.join(result['alternate_sources'])}")
 
             if metadata.get("tags"):
                 print(f"🏷️  Tags: {metadata.get('tags')}")
@@ -119,6 +168,9 @@ def cmd_search(args) -> int:
                 print(f"👤 Author: {metadata.get('author')}")
 
             print(f"📊 Relevance: {score:.3f}")
+            if args.explain:
+                parts = ", ".join(f"{name} {value:.3f}" for name, value in result["explain"].items())
+                print(f"🧮 Score: distance {result['score']:.4f} → {parts}")
             print(f"📄 Content:\n{content[:500]}{'...' if len(content) > 500 else ''}\n")
             print("─" * 60)
 
@@ -129,6 +181,17 @@ def cmd_search(args) -> int:
         return 1
 
 
+def _print_search_metrics(report: dict) -> None:
+    """Print the per-stage breakdown of one search"""
+    print(f"⏱️  Search took {report.get('total_seconds', 0) * 1000:.1f} ms:")
+    for stage, seconds in report.get("stages", {}).items():
+        print(f"   {stage:<16} {seconds * 1000:8.1f} ms")
+    counters = ", ".join(f"{name}={value}" for name, value in report.get("counters", {}).items())
+    if counters:
+        print(f"   {counters}")
+    print()
+
+
 def cmd_add(args) -> int:
     """Add text content to knowledge base"""
     try:
@@ -168,14 +231,9 @@ def cmd_add(args) -> int:
 def cmd_status(args) -> int:
     """Show knowledge base statistics"""
     try:
-        # Load configuration from saved JSON file
-        config = load_config_from_json(args.name)
-        kb = EmbeddingKnowledgeBase(config)
-
-        stats = kb.get_stats()
-
-        if "error" in stats:
-            print(f"❌ Error getting stats: {stats['error']}")
+        stats = read_summary(_vector_db_root() / args.name)
+        if stats is None:
+            print(f"❌ No saved configuration found for '{args.name}'")
             return 1
 
         print(f"📊 Knowledge Base '{args.name}' Status:")
@@ -201,45 +259,121 @@ def cmd_status(args) -> int:
 def cmd_list(args) -> int:
     """List all knowledge bases"""
     try:
-        data_dir = _vector_db_root()
-        if not data_dir.exists():
+        summaries = list_summaries(_vector_db_root())
+        if not summaries:
             print("📝 No knowledge bases found")
             return 0
 
-        kb_dirs = [d for d in data_dir.iterdir() if d.is_dir()]
+        print(f"📚 Found {len(summaries)} knowledge base(s):\n")
 
-        if not kb_dirs:
-            print("📝 No knowledge bases found")
-            return 0
+        for stats in summaries:
+            name = stats["name"]
+            if "error" in stats:
+                print(f"**{name}** (⚠️  {stats['error']})\n")
+                continue
 
-        print(f"📚 Found {len(kb_dirs)} knowledge base(s):\n")
+            print(f"**{name}**")
+            print(f"  📄 Documents: {stats.get('total_documents', 0)}")
+            print(f"  📁 Files: {stats.get('total_files', 0)}")
 
-        for kb_dir in sorted(kb_dirs):
-            name = kb_dir.name
-            try:
-                # Load configuration from saved JSON file
-                config = load_config_from_json(name)
-                kb = EmbeddingKnowledgeBase(config)
-                stats = kb.get_stats()
+            if stats.get("source_paths"):
+                print(f"  📂 Sources: {', '.join(stats['source_paths'])}")
+            if stats.get("last_updated"):
+                print(f"  🕒 Updated: {stats['last_updated']}")
 
-                print(f"**{name}**")
-                print(f"  📄 Documents: {stats.get('total_documents', 0)}")
-                print(f"  📁 Files: {stats.get('total_files', 0)}")
+            print()
 
-                if stats.get("source_paths"):
-                    print(f"  📂 Sources: {', '.join(stats['source_paths'])}")
-                if stats.get("last_updated"):
-                    print(f"  🕒 Updated: {stats['last_updated']}")
+        return 0
+
+    except Exception as e:
+        print(f"❌ List operation failed: {e}")
+        return 1
 
-                print()
 
-            except Exception as e:
-                print(f"**{name}** (⚠️  Error: {e})\n")
+def cmd_export(args) -> int:
+    """Write a knowledge base snapshot archive"""
+    try:
+        config = load_config_from_json(args.name)
+        kb = EmbeddingKnowledgeBase(config)
+        manifest = export_snapshot(kb, Path(args.archive))
 
+        print(f"✅ Exported '{args.name}' to {args.archive}")
+        print(f"🔄 {manifest['records']} chunks, {manifest['dimension']}-d vectors ({manifest['embedding_model']})")
         return 0
 
     except Exception as e:
-        print(f"❌ List operation failed: {e}")
+        print(f"❌ Export failed: {e}")
+        return 1
+
+
+def cmd_import(args) -> int:
+    """Load a snapshot archive without re-embedding"""
+    try:
+        result = import_snapshot(Path(args.archive), _vector_db_root(), name=args.name, db_type=args.db_type)
+
+        print(f"✅ Imported {args.archive} as '{result['name']}' (generation {result['generation']})")
+        print(f"🔄 {result['records']} chunks, {result['dimension']}-d vectors ({result['embedding_model']})")
+        return 0
+
+    except Exception as e:
+        print(f"❌ Import failed: {e}")
+        return 1
+
+
+def _parse_int_list(arg: str) -> List[int]:
+    return [int(item) for item in arg.split(",") if item.strip()]
+
+
+def cmd_tune(args) -> int:
+    """Sweep chunking and search settings against a labelled query set"""
+    try:
+        config = load_config_from_json(args.name)
+        kb = EmbeddingKnowledgeBase(config)
+        queries = load_query_set(Path(args.queries))
+        weights = {spec: parse_weights(spec) for spec in args.weights or ["default"]}
+
+        report = tune(
+            kb,
+            queries,
+            chunk_sizes=_parse_int_list(args.chunk_sizes) if args.chunk_sizes else [config.chunk_size],
+            chunk_overlaps=_parse_int_list(args.chunk_overlaps) if args.chunk_overlaps else [config.chunk_overlap],
+            search_ks=_parse_int_list(args.search_ks) if args.search_ks else [config.search_k],
+            weights=weights,
+            k=args.k,
+            sample_files=args.sample_files,
+            seed=args.seed,
+        )
+
+        print(f"🎯 {report['queries']} queries on {report['sample_files']} sampled files, recall@{report['k']}:")
+        print(
+            f"{'chunk':>6} {'overlap':>7} {'search_k':>8} {'weights':>12} {'recall':>7} {'chunks':>7} {'MB':>7} {'p95 ms':>8}"
+        )
+        for trial in report["trials"]:
+            print(
+                f"{trial['chunk_size']:>6} {trial['chunk_overlap']:>7} {trial['search_k']:>8} "
+                f"{trial['rerank_weights'][:12]:>12} {trial['recall_at_k']:>7.3f} {trial['index_chunks']:>7} "
+                f"{trial['index_bytes'] / 1e6:>7.2f} {trial['p95_latency_ms']:>8.1f}"
+            )
+        best = report["best"]
+        print(
+            f"🏆 Best: chunk_size={best['chunk_size']}, chunk_overlap={best['chunk_overlap']}, "
+            f"search_k={best['search_k']}, rerank_weights={best['rerank_preset']}"
+        )
+        if args.output:
+            Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+            print(f"📄 Report written to {args.output}")
+        if args.dry_run:
+            return 0
+
+        result = apply_best(config, best, parse_list_arg(args.patterns), embeddings=kb.embeddings)
+        if not result["success"]:
+            print(f"❌ {result['message']}")
+            return 1
+        print(f"✅ Saved to config.json{' and rebuilt the index' if result['rebuilt'] else ''}")
+        return 0
+
+    except Exception as e:
+        print(f"❌ Tune failed: {e}")
         return 1
 
 
@@ -255,6 +389,9 @@ Examples:
   %(prog)s add my_kb "Some content|More content" -t "Title 1|Title 2"
   %(prog)s status -n my_kb
   %(prog)s list
+  %(prog)s export my_kb.zip -n my_kb
+  %(prog)s import my_kb.zip -n my_kb
+  %(prog)s tune queries.jsonl -n my_kb --chunk-sizes 500,1000,2000 --weights default vector
         """,
     )
 
@@ -264,13 +401,41 @@ Examples:
     update_parser = subparsers.add_parser("update", help="Create or update knowledge base")
     update_parser.add_argument("-n", "--name", default="default", help="Knowledge base name")
     update_parser.add_argument("-s", "--source-paths", help="Comma-separated source paths")
-    update_parser.add_argument("-p", "--patterns", help="Comma-separated file patterns (e.g., *.md,*.txt)")
+    update_parser.add_argument("-p", "--patterns", help="Comma-separated file patterns (e.g., *.md,*.txt,*.jsonl)")
     update_parser.add_argument("-e", "--exclude", help="Comma-separated exclude patterns")
     update_parser.add_argument("-i", "--include", help="Comma-separated include patterns")
     update_parser.add_argument(
         "--filter-order", choices=["exclude_first", "include_first"], help="Filter application order"
     )
     update_parser.add_argument("--no-gitignore", action="store_true", help="Disable .gitignore filtering")
+    update_parser.add_argument("--chunk-size", type=int, help="Maximum characters per chunk")
+    update_parser.add_argument("--chunk-overlap", type=int, help="Characters shared between adjacent chunks")
+    update_parser.add_argument("--embedding-model", help="Embedding model name")
+    update_parser.add_argument(
+        "--processor-profile",
+        choices=["minimal", "standard", "rich"],
+        help="How much per-file metadata to extract (default: standard)",
+    )
+    update_parser.add_argument(
+        "--json-record-path",
+        help="Index each element of this JSON array (e.g. '$.items') as a separate document",
+    )
+    update_parser.add_argument(
+        "--dedup",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Store exact and near-duplicate chunks only once (default: off)",
+    )
+    update_parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        help="Estimated Jaccard similarity at which chunks count as near duplicates (default: 0.9)",
+    )
+    update_parser.add_argument(
+        "--shards",
+        type=int,
+        help="Hash-partition chunks across this many vector store instances (default: 1)",
+    )
     update_parser.set_defaults(func=cmd_update)
 
     # Search command
@@ -278,6 +443,13 @@ Examples:
     search_parser.add_argument("query", help="Search query")
     search_parser.add_argument("-n", "--name", default="default", help="Knowledge base name")
     search_parser.add_argument("-l", "--limit", type=int, default=5, help="Result limit")
+    search_parser.add_argument("--file-type", help="Comma-separated file extensions to search (e.g. md,py)")
+    search_parser.add_argument("--tags", help="Comma-separated tags; chunks need at least one")
+    search_parser.add_argument("--categories", help="Comma-separated categories; chunks need at least one")
+    search_parser.add_argument("--source-root", help="Comma-separated source paths to search within")
+    search_parser.add_argument(
+        "--explain", action="store_true", help="Show per-stage timings and how each score was composed"
+    )
     search_parser.set_defaults(func=cmd_search)
 
     # Add command
@@ -297,6 +469,40 @@ Examples:
     list_parser = subparsers.add_parser("list", help="List all knowledge bases")
     list_parser.set_defaults(func=cmd_list)
 
+    # Export command
+    export_parser = subparsers.add_parser("export", help="Export a knowledge base to a snapshot archive")
+    export_parser.add_argument("archive", help="Path of the archive to write")
+    export_parser.add_argument("-n", "--name", default="default", help="Knowledge base name")
+    export_parser.set_defaults(func=cmd_export)
+
+    # Import command
+    import_parser = subparsers.add_parser("import", help="Import a snapshot archive without re-embedding")
+    import_parser.add_argument("archive", help="Path of the archive to read")
+    import_parser.add_argument("-n", "--name", help="Knowledge base name (default: the name stored in the archive)")
+    import_parser.add_argument("--db-type", default="chroma", help="Vector database backend to load into")
+    import_parser.set_defaults(func=cmd_import)
+
+    # Tune command
+    tune_parser = subparsers.add_parser("tune", help="Sweep chunking and search settings on a labelled query set")
+    tune_parser.add_argument("queries", help='JSON/JSONL file of {"query": ..., "relevant": [sources]} objects')
+    tune_parser.add_argument("-n", "--name", default="default", help="Knowledge base name")
+    tune_parser.add_argument("--chunk-sizes", help="Comma-separated chunk sizes to try (default: current)")
+    tune_parser.add_argument("--chunk-overlaps", help="Comma-separated chunk overlaps to try (default: current)")
+    tune_parser.add_argument("--search-ks", help="Comma-separated candidate counts to try (default: current)")
+    tune_parser.add_argument(
+        "--weights",
+        nargs="+",
+        help=f"Rerank weightings to try: {', '.join(RERANK_PRESETS)} or 'vector,keyword,title,metadata' "
+        "(default: default)",
+    )
+    tune_parser.add_argument("-k", type=int, default=5, help="Results per query scored for recall@k")
+    tune_parser.add_argument("--sample-files", type=int, default=200, help="Files copied into each trial index")
+    tune_parser.add_argument("--seed", type=int, default=0, help="Seed for the corpus sample")
+    tune_parser.add_argument("-p", "--patterns", help="File patterns for the rebuild when chunking changes")
+    tune_parser.add_argument("-o", "--output", help="Write the full JSON report here")
+    tune_parser.add_argument("--dry-run", action="store_true", help="Report only; leave config.json unchanged")
+    tune_parser.set_defaults(func=cmd_tune)
+
     return parser
 
 
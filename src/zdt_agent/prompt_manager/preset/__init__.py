@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from langchain_core.messages import BaseMessage
+
 from ...paths import prompts_dir
 from ..utils.logger import LoreBookEventLogger
 from .builder import PresetBuilder, PresetBuildResult
@@ -40,6 +42,8 @@ def build_preset_result(
     persona_prompt_path: str | None = None,
     preset_segments_enabled: dict[str, bool] | None = None,
     preset_segment_order: list[str] | None = None,
+    recent_messages: list[BaseMessage] | None = None,
+    scan_depth: int | None = None,
 ) -> PresetBuildResult:
     # _DEFAULT_ENGINE_MANAGER is read from this module's namespace at call time,
     # so tests can monkeypatch it on `prompt_manager.preset`.
@@ -54,6 +58,8 @@ def build_preset_result(
         preset_segments_enabled=preset_segments_enabled,
         preset_segment_order=preset_segment_order,
         engine_manager=_DEFAULT_ENGINE_MANAGER,
+        recent_messages=recent_messages,
+        scan_depth=scan_depth,
     )
 
 
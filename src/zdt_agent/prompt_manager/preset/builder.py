@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass
 from uuid import uuid4
 
 from langchain_core.messages import BaseMessage
 
 from ..runtime import MultiLoreBookRuntimeEngine, RuntimeContext
-from ..types import SourceScope
+from ..types import ScanMessage, SourceScope
 from ..utils.logger import LoreBookEventLogger
 from .config import PresetSegmentConfig
 from .engine_manager import LoreBookEngineManager
@@ -22,6 +23,22 @@ class PresetBuildResult:
     injected_entries_with_order: list[tuple[str, int | None, int | None]]
 
 
+def scan_window(messages: list[BaseMessage], depth: int) -> list[ScanMessage]:
+    """The last *depth* messages as scan inputs.
+
+    Messages without an id (e.g. locally created ones) are keyed by a digest
+    of their type and text, so every distinct message keeps a stable key.
+    """
+    window: list[ScanMessage] = []
+    for message in messages[-depth:] if depth > 0 else []:
+        text = message.text
+        if not text:
+            continue
+        key = message.id or hashlib.sha1(f"{message.type}\0{text}".encode("utf-8")).hexdigest()
+        window.append(ScanMessage(id=key, text=text))
+    return window
+
+
 class PresetBuilder:
     """Runs lorebook runtime and merges injections with base preset segments."""
 
@@ -51,7 +68,15 @@ class PresetBuilder:
         preset_segments_enabled: dict[str, bool] | None = None,
         preset_segment_order: list[str] | None = None,
         engine_manager: LoreBookEngineManager | None = None,
+        recent_messages: list[BaseMessage] | None = None,
+        scan_depth: int | None = None,
     ) -> PresetBuildResult:
+        """Build the preset messages for one turn.
+
+        Besides *user_input*, lorebook triggers are matched against the last
+        *scan_depth* of *recent_messages* (default ``DEFAULT_SCAN_DEPTH``).
+        """
+        depth = self._segment_config.DEFAULT_SCAN_DEPTH if scan_depth is None else scan_depth
         runtime_context = RuntimeContext(
             request_id=str(uuid4()),
             session_id=thread_id,
@@ -60,6 +85,7 @@ class PresetBuilder:
             tags=tags or set(self._segment_config.DEFAULT_TAGS),
             active_sources={SourceScope.GLOBAL},
             turn_index=turn_index,
+            recent_messages=scan_window(recent_messages or [], depth),
         )
         selected_lorebook_ids = self._injection.normalize_lorebook_ids(lorebook_ids)
         manager = engine_manager or self._engine_manager
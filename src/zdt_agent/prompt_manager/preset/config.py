@@ -40,6 +40,8 @@ class PresetSegmentConfig:
     """Static layout for core / character / persona / depth preset segments."""
 
     DEFAULT_TAGS: ClassVar[frozenset[str]] = frozenset({"coding", "python"})
+    #: Earlier conversation messages scanned for lorebook triggers besides the current input.
+    DEFAULT_SCAN_DEPTH: ClassVar[int] = 4
     all_ids: ClassVar[tuple[PresetSegmentId, ...]] = tuple(PresetSegmentId)
     default_segments_enabled: ClassVar[dict[str, bool]] = {
         sid.value: enabled for sid, enabled in zip(PresetSegmentId, _DEFAULT_ENABLED, strict=True)
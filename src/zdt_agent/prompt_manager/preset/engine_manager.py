@@ -1,47 +1,103 @@
 from __future__ import annotations
 
+import json
 from pathlib import Path
+from typing import Any
 
 from ..runtime import LoreBookRuntimeEngine
+from ..runtime.state_store import LoreBookStateStore
 from ..utils.builder import build_lorebook
-from ..utils.loader import load_lorebook
+from ..utils.compiled import COMPILED_FILE, compile_lorebook, missing_embeddings, read_compiled, write_compiled
+from ..utils.tokenizer import DEFAULT_TOKENIZER, get_tokenizer
+
+# (file name, mtime_ns, size) for every source a lorebook was built from
+SourceFingerprint = tuple[tuple[str, int, int], ...]
+
+
+def source_fingerprint(paths: list[Path]) -> SourceFingerprint:
+    """Cheap change detector: one ``stat`` per file, no reads."""
+    fingerprint = []
+    for path in paths:
+        stat = path.stat()
+        fingerprint.append((path.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
 
 
 class LoreBookEngineManager:
-    """Caches lorebook runtime engines per lorebook id under a root directory."""
+    """Caches lorebook runtime engines per lorebook id under a root directory.
+
+    An engine is rebuilt only when the fingerprint of its sources (``entries/*.md``,
+    or ``lorebook.json`` when there are none) changes; sticky and cooldown state
+    carries over to the rebuilt engine.  Each build is also compiled to
+    ``lorebook.compiled.json``, so a new process whose sources and build
+    parameters (``tokenizer``, ``embedding_model``) are unchanged skips the
+    build and the trigger index construction.  A build whose embedding model
+    could not be loaded is not compiled, so semantic triggers recover once the
+    model is available.  With a ``state_store`` sticky
+    and cooldown timers are also persisted to SQLite.
+    """
 
-    def __init__(self, lorebook_root: Path) -> None:
+    def __init__(
+        self,
+        lorebook_root: Path,
+        state_store: LoreBookStateStore | None = None,
+        tokenizer: str = DEFAULT_TOKENIZER,
+        embedding_model: str | None = None,
+    ) -> None:
         self._lorebook_root = lorebook_root
+        self._state_store = state_store
+        self._tokenizer = tokenizer
+        self._embedding_model = embedding_model
         self._engines: dict[str, LoreBookRuntimeEngine] = {}
+        self._fingerprints: dict[str, SourceFingerprint] = {}
 
     def clear(self) -> None:
         self._engines.clear()
+        self._fingerprints.clear()
 
     def get_engine(self, lorebook_id: str) -> LoreBookRuntimeEngine:
         lorebook_source = self._lorebook_root / lorebook_id
         lorebook_output = lorebook_source / "lorebook.json"
         entries_dir = lorebook_source / "entries"
-        has_md_sources = entries_dir.is_dir() and any(entries_dir.glob("*.md"))
+        md_sources = sorted(entries_dir.glob("*.md")) if entries_dir.is_dir() else []
 
-        if has_md_sources:
-            self._engines.pop(lorebook_id, None)
-            build_lorebook(source=lorebook_source, output=lorebook_output)
-            lorebook = load_lorebook(lorebook_output)
-            engine = LoreBookRuntimeEngine(lorebook)
-            self._engines[lorebook_id] = engine
-            return engine
-
-        if not lorebook_output.exists():
+        if not md_sources and not lorebook_output.exists():
             raise FileNotFoundError(
                 f"Missing lorebook.json for {lorebook_id!r} under {self._lorebook_root} "
                 "(no entries/*.md sources to build from)."
             )
 
+        fingerprint = source_fingerprint(md_sources or [lorebook_output])
         cached = self._engines.get(lorebook_id)
-        if cached is not None:
+        if cached is not None and self._fingerprints.get(lorebook_id) == fingerprint:
             return cached
 
-        lorebook = load_lorebook(lorebook_output)
-        engine = LoreBookRuntimeEngine(lorebook)
+        compiled_path = lorebook_source / COMPILED_FILE
+        artifact_fingerprint: dict[str, Any] = {"sources": fingerprint}
+        if md_sources:
+            # The resolved spec, so an artifact built with the whitespace fallback is not reused once the tokenizer loads
+            artifact_fingerprint["tokenizer"] = get_tokenizer(self._tokenizer).spec
+            artifact_fingerprint["embedding_model"] = self._embedding_model
+        compiled = read_compiled(compiled_path, artifact_fingerprint)
+        # A build whose embedding model failed is not reused, so the next process retries the model
+        if compiled is not None and md_sources and missing_embeddings(compiled.data):
+            compiled = None
+        if compiled is None:
+            if md_sources:
+                data = build_lorebook(
+                    source=lorebook_source,
+                    output=lorebook_output,
+                    tokenizer=self._tokenizer,
+                    embedding_model=self._embedding_model,
+                )
+            else:
+                data = json.loads(lorebook_output.read_text(encoding="utf-8"))
+            compiled = compile_lorebook(data, artifact_fingerprint)
+            if not (md_sources and missing_embeddings(data)):
+                write_compiled(compiled_path, compiled)
+        engine = LoreBookRuntimeEngine(compiled.lorebook, compiled.trigger_index, self._state_store)
+        if cached is not None:
+            engine.session_state.carry_over(cached.session_state)
         self._engines[lorebook_id] = engine
+        self._fingerprints[lorebook_id] = fingerprint
         return engine
@@ -53,7 +53,7 @@ class LoreBookInjectionAssembler:
             engine = engine_by_lorebook_id.get(lorebook_id)
             if engine is None:
                 continue
-            entry = next((e for e in engine.lorebook.entries if e.id == entry_id), None)
+            entry = engine.get_entry(entry_id)
             if entry is None:
                 continue
             resolved.append(
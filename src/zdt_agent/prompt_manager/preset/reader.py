@@ -6,36 +6,55 @@ _DEFAULT_CHARACTER_PROMPT_PATHS = ["chars/main.md"]
 
 
 class PresetPromptReader:
-    """Loads preset markdown from the project tree."""
+    """Loads preset markdown from the project tree.
+
+    Contents are cached per file and re-read only when its mtime or size
+    changes, so an unchanged preset costs one ``stat`` per file and turn.
+    Unchanged files return the same ``str`` object, which lets callers
+    detect changes with a cheap comparison.
+    """
 
     def __init__(self, project_root: Path) -> None:
         self._root = project_root
+        self._cache: dict[Path, tuple[tuple[int, int], str]] = {}
+
+    def _read(self, candidate: Path) -> str:
+        """Cached contents of *candidate*; raises FileNotFoundError if it does not exist."""
+        stat = candidate.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self._cache.get(candidate)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        text = candidate.read_text(encoding="utf-8")
+        self._cache[candidate] = (stamp, text)
+        return text
 
     def read_text(self, relative_path: str) -> str:
-        candidate = self._root / relative_path
-        if not candidate.exists():
-            raise FileNotFoundError(f"Prompt file not found: {relative_path}")
-        return candidate.read_text(encoding="utf-8")
+        try:
+            return self._read(self._root / relative_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Prompt file not found: {relative_path}") from None
 
     def read_first_existing(self, relative_paths: list[str]) -> str:
         for path in relative_paths:
-            candidate = self._root / path
-            if candidate.exists():
-                return candidate.read_text(encoding="utf-8")
+            try:
+                return self._read(self._root / path)
+            except FileNotFoundError:
+                continue
         raise FileNotFoundError(f"None of the prompt files exist: {relative_paths}")
 
     def read_character_prompt(self, character_prompt_path: str | None) -> str:
         if character_prompt_path:
-            candidate = self._root / character_prompt_path
-            if not candidate.exists():
-                raise FileNotFoundError(f"Character prompt file not found: {character_prompt_path}")
-            return candidate.read_text(encoding="utf-8")
+            try:
+                return self._read(self._root / character_prompt_path)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Character prompt file not found: {character_prompt_path}") from None
         return self.read_first_existing(list(_DEFAULT_CHARACTER_PROMPT_PATHS))
 
     def read_persona_prompt(self, persona_prompt_path: str | None) -> str | None:
         if not persona_prompt_path:
             return None
-        candidate = self._root / persona_prompt_path
-        if not candidate.exists():
-            raise FileNotFoundError(f"Persona prompt file not found: {persona_prompt_path}")
-        return candidate.read_text(encoding="utf-8")
+        try:
+            return self._read(self._root / persona_prompt_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Persona prompt file not found: {persona_prompt_path}") from None
@@ -20,8 +20,18 @@ class _ResolvedPresetSegments:
     segment_messages: dict[str, list[BaseMessage]]
 
 
+# Prompt texts the segments were built from: core/role_play.md, core/ai-ok2.md, character, persona
+_SegmentTexts = tuple[str | None, str | None, str | None, str | None]
+
+
 class PresetSegmentAssembler:
-    """Builds preset segment message lists from ``PresetSegmentConfig`` layout."""
+    """Builds preset segment message lists from ``PresetSegmentConfig`` layout.
+
+    Prompt texts come from the reader's per-file cache, so an unchanged file
+    is never re-read.  Message objects are built fresh on every call: LangGraph's
+    ``add_messages`` assigns ids to them in place, so a message shared between
+    turns would replace its earlier copy in the thread instead of being appended.
+    """
 
     def __init__(self, config: type[PresetSegmentConfig], reader: PresetPromptReader) -> None:
         self._config = config
@@ -30,34 +40,47 @@ class PresetSegmentAssembler:
     def _segment_enabled(self, preset_segments_enabled: dict[str, bool], sid: PresetSegmentId) -> bool:
         return preset_segments_enabled.get(sid.value, self._config.default_segments_enabled[sid.value])
 
-    def build_segment_message_lists(
+    def _segment_texts(
         self,
         character_prompt_path: str | None,
         persona_prompt_path: str | None,
         preset_segments_enabled: dict[str, bool],
-    ) -> dict[str, list[BaseMessage]]:
+    ) -> _SegmentTexts:
+        core = self._segment_enabled(preset_segments_enabled, PresetSegmentId.CORE)
+        character = self._segment_enabled(preset_segments_enabled, PresetSegmentId.CHARACTER)
+        persona = self._segment_enabled(preset_segments_enabled, PresetSegmentId.PERSONA)
+        return (
+            # prompts/core/system.md and prompts/core/ai-ok1.md are currently not part of the core segment
+            self._reader.read_text("core/role_play.md") if core else None,
+            self._reader.read_text("core/ai-ok2.md") if core else None,
+            self._reader.read_character_prompt(character_prompt_path) if character else None,
+            self._reader.read_persona_prompt(persona_prompt_path) if persona else None,
+        )
+
+    def _build_segments(self, texts: _SegmentTexts) -> dict[str, list[BaseMessage]]:
+        role_play, ai_ok, character_text, persona_text = texts
         segments: dict[str, list[BaseMessage]] = {sid.value: [] for sid in self._config.all_ids}
 
-        if self._segment_enabled(preset_segments_enabled, PresetSegmentId.CORE):
-            segments[PresetSegmentId.CORE.value] = [
-                # SystemMessage(content=self._reader.read_text("prompts/core/system.md")),
-                # AIMessage(content=self._reader.read_first_existing(["prompts/core/ai-ok1.md"])),
-                HumanMessage(content=self._reader.read_text("core/role_play.md")),
-                AIMessage(content=self._reader.read_text("core/ai-ok2.md")),
-            ]
+        if role_play is not None and ai_ok is not None:
+            segments[PresetSegmentId.CORE.value] = [HumanMessage(content=role_play), AIMessage(content=ai_ok)]
 
-        if self._segment_enabled(preset_segments_enabled, PresetSegmentId.CHARACTER):
-            segments[PresetSegmentId.CHARACTER.value] = [
-                HumanMessage(content=self._reader.read_character_prompt(character_prompt_path))
-            ]
+        if character_text is not None:
+            segments[PresetSegmentId.CHARACTER.value] = [HumanMessage(content=character_text)]
 
-        if self._segment_enabled(preset_segments_enabled, PresetSegmentId.PERSONA):
-            persona_text = self._reader.read_persona_prompt(persona_prompt_path)
-            if persona_text is not None and persona_text.strip():
-                segments[PresetSegmentId.PERSONA.value] = [HumanMessage(content=persona_text)]
+        if persona_text is not None and persona_text.strip():
+            segments[PresetSegmentId.PERSONA.value] = [HumanMessage(content=persona_text)]
 
         return segments
 
+    def build_segment_message_lists(
+        self,
+        character_prompt_path: str | None,
+        persona_prompt_path: str | None,
+        preset_segments_enabled: dict[str, bool],
+    ) -> dict[str, list[BaseMessage]]:
+        texts = self._segment_texts(character_prompt_path, persona_prompt_path, preset_segments_enabled)
+        return self._build_segments(texts)
+
     def resolve_segments(
         self,
         character_prompt_path: str | None,
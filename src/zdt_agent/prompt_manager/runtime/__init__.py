@@ -1,6 +1,6 @@
 """LoreBook runtime pipeline: scan, match, filter, expand, sort, inject."""
 
-from ..types import RuntimeContext, RuntimeResult
+from ..types import RuntimeContext, RuntimeResult, ScanMessage
 from .engine import LoreBookRuntimeEngine
 from .orchestrator import MultiLoreBookRuntimeEngine
 
@@ -9,4 +9,5 @@ __all__ = [
     "MultiLoreBookRuntimeEngine",
     "RuntimeContext",
     "RuntimeResult",
+    "ScanMessage",
 ]
@@ -10,23 +10,31 @@ from .inject import LoreInjector
 from .match import LoreMatcher
 from .session_state import LoreBookSessionState
 from .sort import LoreSorter
+from .state_store import LoreBookStateStore
+from .trigger_index import TriggerIndex
 
 
 @dataclass(slots=True)
 class PreInjectResult:
     matched: list[LoreEntry]
     expanded: list[LoreEntry]
-    match_scores: dict[str, int]
+    match_scores: dict[str, float]
     dropped_reasons: dict[str, str]
     events: list[RuntimeEvent]
 
 
 class LoreBookRuntimeEngine:
-    def __init__(self, lorebook: LoreBook):
+    def __init__(
+        self,
+        lorebook: LoreBook,
+        trigger_index: TriggerIndex | None = None,
+        state_store: LoreBookStateStore | None = None,
+    ):
         self.lorebook = lorebook
-        self._state = LoreBookSessionState(lorebook)
+        self._entries_by_id = {entry.id: entry for entry in lorebook.entries}
+        self._state = LoreBookSessionState(lorebook, state_store)
         self._sink = RuntimeEventSink(lorebook)
-        self._matcher = LoreMatcher(lorebook, self._state, self._sink)
+        self._matcher = LoreMatcher(lorebook, self._state, self._sink, trigger_index)
         self._filter = LoreFilterStage(lorebook, self._state, self._sink)
         self._expander = LoreExpander(lorebook, self._matcher, self._filter, self._sink)
         self._sorter = LoreSorter(self._sink)
@@ -60,12 +68,19 @@ class LoreBookRuntimeEngine:
 
     # --- Narrow public API for cross-engine access (used by MultiLoreBookRuntimeEngine) ---
 
+    @property
+    def session_state(self) -> LoreBookSessionState:
+        return self._state
+
+    def get_entry(self, entry_id: str) -> LoreEntry | None:
+        return self._entries_by_id.get(entry_id)
+
     def sort_expanded(
         self,
         entries: list[LoreEntry],
         context: RuntimeContext,
         events: list[RuntimeEvent],
-        match_scores: dict[str, int],
+        match_scores: dict[str, float],
     ) -> list[LoreEntry]:
         return self._sorter.run_sort(entries, context, events, match_scores)
 
@@ -75,6 +90,9 @@ class LoreBookRuntimeEngine:
     def apply_after_injection(self, entry: LoreEntry, context: RuntimeContext) -> None:
         self._state.apply_after_injection(entry, context)
 
+    def persist_state(self, context: RuntimeContext) -> None:
+        self._state.persist(context)
+
     def emit_event(
         self,
         events: list[RuntimeEvent],
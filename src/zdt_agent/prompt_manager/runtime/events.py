@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-import datetime as dt
 import time
 from contextlib import contextmanager
 from typing import Generator
 
-from ..types import LoreBook, RuntimeContext, RuntimeEvent, Stage
+from ..types import LogLevel, LoreBook, RuntimeContext, RuntimeEvent, Stage
+
+# Per-entry funnel events, one per candidate and stage; recorded only at log_level debug.
+# Stage events and per-entry decisions (drops, expansion, injection) are kept at normal.
+_DEBUG_ONLY_ENTRY_EVENTS = {(Stage.MATCH, "matched"), (Stage.FILTER, "passed")}
 
 
 class RuntimeEventSink:
@@ -24,11 +27,14 @@ class RuntimeEventSink:
         reason: str,
         metrics: dict | None = None,
     ) -> None:
-        if self._lorebook.runtime.log_level == "off":
+        log_level = self._lorebook.runtime.log_level
+        if log_level == LogLevel.OFF:
+            return
+        if entry_id is not None and log_level != LogLevel.DEBUG and (stage, action) in _DEBUG_ONLY_ENTRY_EVENTS:
             return
         events.append(
             RuntimeEvent(
-                ts=dt.datetime.now(dt.UTC).isoformat(),
+                ts=time.monotonic(),
                 request_id=context.request_id,
                 session_id=context.session_id,
                 lorebook_id=self._lorebook.id,
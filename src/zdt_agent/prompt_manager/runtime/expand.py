@@ -9,7 +9,12 @@ from .match import LoreMatcher
 
 
 class LoreExpander:
-    """Expand stage: recursively match/filter new candidates from recursive entries."""
+    """Expand stage: recursively match/filter new candidates from recursive entries.
+
+    Which entries a recursive entry's content triggers is static, so it is
+    precomputed once per lorebook version as a graph; expansion walks that
+    graph and only the dynamic filter checks run per request.
+    """
 
     def __init__(
         self,
@@ -22,38 +27,32 @@ class LoreExpander:
         self._matcher = matcher
         self._filter = filter_stage
         self._sink = sink
+        self._graph = matcher.index.trigger_graph(lorebook.entries)
 
     def run_expand(
         self,
         filtered: list[LoreEntry],
         context: RuntimeContext,
         events: list[RuntimeEvent],
-        match_scores: dict[str, int],
+        match_scores: dict[str, float],
     ) -> list[LoreEntry]:
-        entry_map = {entry.id: entry for entry in self._lorebook.entries if entry.enabled}
         selected = {entry.id: entry for entry in filtered}
         # Queue keeps (entry, depth) where depth=1 is the first recursive expansion layer.
         queue: deque[tuple[LoreEntry, int]] = deque(
             (entry, 1) for entry in filtered if entry.resolved.advanced.recursive
         )
+        if not queue:
+            return filtered
+        # Nested scans also cover the active source texts. Entries hit by those alone already went
+        # through match/filter with this context, so they only contribute to the score here.
+        source_hits = self._matcher.source_hits(context)
         processed_steps = 0
 
         while queue and processed_steps < self._lorebook.runtime.max_recursion_steps:
             parent_entry, depth = queue.popleft()
             processed_steps += 1
-            nested_context = RuntimeContext(
-                request_id=context.request_id,
-                session_id=context.session_id,
-                role=context.role,
-                text=parent_entry.content,
-                source_texts=context.source_texts,
-                tags=context.tags,
-                active_sources=context.active_sources,
-                turn_index=context.turn_index,
-                seed=context.seed,
-            )
 
-            for candidate in entry_map.values():
+            for candidate, content_hits, hit_reason in self._graph.get(parent_entry.id, ()):
                 if candidate.id in selected:
                     continue
                 if (
@@ -61,22 +60,22 @@ class LoreExpander:
                     and depth > candidate.resolved.advanced.max_recursion_depth
                 ):
                     continue
-                score, hit = self._matcher.match_hit_score(candidate, nested_context, events)
-                if hit:
-                    reason = self._filter.filter_reason(candidate, nested_context)
-                    if reason is None:
-                        selected[candidate.id] = candidate
-                        match_scores[candidate.id] = score
-                        self._sink.event(
-                            events,
-                            context,
-                            candidate.id,
-                            Stage.EXPAND,
-                            "matched",
-                            "recursive_match",
-                            {"step": processed_steps, "depth": depth},
-                        )
-                        if candidate.resolved.advanced.recursive:
-                            queue.append((candidate, depth + 1))
+                score = content_hits + source_hits.get(candidate.id, (0, None))[0]
+                self._sink.event(events, context, candidate.id, Stage.MATCH, "matched", hit_reason)
+                reason = self._filter.filter_reason(candidate, context)
+                if reason is None:
+                    selected[candidate.id] = candidate
+                    match_scores[candidate.id] = score
+                    self._sink.event(
+                        events,
+                        context,
+                        candidate.id,
+                        Stage.EXPAND,
+                        "matched",
+                        "recursive_match",
+                        {"step": processed_steps, "depth": depth},
+                    )
+                    if candidate.resolved.advanced.recursive:
+                        queue.append((candidate, depth + 1))
 
         return list(selected.values())
@@ -13,7 +13,8 @@ class LoreInjector:
     def prepare_entry_body(self, entry: LoreEntry, context: RuntimeContext) -> tuple[str | None, int, bool]:
         """Return (body, token_count, truncated) or (None, raw_token_count, False) if dropped."""
         raw = entry.content
-        raw_tokens = token_count(raw)
+        tokens = entry.tokens
+        raw_tokens = tokens.count if tokens is not None else token_count(raw)
         max_tok = entry.resolved.budget.max_tokens
         truncate_mode = entry.resolved.budget.truncate
 
@@ -22,5 +23,14 @@ class LoreInjector:
         if truncate_mode == TruncateMode.NONE:
             return None, raw_tokens, False
 
-        clipped = clip_text_to_token_budget(raw, max_tok, truncate_mode)
-        return clipped, token_count(clipped), True
+        if tokens is None:
+            clipped = clip_text_to_token_budget(raw, max_tok, truncate_mode)
+            return clipped, token_count(clipped), True
+        # Build-time offsets: cut on a token boundary without re-tokenizing
+        if max_tok <= 0:
+            return "", 0, True
+        if truncate_mode == TruncateMode.HEAD:
+            clipped = raw[: tokens.offsets[max_tok]].rstrip()
+        else:
+            clipped = raw[tokens.offsets[tokens.count - max_tok] :].lstrip()
+        return clipped, max_tok, True
@@ -1,64 +1,97 @@
 from __future__ import annotations
 
-import re
+from collections import OrderedDict
 
 from ..types import LoreBook, LoreEntry, RuntimeContext, RuntimeEvent, Stage
+from ..utils.semantic import embed_query
 from .events import RuntimeEventSink
+from .semantic_index import SemanticIndex
 from .session_state import LoreBookSessionState
+from .trigger_index import TriggerIndex
+
+# Per-message scan results kept per engine; comfortably above any sensible scan depth
+_MESSAGE_CACHE_SIZE = 1024
 
 
 class LoreMatcher:
-    """Match stage: keyword/regex triggers and sticky entries."""
+    """Match stage: keyword/regex triggers (via a compiled TriggerIndex), semantic triggers and sticky entries."""
 
-    def __init__(self, lorebook: LoreBook, state: LoreBookSessionState, sink: RuntimeEventSink):
+    def __init__(
+        self,
+        lorebook: LoreBook,
+        state: LoreBookSessionState,
+        sink: RuntimeEventSink,
+        index: TriggerIndex | None = None,
+    ):
         self._lorebook = lorebook
         self._state = state
         self._sink = sink
+        # Built once per lorebook version (or loaded precompiled); the engine manager rebuilds
+        # engines when sources change
+        self._index = index if index is not None else TriggerIndex(lorebook.entries)
+        self._semantic = SemanticIndex(lorebook.entries)
+        self._last_scan: tuple[str, dict[str, tuple[int, str | None]]] | None = None
+        self._message_scans: OrderedDict[str, dict[str, tuple[int, str | None]]] = OrderedDict()
+
+    @property
+    def index(self) -> TriggerIndex:
+        return self._index
+
+    def _source_chunks(self, context: RuntimeContext) -> list[str]:
+        return [
+            source_text
+            for source_name, source_text in context.source_texts.items()
+            if source_name in context.active_sources and source_name in self._lorebook.source_scope
+        ]
 
     def combined_text(self, context: RuntimeContext) -> str:
         if not context.source_texts:
             return context.text
-        selected_chunks: list[str] = [context.text]
-        for source_name, source_text in context.source_texts.items():
-            if source_name in context.active_sources and source_name in self._lorebook.source_scope:
-                selected_chunks.append(source_text)
-        return "\n\n".join(selected_chunks)
-
-    def _score_and_reason(self, entry: LoreEntry, text: str, flags: int) -> tuple[int, str | None]:
-        """Single pass over all triggers; returns (total_hit_count, first_match_reason).
-
-        Returns (0, None) when no trigger fires.
-        """
-        triggers = entry.resolved.triggers
-        score = 0
-        first_reason: str | None = None
-
-        for keyword in triggers.keywords:
-            if triggers.whole_word:
-                hits = len(re.compile(rf"\b{re.escape(keyword)}\b", flags=flags).findall(text))
-            elif triggers.case_sensitive:
-                hits = text.count(keyword)
-            else:
-                hits = text.lower().count(keyword.lower())
-            if hits:
-                score += hits
-                first_reason = first_reason or "keyword_hit"
+        return "\n\n".join([context.text, *self._source_chunks(context)])
 
-        for regex_pattern in triggers.regex:
-            hits = len(re.findall(regex_pattern, text, flags=flags))
-            if hits:
-                score += hits
-                first_reason = first_reason or "regex_hit"
+    def source_hits(self, context: RuntimeContext) -> dict[str, tuple[int, str | None]]:
+        """Hit counts over the active source texts alone (without ``context.text``)."""
+        chunks = self._source_chunks(context)
+        return self._index.scan("\n\n".join(chunks)) if chunks else {}
 
-        return score, first_reason
+    def _scan(self, text: str) -> dict[str, tuple[int, str | None]]:
+        """Hit counts for every entry; repeated scans of the same text (recursive expansion) are reused."""
+        if self._last_scan is None or self._last_scan[0] != text:
+            self._last_scan = (text, self._index.scan(text))
+        return self._last_scan[1]
+
+    def _message_hits(self, context: RuntimeContext) -> dict[str, tuple[int, str | None]]:
+        """Hits of the current text plus the scan window; only messages not seen before are scanned."""
+        hits = self._scan(self.combined_text(context))
+        if not context.recent_messages:
+            return hits
+        merged = dict(hits)
+        for message in context.recent_messages:
+            message_hits = self._message_scans.get(message.id)
+            if message_hits is None:
+                message_hits = self._message_scans[message.id] = self._index.scan(message.text)
+                if len(self._message_scans) > _MESSAGE_CACHE_SIZE:
+                    self._message_scans.popitem(last=False)
+            else:
+                self._message_scans.move_to_end(message.id)
+            for entry_id, (score, reason) in message_hits.items():
+                previous_score, previous_reason = merged.get(entry_id, (0, None))
+                merged[entry_id] = (previous_score + score, previous_reason or reason)
+        return merged
+
+    def _semantic_hits(self, context: RuntimeContext) -> dict[str, float]:
+        """Similarity of the user input to each semantic entry over its threshold (input embedded once)."""
+        model = self._lorebook.embedding_model
+        if not self._semantic or model is None or not context.text.strip():
+            return {}
+        query = embed_query(model, context.text)
+        return self._semantic.scan(query) if query is not None else {}
 
     def _match_result_for_text(
         self, entry: LoreEntry, text: str, events: list[RuntimeEvent], context: RuntimeContext
     ) -> tuple[int, bool]:
         """Return (score, matched) given precomputed text; emit the matched event on a hit."""
-        triggers = entry.resolved.triggers
-        flags = 0 if triggers.case_sensitive else re.IGNORECASE
-        score, reason = self._score_and_reason(entry, text, flags)
+        score, reason = self._scan(text).get(entry.id, (0, None))
         if reason is not None:
             self._sink.event(events, context, entry.id, Stage.MATCH, "matched", reason)
             return score, True
@@ -76,22 +109,24 @@ class LoreMatcher:
         active_entries: list[LoreEntry],
         context: RuntimeContext,
         events: list[RuntimeEvent],
-    ) -> tuple[list[LoreEntry], dict[str, int]]:
-        # Compute combined text once for all entries in this run.
-        text = self.combined_text(context)
+    ) -> tuple[list[LoreEntry], dict[str, float]]:
+        # One scan of the combined text (plus cached scans of the window) scores every entry;
+        # semantic similarity adds to the keyword hit count.
+        hits = self._message_hits(context)
+        semantic = self._semantic_hits(context)
+        sticky = self._state.sticky_timers(context)
         matched: list[LoreEntry] = []
-        match_scores: dict[str, int] = {}
+        match_scores: dict[str, float] = {}
         for entry in active_entries:
-            if self._state.is_sticky_active(entry, context):
-                matched.append(entry)
-                self._sink.event(events, context, entry.id, Stage.MATCH, "matched", "sticky_active")
-                triggers = entry.resolved.triggers
-                flags = 0 if triggers.case_sensitive else re.IGNORECASE
-                score, _ = self._score_and_reason(entry, text, flags)
-                match_scores[entry.id] = score
-                continue
-            score, hit = self._match_result_for_text(entry, text, events, context)
-            if hit:
+            score, reason = hits.get(entry.id, (0, None))
+            similarity = semantic.get(entry.id)
+            if similarity is not None:
+                score += similarity
+                reason = reason or "semantic_hit"
+            if sticky.get(entry.id, -1) >= context.turn_index:
+                reason = "sticky_active"
+            if reason is not None:
                 matched.append(entry)
                 match_scores[entry.id] = score
+                self._sink.event(events, context, entry.id, Stage.MATCH, "matched", reason)
         return matched, match_scores
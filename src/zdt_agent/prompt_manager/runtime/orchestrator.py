@@ -127,6 +127,9 @@ class MultiLoreBookRuntimeEngine:
             on_success=on_success,
             on_drop=on_drop,
         )
+        # One state write per lorebook per turn, not one per injected entry
+        for engine in self._engines:
+            engine.persist_state(context)
 
         return RuntimeResult(
             injected_prompt="\n\n".join(injected_texts),
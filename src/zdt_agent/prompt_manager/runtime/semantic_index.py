@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import operator
+
+from ...utils.logger import get_logger
+from ..types import LoreEntry
+
+logger = get_logger(name=__name__)
+
+
+class SemanticIndex:
+    """Build-time entry embeddings of the enabled entries with a semantic trigger.
+
+    Vectors are unit length, so cosine similarity is a plain dot product;
+    ``scan`` scores every semantic entry against one query embedding in a
+    single pass.
+    """
+
+    def __init__(self, entries: list[LoreEntry]):
+        self._ids: list[str] = []
+        self._thresholds: list[float] = []
+        self._vectors: list[list[float]] = []
+        for entry in entries:
+            threshold = entry.resolved.triggers.semantic_threshold
+            if not entry.enabled or threshold is None:
+                continue
+            if entry.embedding is None:
+                logger.warning(f"Entry {entry.id!r} has a semantic trigger but no embedding; rebuild the lorebook")
+                continue
+            self._ids.append(entry.id)
+            self._thresholds.append(threshold)
+            self._vectors.append(entry.embedding)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def scan(self, query: list[float]) -> dict[str, float]:
+        """``entry_id -> cosine similarity`` for the entries at or above their threshold."""
+        mul = operator.mul
+        return {
+            entry_id: similarity
+            for entry_id, threshold, similarity in zip(
+                self._ids,
+                self._thresholds,
+                [sum(map(mul, vector, query)) for vector in self._vectors],
+            )
+            if similarity >= threshold
+        }
@@ -1,32 +1,124 @@
 from __future__ import annotations
 
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
 from ..types import LoreBook, LoreEntry, RuntimeContext
+from .state_store import COOLDOWN, STICKY, LoreBookStateStore
+
+DEFAULT_MAX_SESSIONS = 1000
+DEFAULT_SESSION_TTL = 6 * 3600.0
+
+
+@dataclass(slots=True)
+class _SessionTimers:
+    """Turn index until which each entry stays sticky / cooling down, for one session."""
+
+    sticky: dict[str, int] = field(default_factory=dict)
+    cooldown: dict[str, int] = field(default_factory=dict)
+    last_seen: float = 0.0
 
 
 class LoreBookSessionState:
-    """Per-engine sticky and cooldown maps keyed by (session_id, lorebook_id, entry_id)."""
+    """Per-engine sticky and cooldown timers, held per session in LRU order.
+
+    Sessions idle for longer than ``ttl_seconds``, or beyond the
+    ``max_sessions`` most recently used, are evicted, so memory tracks active
+    sessions only.  With a ``store`` an evicted session is reloaded from
+    SQLite the next time it is seen; without one its timers simply expire.
+    Timer changes are buffered until ``persist`` at the end of the turn, which
+    writes them in one transaction and drops the session's expired timers.
+    """
 
-    def __init__(self, lorebook: LoreBook):
+    def __init__(
+        self,
+        lorebook: LoreBook,
+        store: LoreBookStateStore | None = None,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        ttl_seconds: float = DEFAULT_SESSION_TTL,
+    ):
         self._lorebook = lorebook
-        self._sticky_state: dict[tuple[str, str, str], int] = {}
-        self._cooldown_state: dict[tuple[str, str, str], int] = {}
+        self._store = store
+        self._max_sessions = max_sessions
+        self._ttl_seconds = ttl_seconds
+        self._sessions: OrderedDict[str, _SessionTimers] = OrderedDict()
+        # session_id -> (entry_id, kind, until_turn) changes not yet written to the store
+        self._pending: dict[str, list[tuple[str, str, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _session(self, session_id: str) -> _SessionTimers:
+        now = time.monotonic()
+        timers = self._sessions.get(session_id)
+        if timers is None:
+            timers = _SessionTimers()
+            if self._store is not None:
+                saved = self._store.load(session_id, self._lorebook.id)
+                timers.sticky, timers.cooldown = saved[STICKY], saved[COOLDOWN]
+            self._sessions[session_id] = timers
+        else:
+            self._sessions.move_to_end(session_id)
+        timers.last_seen = now
+        self._evict(now)
+        return timers
+
+    def _evict(self, now: float) -> None:
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if len(self._sessions) <= self._max_sessions and now - oldest.last_seen <= self._ttl_seconds:
+                return
+            self._sessions.popitem(last=False)
+
+    def sticky_timers(self, context: RuntimeContext) -> dict[str, int]:
+        """``entry_id -> turn index it stays sticky until`` for the context's session (read-only)."""
+        return self._session(context.session_id).sticky
 
     def is_sticky_active(self, entry: LoreEntry, context: RuntimeContext) -> bool:
-        state_key = (context.session_id, self._lorebook.id, entry.id)
-        sticky_until = self._sticky_state.get(state_key)
+        sticky_until = self._session(context.session_id).sticky.get(entry.id)
         return sticky_until is not None and sticky_until >= context.turn_index
 
     def is_cooldown_active(self, entry: LoreEntry, context: RuntimeContext) -> bool:
         advanced = entry.resolved.advanced
         if not advanced.cooldown_turns:
             return False
-        state_key = (context.session_id, self._lorebook.id, entry.id)
-        return self._cooldown_state.get(state_key, -1) >= context.turn_index
+        return self._session(context.session_id).cooldown.get(entry.id, -1) >= context.turn_index
+
+    def carry_over(self, previous: LoreBookSessionState) -> None:
+        """Adopt *previous* state for entries that still exist (after a lorebook rebuild)."""
+        entry_ids = {entry.id for entry in self._lorebook.entries}
+        for session_id, timers in previous._sessions.items():
+            self._sessions[session_id] = _SessionTimers(
+                sticky={k: v for k, v in timers.sticky.items() if k in entry_ids},
+                cooldown={k: v for k, v in timers.cooldown.items() if k in entry_ids},
+                last_seen=timers.last_seen,
+            )
 
     def apply_after_injection(self, entry: LoreEntry, context: RuntimeContext) -> None:
-        state_key = (context.session_id, self._lorebook.id, entry.id)
         advanced = entry.resolved.advanced
-        if advanced.sticky_turns:
-            self._sticky_state[state_key] = context.turn_index + advanced.sticky_turns
-        if advanced.cooldown_turns:
-            self._cooldown_state[state_key] = context.turn_index + advanced.cooldown_turns
+        if not (advanced.sticky_turns or advanced.cooldown_turns):
+            return
+        timers = self._session(context.session_id)
+        for kind, turns, target in (
+            (STICKY, advanced.sticky_turns, timers.sticky),
+            (COOLDOWN, advanced.cooldown_turns, timers.cooldown),
+        ):
+            if not turns:
+                continue
+            target[entry.id] = context.turn_index + turns
+            if self._store is not None:
+                self._pending.setdefault(context.session_id, []).append((entry.id, kind, target[entry.id]))
+
+    def persist(self, context: RuntimeContext) -> None:
+        """Write this turn's timer changes and drop the timers that have expired."""
+        changes = self._pending.pop(context.session_id, None)
+        if not changes:
+            return
+        timers = self._sessions.get(context.session_id)
+        if timers is not None:
+            for target in (timers.sticky, timers.cooldown):
+                for entry_id in [k for k, until_turn in target.items() if until_turn < context.turn_index]:
+                    del target[entry_id]
+        if self._store is not None:
+            self._store.save_turn(context.session_id, self._lorebook.id, context.turn_index, changes)
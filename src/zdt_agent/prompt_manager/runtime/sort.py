@@ -17,7 +17,7 @@ class LoreSorter:
         entries: list[LoreEntry],
         context: RuntimeContext,
         events: list[RuntimeEvent],
-        match_scores: dict[str, int],
+        match_scores: dict[str, float],
     ) -> list[LoreEntry]:
         grouped: dict[str, list[LoreEntry]] = defaultdict(list)
         non_grouped: list[LoreEntry] = []
@@ -69,6 +69,6 @@ class LoreSorter:
         expanded: list[LoreEntry],
         context: RuntimeContext,
         events: list[RuntimeEvent],
-        match_scores: dict[str, int],
+        match_scores: dict[str, float],
     ) -> list[LoreEntry]:
         return self._sort_entries(expanded, context, events, match_scores)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lorebook_state (
+    session_id TEXT NOT NULL,
+    lorebook_id TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    until_turn INTEGER NOT NULL,
+    updated_at REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, lorebook_id, entry_id, kind)
+)
+"""
+
+STICKY = "sticky"
+COOLDOWN = "cooldown"
+
+DEFAULT_STATE_TTL = 30 * 24 * 3600.0
+# Minimum seconds between two TTL sweeps of the whole table
+_SWEEP_INTERVAL = 3600.0
+
+
+class LoreBookStateStore:
+    """SQLite persistence for sticky/cooldown timers, shared by all engines of a host.
+
+    Sessions are loaded lazily, the first time an engine sees them.  Each turn's
+    timer changes are written in one transaction (``save_turn``), which also
+    drops the session's expired timers, so evicting a session from memory
+    loses nothing and timers survive restarts and lorebook rebuilds.  Sessions
+    whose timers have not changed for ``ttl_seconds`` are swept on open and at
+    most hourly after that.
+    """
+
+    def __init__(self, path: str | Path = "data/lorebook-state.sqlite3", ttl_seconds: float = DEFAULT_STATE_TTL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(lorebook_state)")}
+        if "updated_at" not in columns:
+            # Stores written before the TTL sweep: start their clock now rather than sweeping them on open
+            self._conn.execute("ALTER TABLE lorebook_state ADD COLUMN updated_at REAL NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE lorebook_state SET updated_at = ?", (time.time(),))
+        self._conn.execute("CREATE INDEX IF NOT EXISTS lorebook_state_updated_at ON lorebook_state (updated_at)")
+        self._conn.commit()
+        self._last_sweep = 0.0
+        self.sweep()
+
+    def load(self, session_id: str, lorebook_id: str) -> dict[str, dict[str, int]]:
+        """``{kind: {entry_id: until_turn}}`` for one session of one lorebook."""
+        timers: dict[str, dict[str, int]] = {STICKY: {}, COOLDOWN: {}}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT entry_id, kind, until_turn FROM lorebook_state WHERE session_id = ? AND lorebook_id = ?",
+                (session_id, lorebook_id),
+            ).fetchall()
+        for entry_id, kind, until_turn in rows:
+            timers.setdefault(kind, {})[entry_id] = until_turn
+        return timers
+
+    def save_turn(
+        self, session_id: str, lorebook_id: str, turn_index: int, changes: list[tuple[str, str, int]]
+    ) -> None:
+        """Upsert one turn's ``(entry_id, kind, until_turn)`` *changes* and drop timers expired before *turn_index*."""
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO lorebook_state VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (session_id, lorebook_id, entry_id, kind) "
+                    "DO UPDATE SET until_turn = excluded.until_turn, updated_at = excluded.updated_at",
+                    [
+                        (session_id, lorebook_id, entry_id, kind, until_turn, now)
+                        for entry_id, kind, until_turn in changes
+                    ],
+                )
+                self._conn.execute(
+                    "DELETE FROM lorebook_state WHERE session_id = ? AND lorebook_id = ? AND until_turn < ?",
+                    (session_id, lorebook_id, turn_index),
+                )
+                # The remaining timers of an active session are kept alive with it
+                self._conn.execute(
+                    "UPDATE lorebook_state SET updated_at = ? WHERE session_id = ? AND lorebook_id = ?",
+                    (now, session_id, lorebook_id),
+                )
+        if now - self._last_sweep >= _SWEEP_INTERVAL:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Delete the timers of sessions idle for longer than ``ttl_seconds``; returns the rows removed."""
+        now = time.time()
+        with self._lock:
+            self._last_sweep = now
+            with self._conn:
+                cursor = self._conn.execute(
+                    "DELETE FROM lorebook_state WHERE updated_at < ?", (now - self._ttl_seconds,)
+                )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
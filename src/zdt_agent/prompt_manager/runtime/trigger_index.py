@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Any, Iterator
+
+from ..types import LoreEntry
+
+
+class _Automaton:
+    """Aho-Corasick automaton over a fixed pattern list; reports every (overlapping) occurrence."""
+
+    def __init__(self, patterns: list[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(pattern_id)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def to_data(self) -> dict[str, Any]:
+        """Transition tables as plain JSON-compatible arrays."""
+        return {"goto": self._goto, "fail": self._fail, "out": self._out}
+
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> _Automaton:
+        automaton = cls.__new__(cls)
+        automaton._goto = data["goto"]
+        automaton._fail = data["fail"]
+        automaton._out = data["out"]
+        return automaton
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yield ``(end_index, pattern_id)`` in order of end index."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in out[state]:
+                yield index, pattern_id
+
+
+def _is_word(text: str, index: int) -> bool:
+    return 0 <= index < len(text) and (text[index].isalnum() or text[index] == "_")
+
+
+class TriggerIndex:
+    """Compiled keyword/regex triggers of one lorebook version.
+
+    Keywords of all entries go into two Aho-Corasick automatons (case-sensitive
+    over the raw text, case-insensitive over the lowercased text), so one pass
+    over the scanned text yields hit counts for every entry.  Counts match the
+    per-keyword semantics: non-overlapping occurrences, with ``\\b`` boundaries
+    for whole-word triggers.  Regex triggers are precompiled once.
+    """
+
+    _RAW = 0
+    _LOWER = 1
+
+    def __init__(self, entries: list[LoreEntry]):
+        patterns: tuple[dict[str, int], dict[str, int]] = ({}, {})
+        # Per automaton and pattern: the (entry_id, whole_word) slots that count its hits
+        self._subscribers: tuple[list[list[tuple[str, bool]]], list[list[tuple[str, bool]]]] = ([], [])
+        self._regex: list[tuple[str, list[re.Pattern[str]]]] = []
+        for entry in entries:
+            triggers = entry.resolved.triggers
+            which = self._RAW if triggers.case_sensitive else self._LOWER
+            for keyword in triggers.keywords:
+                keyword = str(keyword)
+                if not keyword:
+                    continue
+                key = keyword if which == self._RAW else keyword.lower()
+                if key not in patterns[which]:
+                    patterns[which][key] = len(patterns[which])
+                    self._subscribers[which].append([])
+                self._subscribers[which][patterns[which][key]].append((entry.id, bool(triggers.whole_word)))
+            if triggers.regex:
+                flags = 0 if triggers.case_sensitive else re.IGNORECASE
+                self._regex.append((entry.id, [re.compile(pattern, flags) for pattern in triggers.regex]))
+
+        self._patterns = tuple(list(p) for p in patterns)
+        self._automata = tuple(_Automaton(p) if p else None for p in self._patterns)
+
+    def to_data(self) -> dict[str, Any]:
+        """Plain JSON-compatible form: patterns, subscribers, automaton tables and regex sources."""
+        return {
+            "patterns": list(self._patterns),
+            "subscribers": list(self._subscribers),
+            "automata": [automaton.to_data() if automaton is not None else None for automaton in self._automata],
+            "regex": [
+                [entry_id, [pattern.pattern for pattern in regexes], regexes[0].flags & re.IGNORECASE]
+                for entry_id, regexes in self._regex
+            ],
+        }
+
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> TriggerIndex:
+        """Inverse of ``to_data``; only the regexes are recompiled."""
+        index = cls.__new__(cls)
+        index._patterns = tuple(data["patterns"])
+        index._subscribers = tuple(
+            [[(entry_id, whole) for entry_id, whole in slots] for slots in which] for which in data["subscribers"]
+        )
+        index._automata = tuple(
+            _Automaton.from_data(automaton) if automaton is not None else None for automaton in data["automata"]
+        )
+        index._regex = [
+            (entry_id, [re.compile(pattern, flags) for pattern in patterns])
+            for entry_id, patterns, flags in data["regex"]
+        ]
+        return index
+
+    def _count(self, which: int, text: str) -> dict[int, list[int]]:
+        """Non-overlapping ``[plain, whole_word]`` occurrence counts of the patterns present in *text*."""
+        automaton = self._automata[which]
+        if automaton is None:
+            return {}
+        patterns = self._patterns[which]
+        counts: dict[int, list[int]] = {}
+        # Next allowed start per pattern: leftmost-first, non-overlapping, like str.count / re.findall
+        next_start: dict[int, list[int]] = {}
+        for end, pattern_id in automaton.iter_matches(text):
+            start = end - len(patterns[pattern_id]) + 1
+            count = counts.get(pattern_id)
+            if count is None:
+                count = counts[pattern_id] = [0, 0]
+                next_start[pattern_id] = [0, 0]
+            allowed = next_start[pattern_id]
+            if start >= allowed[0]:
+                count[0] += 1
+                allowed[0] = end + 1
+            if (
+                start >= allowed[1]
+                and _is_word(text, start - 1) != _is_word(text, start)
+                and _is_word(text, end) != _is_word(text, end + 1)
+            ):
+                count[1] += 1
+                allowed[1] = end + 1
+        return counts
+
+    def scan(self, text: str) -> dict[str, tuple[int, str | None]]:
+        """Return ``entry_id -> (hit_count, first_reason)`` for the entries with at least one hit."""
+        results: dict[str, tuple[int, str | None]] = {}
+        for which, scanned in ((self._RAW, text), (self._LOWER, text.lower())):
+            for pattern_id, (plain, whole) in self._count(which, scanned).items():
+                for entry_id, whole_word in self._subscribers[which][pattern_id]:
+                    hits = whole if whole_word else plain
+                    if hits:
+                        score = results.get(entry_id, (0, None))[0]
+                        results[entry_id] = (score + hits, "keyword_hit")
+        for entry_id, regexes in self._regex:
+            hits = sum(len(pattern.findall(text)) for pattern in regexes)
+            if hits:
+                score, reason = results.get(entry_id, (0, None))
+                results[entry_id] = (score + hits, reason or "regex_hit")
+        return results
+
+    def trigger_graph(self, entries: list[LoreEntry]) -> dict[str, list[tuple[LoreEntry, int, str]]]:
+        """Static recursion graph: for each enabled recursive entry, the enabled entries its content triggers.
+
+        Targets keep lorebook order and carry the hit count and reason of the parent's content.
+        """
+        enabled = {entry.id: (position, entry) for position, entry in enumerate(e for e in entries if e.enabled)}
+        graph: dict[str, list[tuple[LoreEntry, int, str]]] = {}
+        for _, parent in enabled.values():
+            if not parent.resolved.advanced.recursive:
+                continue
+            hits = self.scan(parent.content)
+            targets = sorted(enabled[entry_id] for entry_id in hits if entry_id in enabled)
+            edges = graph[parent.id] = []
+            for _, entry in targets:
+                score, reason = hits[entry.id]
+                edges.append((entry, score, reason or "keyword_hit"))
+        return graph
@@ -7,6 +7,7 @@ from .lorebook import (
     EntryFilters,
     EntryInjection,
     EntryResolved,
+    EntryTokens,
     EntryTriggers,
     InjectionPositionType,
     LogLevel,
@@ -21,7 +22,7 @@ from .lorebook import (
     SourceScope,
     TruncateMode,
 )
-from .runtime import RuntimeContext, RuntimeEvent, RuntimeResult, Stage
+from .runtime import RuntimeContext, RuntimeEvent, RuntimeResult, ScanMessage, Stage
 
 __all__ = [
     "CharacterCard",
@@ -31,6 +32,7 @@ __all__ = [
     "EntryFilters",
     "EntryInjection",
     "EntryResolved",
+    "EntryTokens",
     "EntryTriggers",
     "InjectionPositionType",
     "LoreBook",
@@ -50,6 +52,7 @@ __all__ = [
     "RuntimeContext",
     "RuntimeEvent",
     "RuntimeResult",
+    "ScanMessage",
     "SourceScope",
     "Stage",
     "TruncateMode",
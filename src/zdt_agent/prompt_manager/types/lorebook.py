@@ -73,12 +73,15 @@ class InjectionPositionType(StrEnum):
 
 @dataclass(slots=True)
 class EntryTriggers:
-    """How an entry is matched against scanned text (keywords and/or regex)."""
+    """How an entry is matched against scanned text (keywords, regex and/or embedding similarity)."""
 
     keywords: list[str] = field(default_factory=list)
     regex: list[str] = field(default_factory=list)
     case_sensitive: bool = False
     whole_word: bool = False
+    #: Cosine similarity between the user input and the entry body at which the entry matches;
+    #: None disables the semantic trigger.
+    semantic_threshold: float | None = None
 
 
 @dataclass(slots=True)
@@ -134,6 +137,14 @@ class EntryResolved:
     budget: EntryBudget
 
 
+@dataclass(slots=True)
+class EntryTokens:
+    """Token count of the entry body and the character offset where each token starts (computed at build)."""
+
+    count: int
+    offsets: list[int]
+
+
 @dataclass(slots=True)
 class LoreEntry:
     """One lorebook entry: identity, source path, body text, and resolved settings."""
@@ -143,6 +154,10 @@ class LoreEntry:
     enabled: bool
     content: str
     resolved: EntryResolved
+    #: None for lorebooks built without token data; budgets then count whitespace words per turn.
+    tokens: EntryTokens | None = None
+    #: Unit-length embedding of the body (computed at build for entries with a semantic trigger).
+    embedding: list[float] | None = None
 
 
 @dataclass(slots=True)
@@ -190,3 +205,7 @@ class LoreBook:
     source_scope: list[SourceScope] = field(default_factory=lambda: [SourceScope.GLOBAL])
     merge_policy: MergePolicy = field(default_factory=MergePolicy)
     runtime: RuntimeConfig = field(default_factory=RuntimeConfig)
+    #: Tokenizer spec the entry token data was computed with.
+    tokenizer: str | None = None
+    #: Embedding model the entry embeddings were computed with.
+    embedding_model: str | None = None
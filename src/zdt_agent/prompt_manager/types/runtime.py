@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import datetime as dt
+import time
 from dataclasses import dataclass, field
 from enum import StrEnum
 from typing import Any
 
 from .lorebook import SourceScope
 
+# Event timestamps are monotonic seconds; this maps them to wall-clock time when written
+_WALL_CLOCK_OFFSET = time.time() - time.monotonic()
+
 
 class Stage(StrEnum):
     """Pipeline stage for structured logging (scan → match → filter → expand → sort → inject)."""
@@ -20,6 +25,18 @@ class Stage(StrEnum):
     INJECT = "inject"
 
 
+@dataclass(slots=True, frozen=True)
+class ScanMessage:
+    """A recent conversation message scanned alongside the current input.
+
+    ``id`` must change whenever ``text`` does: engines cache each message's
+    trigger hits by id, so a message is scanned only once per lorebook.
+    """
+
+    id: str
+    text: str
+
+
 @dataclass(slots=True)
 class RuntimeContext:
     """Single activation request: who is asking, what text to scan, tags, and session state."""
@@ -33,13 +50,16 @@ class RuntimeContext:
     active_sources: set[SourceScope] = field(default_factory=lambda: {SourceScope.GLOBAL})
     turn_index: int = 0
     seed: int | None = None
+    #: Scan window of earlier messages, oldest first; their hits add to those of ``text``.
+    recent_messages: list[ScanMessage] = field(default_factory=list)
 
 
 @dataclass(slots=True)
 class RuntimeEvent:
     """One JSONL-friendly log line: stage, action, reason, optional entry id and metrics."""
 
-    ts: str
+    #: ``time.monotonic()`` at emission; see ``iso_ts`` for the wall-clock form.
+    ts: float
     request_id: str
     session_id: str
     lorebook_id: str
@@ -49,6 +69,9 @@ class RuntimeEvent:
     entry_id: str | None = None
     metrics: dict[str, Any] = field(default_factory=dict)
 
+    def iso_ts(self) -> str:
+        return dt.datetime.fromtimestamp(self.ts + _WALL_CLOCK_OFFSET, dt.UTC).isoformat()
+
 
 @dataclass(slots=True)
 class RuntimeResult:
@@ -5,6 +5,7 @@ from dataclasses import asdict
 from pathlib import Path
 from typing import Any
 
+from ...utils.logger import get_logger
 from ..types.conversation import MessageType
 from ..types.lorebook import (
     EntryAdvanced,
@@ -17,6 +18,10 @@ from ..types.lorebook import (
 )
 from .front_matter import parse_markdown_entry
 from .schema import validate_lorebook_json
+from .semantic import embed_documents
+from .tokenizer import DEFAULT_TOKENIZER, get_tokenizer
+
+logger = get_logger(name=__name__)
 
 _DEFAULT_INJECTION_POSITION = InjectionPositionType.AFTER_CHARACTER
 
@@ -47,6 +52,9 @@ def _make_entry_resolved(metadata: dict[str, Any]) -> EntryResolved:
             regex=triggers.get("regex", []),
             case_sensitive=bool(triggers.get("case_sensitive", False)),
             whole_word=bool(triggers.get("whole_word", False)),
+            semantic_threshold=(
+                float(triggers["semantic_threshold"]) if triggers.get("semantic_threshold") is not None else None
+            ),
         ),
         filters=EntryFilters(),
         injection=EntryInjection(
@@ -72,8 +80,39 @@ def _make_entry_resolved(metadata: dict[str, Any]) -> EntryResolved:
     )
 
 
-def build_lorebook(source: Path, output: Path) -> dict[str, Any]:
-    """Build lorebook.json from entries/*.md source files."""
+def _embed_semantic_entries(entries: list[dict[str, Any]], embedding_model: str | None) -> str | None:
+    """Store unit-length body embeddings on entries with a semantic trigger; returns the model used."""
+    semantic = [entry for entry in entries if entry["resolved"]["triggers"]["semantic_threshold"] is not None]
+    if not semantic:
+        return None
+    if embedding_model is None:
+        # Deferred: the EKB module pulls in the HuggingFace stack
+        from ...utils.ekb import DEFAULT_EMBEDDING_MODEL
+
+        embedding_model = DEFAULT_EMBEDDING_MODEL
+    vectors = embed_documents(embedding_model, [entry["content"] for entry in semantic])
+    if vectors is None:
+        logger.warning(f"Built without embeddings; semantic triggers of {len(semantic)} entries will not fire")
+        return None
+    for entry, vector in zip(semantic, vectors):
+        entry["embedding"] = vector
+    return embedding_model
+
+
+def build_lorebook(
+    source: Path,
+    output: Path,
+    tokenizer: str = DEFAULT_TOKENIZER,
+    embedding_model: str | None = None,
+) -> dict[str, Any]:
+    """Build lorebook.json from entries/*.md source files.
+
+    Entry bodies are tokenized once here (see ``utils.tokenizer``); the stored
+    counts and offsets let the runtime budget and truncate without re-tokenizing.
+    Entries with ``triggers.semantic_threshold`` are embedded here too, in one
+    batch with the EKB embedding stack (``embedding_model`` defaults to EKB's
+    model; see ``utils.semantic``).
+    """
     entries_dir = source / "entries"
     if not entries_dir.exists():
         raise FileNotFoundError(f"Missing entries directory: {entries_dir}")
@@ -83,11 +122,13 @@ def build_lorebook(source: Path, output: Path) -> dict[str, Any]:
         raise ValueError(f"No Markdown entries found under: {entries_dir}")
 
     entries: list[dict[str, Any]] = []
+    lore_tokenizer = get_tokenizer(tokenizer)
 
     for entry_path in entry_files:
         metadata, content = parse_markdown_entry(entry_path)
         entry_id = str(metadata.get("id", _entry_id_from_path(entry_path)))
         resolved = asdict(_make_entry_resolved(metadata))
+        offsets = lore_tokenizer.offsets(content)
 
         entries.append(
             {
@@ -96,6 +137,7 @@ def build_lorebook(source: Path, output: Path) -> dict[str, Any]:
                 "enabled": bool(metadata.get("enabled", True)),
                 "content": content,
                 "resolved": resolved,
+                "tokens": {"count": len(offsets), "offsets": offsets},
             }
         )
 
@@ -118,8 +160,12 @@ def build_lorebook(source: Path, output: Path) -> dict[str, Any]:
             "random_seed_strategy": "session_stable",
             "log_level": "normal",
         },
+        "tokenizer": lore_tokenizer.spec,
         "entries": entries,
     }
+    model_used = _embed_semantic_entries(entries, embedding_model)
+    if model_used is not None:
+        lorebook["embedding_model"] = model_used
 
     validate_lorebook_json(lorebook)
     output.parent.mkdir(parents=True, exist_ok=True)
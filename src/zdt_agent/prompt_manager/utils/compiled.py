@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ...utils.logger import get_logger
+from ..runtime.trigger_index import TriggerIndex
+from ..types import LoreBook
+from .loader import lorebook_from_data
+
+logger = get_logger(name=__name__)
+
+#: Bumped whenever the stored layout of the lorebook data or TriggerIndex changes.
+COMPILED_FORMAT = 3
+COMPILED_FILE = "lorebook.compiled.json"
+
+
+@dataclass(slots=True)
+class CompiledLoreBook:
+    """Loaded lorebook plus its trigger index, stored as JSON next to ``lorebook.json``.
+
+    ``fingerprint`` identifies the sources and build parameters it was
+    compiled from; a mismatch means the artifact is stale and the lorebook is
+    rebuilt from source.  The file holds plain data only (the ``lorebook.json``
+    contents and the trigger index tables), so reading a shared artifact never
+    executes code.
+    """
+
+    format: int
+    fingerprint: dict[str, Any]
+    data: dict[str, Any]
+    lorebook: LoreBook
+    trigger_index: TriggerIndex
+
+
+def missing_embeddings(data: dict[str, Any]) -> bool:
+    """True if an entry with a semantic trigger has no stored embedding (the model failed at build)."""
+    return any(
+        entry["resolved"]["triggers"].get("semantic_threshold") is not None and not entry.get("embedding")
+        for entry in data.get("entries", [])
+    )
+
+
+def compile_lorebook(data: dict[str, Any], fingerprint: dict[str, Any]) -> CompiledLoreBook:
+    """Compile parsed ``lorebook.json`` contents."""
+    lorebook = lorebook_from_data(data)
+    return CompiledLoreBook(COMPILED_FORMAT, fingerprint, data, lorebook, TriggerIndex(lorebook.entries))
+
+
+def write_compiled(path: Path, compiled: CompiledLoreBook) -> None:
+    payload = {
+        "format": compiled.format,
+        "fingerprint": compiled.fingerprint,
+        "lorebook": compiled.data,
+        "trigger_index": compiled.trigger_index.to_data(),
+    }
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Failed to write compiled lorebook {path}: {e}")
+        tmp.unlink(missing_ok=True)
+
+
+def read_compiled(path: Path, fingerprint: dict[str, Any]) -> CompiledLoreBook | None:
+    """Return the artifact at *path* if it was compiled from *fingerprint* in the current format."""
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable compiled lorebook {path}: {e}")
+        return None
+    # Round-trip the expected fingerprint so tuples compare equal to the stored lists
+    if (
+        not isinstance(payload, dict)
+        or payload.get("format") != COMPILED_FORMAT
+        or payload.get("fingerprint") != json.loads(json.dumps(fingerprint))
+    ):
+        return None
+    try:
+        data = payload["lorebook"]
+        return CompiledLoreBook(
+            COMPILED_FORMAT,
+            fingerprint,
+            data,
+            lorebook_from_data(data),
+            TriggerIndex.from_data(payload["trigger_index"]),
+        )
+    except Exception as e:
+        logger.warning(f"Ignoring malformed compiled lorebook {path}: {e}")
+        return None
@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 from dataclasses import fields
 from pathlib import Path
+from typing import Any
 
 from ..types import (
     EntryAdvanced,
@@ -10,6 +11,7 @@ from ..types import (
     EntryFilters,
     EntryInjection,
     EntryResolved,
+    EntryTokens,
     EntryTriggers,
     LoreBook,
     LoreBookBudget,
@@ -20,7 +22,11 @@ from ..types import (
 
 
 def load_lorebook(path: str | Path) -> LoreBook:
-    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return lorebook_from_data(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def lorebook_from_data(data: dict[str, Any]) -> LoreBook:
+    """Build a LoreBook from parsed ``lorebook.json`` contents."""
     entries: list[LoreEntry] = []
     for raw_entry in data.get("entries", []):
         resolved = raw_entry["resolved"]
@@ -37,6 +43,8 @@ def load_lorebook(path: str | Path) -> LoreBook:
                     advanced=EntryAdvanced(**resolved["advanced"]),
                     budget=EntryBudget(**resolved["budget"]),
                 ),
+                tokens=EntryTokens(**raw_entry["tokens"]) if "tokens" in raw_entry else None,
+                embedding=raw_entry.get("embedding"),
             )
         )
 
@@ -54,4 +62,6 @@ def load_lorebook(path: str | Path) -> LoreBook:
         budget=LoreBookBudget(**data["budget"]),
         runtime=RuntimeConfig(**runtime_data),
         entries=entries,
+        tokenizer=data.get("tokenizer"),
+        embedding_model=data.get("embedding_model"),
     )
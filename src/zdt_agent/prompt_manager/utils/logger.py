@@ -1,20 +1,156 @@
 from __future__ import annotations
 
+import atexit
 import json
-from dataclasses import asdict
+import os
+import threading
+import time
+from collections import deque
 from pathlib import Path
 
+from ...utils.logger import get_logger
 from ..types import RuntimeEvent
 
+logger = get_logger(name=__name__)
+
+
+def _event_line(event: RuntimeEvent) -> str:
+    record = {
+        "ts": event.iso_ts(),
+        "request_id": event.request_id,
+        "session_id": event.session_id,
+        "lorebook_id": event.lorebook_id,
+        "stage": event.stage,
+        "action": event.action,
+        "reason": event.reason,
+        "entry_id": event.entry_id,
+        "metrics": event.metrics,
+    }
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
 
 class LoreBookEventLogger:
-    def __init__(self, log_path: str | Path = "logs/lorebook-events.jsonl"):
+    """Appends runtime events to a JSONL file from a background writer thread.
+
+    ``append_events`` only pushes events into a bounded ring buffer (the oldest
+    are dropped, and counted, when it is full); serialization and file I/O
+    happen on the writer thread every ``flush_interval`` seconds or once
+    ``batch_size`` events are pending.  Draining the buffer and writing the
+    batch happen under one lock, so batches from the writer thread and from
+    ``flush`` reach the file in buffer order.  The file is rotated to ``.1`` …
+    ``.{backup_count}`` when it exceeds ``max_bytes`` or is older than
+    ``rotate_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        log_path: str | Path = "logs/lorebook-events.jsonl",
+        capacity: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        rotate_interval: float = 24 * 3600,
+        backup_count: int = 5,
+    ):
         self.log_path = Path(log_path)
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._buffer: deque[RuntimeEvent] = deque(maxlen=capacity)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_bytes = max_bytes
+        self._rotate_interval = rotate_interval
+        self._backup_count = backup_count
+        self.dropped_events = 0
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        # Held from draining the buffer until the batch is written; taken before ``_lock``
+        self._write_lock = threading.Lock()
+        self._opened_at: float | None = None
+        self._writer: threading.Thread | None = None
+        self._closed = False
 
     def append_events(self, events: list[RuntimeEvent]) -> None:
         if not events:
             return
+        with self._lock:
+            if self._closed:
+                return
+            self.dropped_events += max(0, len(self._buffer) + len(events) - (self._buffer.maxlen or 0))
+            self._buffer.extend(events)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="lorebook-event-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+            if len(self._buffer) >= self._batch_size:
+                self._wakeup.notify()
+
+    def flush(self) -> None:
+        """Write every buffered event now, on the calling thread."""
+        with self._write_lock:
+            self._write(self._drain())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify()
+        if self._writer is not None and self._writer is not threading.current_thread():
+            self._writer.join()
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._closed and len(self._buffer) < self._batch_size:
+                    self._wakeup.wait(self._flush_interval)
+                closed = self._closed
+            with self._write_lock:
+                batch = self._drain()
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    logger.warning(f"Dropped {len(batch)} lorebook events, failed to write {self.log_path}: {e}")
+            if closed:
+                return
+
+    def _drain(self) -> list[RuntimeEvent]:
+        with self._lock:
+            batch = list(self._buffer)
+            self._buffer.clear()
+        return batch
+
+    def _write(self, batch: list[RuntimeEvent]) -> None:
+        """Append *batch* to the log file; callers hold ``_write_lock``."""
+        if not batch:
+            return
+        data = "".join(_event_line(event) for event in batch)
+        self._maybe_rotate()
         with self.log_path.open("a", encoding="utf-8") as handle:
-            for event in events:
-                handle.write(json.dumps(asdict(event), ensure_ascii=False) + "\n")
+            handle.write(data)
+
+    def _maybe_rotate(self) -> None:
+        now = time.time()
+        try:
+            stat = self.log_path.stat()
+        except FileNotFoundError:
+            self._opened_at = now
+            return
+        if self._opened_at is None:
+            self._opened_at = stat.st_mtime if stat.st_size else now
+        if stat.st_size < self._max_bytes and now - self._opened_at < self._rotate_interval:
+            return
+        for index in range(self._backup_count - 1, 0, -1):
+            source = self.log_path.with_name(f"{self.log_path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.log_path.with_name(f"{self.log_path.name}.{index + 1}"))
+        if self._backup_count > 0:
+            os.replace(self.log_path, self.log_path.with_name(f"{self.log_path.name}.1"))
+        else:
+            self.log_path.unlink()
+        self._opened_at = now
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from ...utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+
+logger = get_logger(name=__name__)
+
+# Query embeddings kept per model; one turn embeds its input once for every lorebook
+_QUERY_CACHE_SIZE = 64
+
+_lock = threading.Lock()
+_models: dict[str, Embeddings | None] = {}
+_queries: OrderedDict[tuple[str, str], list[float] | None] = OrderedDict()
+
+
+def register_embeddings(model_name: str, embeddings: Embeddings) -> None:
+    """Use *embeddings* whenever *model_name* is requested (hosts with a preloaded model, tests)."""
+    with _lock:
+        _models[model_name] = embeddings
+        for key in [key for key in _queries if key[0] == model_name]:
+            del _queries[key]
+
+
+def get_embeddings(model_name: str) -> Embeddings | None:
+    """Load *model_name* through the EKB embedding stack once; None if it cannot be loaded."""
+    with _lock:
+        if model_name in _models:
+            return _models[model_name]
+    try:
+        from ...utils.ekb import load_embeddings
+
+        embeddings: Embeddings | None = load_embeddings(model_name)
+    except Exception as e:
+        logger.warning(f"Embedding model {model_name!r} unavailable ({e}); semantic triggers are disabled")
+        embeddings = None
+    with _lock:
+        return _models.setdefault(model_name, embeddings)
+
+
+def normalize(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else list(vector)
+
+
+def embed_documents(model_name: str, texts: list[str]) -> list[list[float]] | None:
+    """Unit-length embeddings of *texts* in one batch; None if the model is unavailable."""
+    embeddings = get_embeddings(model_name)
+    if embeddings is None:
+        return None
+    return [normalize(vector) for vector in embeddings.embed_documents(texts)]
+
+
+def embed_query(model_name: str, text: str) -> list[float] | None:
+    """Unit-length embedding of *text*, reused across lorebooks sharing *model_name*.
+
+    None if the model is unavailable or fails on *text*; a failure is not
+    cached, so the next turn tries again.
+    """
+    key = (model_name, text)
+    with _lock:
+        if key in _queries:
+            _queries.move_to_end(key)
+            return _queries[key]
+    embeddings = get_embeddings(model_name)
+    if embeddings is None:
+        vector = None
+    else:
+        try:
+            vector = normalize(embeddings.embed_query(text))
+        except Exception as e:
+            logger.warning(f"Embedding model {model_name!r} failed on the input ({e}); skipping semantic triggers")
+            return None
+    with _lock:
+        _queries[key] = vector
+        if len(_queries) > _QUERY_CACHE_SIZE:
+            _queries.popitem(last=False)
+    return vector
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Protocol
+
+from ...utils.logger import get_logger
+
+logger = get_logger(name=__name__)
+
+#: Used by ``build_lorebook`` unless another spec is given.
+DEFAULT_TOKENIZER = "tiktoken:cl100k_base"
+WHITESPACE_TOKENIZER = "whitespace"
+
+_WORD = re.compile(r"\S+")
+
+
+class LoreTokenizer(Protocol):
+    """Splits text into tokens, reported as the character offset where each token starts."""
+
+    spec: str
+
+    def offsets(self, text: str) -> list[int]: ...
+
+
+class WhitespaceTokenizer:
+    """Offline fallback: whitespace-separated words, the historical budget unit."""
+
+    spec = WHITESPACE_TOKENIZER
+
+    def offsets(self, text: str) -> list[int]:
+        return [match.start() for match in _WORD.finditer(text)]
+
+
+class TiktokenTokenizer:
+    def __init__(self, spec: str, encoding: Any):
+        self.spec = spec
+        self._encoding = encoding
+
+    def offsets(self, text: str) -> list[int]:
+        _, offsets = self._encoding.decode_with_offsets(self._encoding.encode_ordinary(text))
+        return offsets
+
+
+class HuggingfaceTokenizer:
+    def __init__(self, spec: str, tokenizer: Any):
+        self.spec = spec
+        self._tokenizer = tokenizer
+
+    def offsets(self, text: str) -> list[int]:
+        return [start for start, _ in self._tokenizer.encode(text, add_special_tokens=False).offsets]
+
+
+def _load(spec: str, kind: str, name: str) -> LoreTokenizer:
+    if kind == "tiktoken":
+        import tiktoken
+
+        return TiktokenTokenizer(spec, tiktoken.get_encoding(name))
+    # Opt-in: LiteLLM ships its encodings (works offline) but selects them through a private helper,
+    # and importing it starts LiteLLM's background model-cost-map download
+    from litellm.utils import _select_tokenizer
+
+    selected = _select_tokenizer(name)
+    if selected["type"] == "openai_tokenizer":
+        return TiktokenTokenizer(spec, selected["tokenizer"])
+    return HuggingfaceTokenizer(spec, selected["tokenizer"])
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(spec: str = DEFAULT_TOKENIZER) -> LoreTokenizer:
+    """Resolve a tokenizer spec, falling back to whitespace words if it cannot be loaded."""
+    kind, _, name = spec.partition(":")
+    if kind == WHITESPACE_TOKENIZER:
+        return WhitespaceTokenizer()
+    if kind not in ("tiktoken", "litellm") or not name:
+        raise ValueError(
+            f"Unknown tokenizer {spec!r}; expected 'whitespace', 'tiktoken:<encoding>' or 'litellm:<model>'"
+        )
+    try:
+        return _load(spec, kind, name)
+    except Exception as e:
+        logger.warning(f"Tokenizer {spec!r} unavailable ({e}); counting whitespace words instead")
+        return WhitespaceTokenizer()
@@ -10,6 +10,7 @@ from typing import Dict, Optional
 from langchain_core.tools import tool
 
 from ..utils.ekb import EKBConfig, EmbeddingKnowledgeBase
+from ..utils.ekb_catalog import list_summaries, read_summary
 from ..utils.logger import get_logger
 from ..utils.regex_pattern_filter import FilterOrder
 
@@ -44,6 +45,22 @@ def _load_kb_config(name: str) -> EKBConfig:
                 use_gitignore=saved.get("use_gitignore", True),
                 db_type=saved.get("db_type", "chroma"),
                 debug_mode=saved.get("debug_mode", False),
+                **{
+                    key: saved[key]
+                    for key in (
+                        "chunk_size",
+                        "chunk_overlap",
+                        "embedding_model",
+                        "processor_profile",
+                        "json_record_path",
+                        "dedup",
+                        "dedup_threshold",
+                        "shards",
+                        "search_k",
+                        "rerank_weights",
+                    )
+                    if key in saved
+                },
             )
         except Exception as e:
             logger.warning(f"Failed to load config for '{name}': {e}, using minimal config")
@@ -74,34 +91,59 @@ def get_knowledge_base(name: str = "default") -> Optional[EmbeddingKnowledgeBase
         return None
 
 
+def _missing_kb_message(name: str) -> str:
+    return (
+        f"Knowledge base '{name}' does not exist or has no configuration. "
+        "Please create it first via the management interface."
+    )
+
+
 def _require_kb(name: str) -> tuple[Optional[EmbeddingKnowledgeBase], Optional[str]]:
     """Return (kb, None) on success or (None, error_message) on failure."""
     kb = get_knowledge_base(name)
     if kb is None:
-        msg = (
-            f"Knowledge base '{name}' does not exist or has no configuration. "
-            "Please create it first via the management interface."
-        )
-        return None, msg
+        return None, _missing_kb_message(name)
     return kb, None
 
 
 @tool
-def search_knowledge_base(query: str, name: str = "default", limit: int = 5) -> str:
+def search_knowledge_base(
+    query: str,
+    name: str = "default",
+    limit: int = 5,
+    file_type: str = "",
+    tags: str = "",
+    categories: str = "",
+    source_root: str = "",
+) -> str:
     """Search for relevant content in a knowledge base.
 
     Args:
         query: Natural-language search query.
         name: Name of the knowledge base (default: "default").
         limit: Maximum number of results to return.
+        file_type: Only search files with these comma-separated extensions (e.g. "md,py").
+        tags: Only search chunks with any of these comma-separated tags.
+        categories: Only search chunks in any of these comma-separated categories.
+        source_root: Only search files under these comma-separated source paths of the knowledge base.
     """
     kb, err = _require_kb(name)
     if err:
         return f"❌ {err}"
     assert kb is not None
 
+    filters = {
+        field: value
+        for field, value in (
+            ("file_type", file_type),
+            ("tags", tags),
+            ("categories", categories),
+            ("source_root", source_root),
+        )
+        if value
+    }
     try:
-        results = kb.search(query, k=limit)
+        results = kb.search(query, k=limit, filters=filters)
     except Exception as e:
         logger.error(f"Error searching knowledge base '{name}': {e}")
         return f"❌ Error during search in '{name}': {e}"
@@ -116,6 +158,8 @@ def search_knowledge_base(query: str, name: str = "default", limit: int = 5) ->
 
         lines.append(f"**{i}. {metadata.get('title', 'No title')}**")
         lines.append(f"📁 File: {metadata.get('source', 'Unknown')}")
+        if result.get("alternate_sources"):
+            lines.append(f"📎 Also in: {', '.join(result['alternate_sources'])}")
         for field, icon in _OPTIONAL_METADATA_FIELDS:
             value = metadata.get(field)
             if value:
@@ -165,15 +209,11 @@ def get_knowledge_base_stats(name: str = "default") -> str:
     Args:
         name: Name of the knowledge base (default: "default").
     """
-    kb, err = _require_kb(name)
-    if err:
-        return f"❌ {err}"
-    assert kb is not None
-
     try:
-        stats = kb.get_stats()
-        if "error" in stats:
-            return f"❌ Failed to get statistics for '{name}': {stats['error']}"
+        # Read from the catalog so no backend or embedding model is loaded
+        stats = read_summary(_CONFIG_BASE / name)
+        if stats is None:
+            return f"❌ {_missing_kb_message(name)}"
 
         lines = [
             f"📊 Knowledge base '{name}' statistics:",
@@ -185,7 +225,7 @@ def get_knowledge_base_stats(name: str = "default") -> str:
         if stats.get("file_types"):
             file_types = ", ".join(f"{ext}({count})" for ext, count in stats["file_types"].items())
             lines.append(f"📊 File types: {file_types}")
-        lines.append(f"🕒 Last updated: {stats['last_updated']}")
+        lines.append(f"🕒 Last updated: {stats['last_updated'] or 'Never'}")
         return "\n".join(lines)
     except Exception as e:
         logger.error(f"Error getting statistics for '{name}': {e}")
@@ -196,34 +236,26 @@ def get_knowledge_base_stats(name: str = "default") -> str:
 def list_knowledge_bases() -> str:
     """List all available knowledge bases on the filesystem."""
     try:
-        if not _CONFIG_BASE.exists():
-            return "📝 No knowledge bases found."
-
-        kb_dirs = sorted(d for d in _CONFIG_BASE.iterdir() if d.is_dir())
-        if not kb_dirs:
+        summaries = list_summaries(_CONFIG_BASE)
+        if not summaries:
             return "📝 No knowledge bases found."
 
-        lines = [f"📚 Found {len(kb_dirs)} knowledge base(s):\n"]
-        for kb_dir in kb_dirs:
-            name = kb_dir.name
-            kb = get_knowledge_base(name)
-            if kb is None:
-                lines.append(f"**{name}** (⚠️  No valid configuration)\n")
+        lines = [f"📚 Found {len(summaries)} knowledge base(s):\n"]
+        for stats in summaries:
+            name = stats["name"]
+            if "error" in stats:
+                lines.append(f"**{name}** (⚠️  {stats['error']})\n")
                 continue
-            try:
-                stats = kb.get_stats()
-                lines.extend(
-                    [
-                        f"**{name}**",
-                        f"  📄 Documents: {stats.get('total_documents', 0)}",
-                        f"  📁 Files: {stats.get('total_files', 0)}",
-                        f"  📂 Sources: {', '.join(stats.get('source_paths', []))}",
-                        f"  🕒 Updated: {stats.get('last_updated', 'Never')}",
-                        "",
-                    ]
-                )
-            except Exception as e:
-                lines.append(f"**{name}** (⚠️  Error: {e})\n")
+            lines.extend(
+                [
+                    f"**{name}**",
+                    f"  📄 Documents: {stats.get('total_documents', 0)}",
+                    f"  📁 Files: {stats.get('total_files', 0)}",
+                    f"  📂 Sources: {', '.join(stats.get('source_paths', []))}",
+                    f"  🕒 Updated: {stats.get('last_updated') or 'Never'}",
+                    "",
+                ]
+            )
 
         return "\n".join(lines)
     except Exception as e:
@@ -259,6 +291,23 @@ def get_database_debug_info(name: str = "default") -> str:
         ]
         if info.get("db_stats_error"):
             lines.append(f"⚠️ Error getting stats: {info['db_stats_error']}")
+
+        metrics = info.get("metrics", {})
+        if metrics.get("model_load_seconds") is not None:
+            lines.append(f"🧠 Model load: {metrics['model_load_seconds']:.2f}s")
+        for kind in ("search", "update"):
+            summary = metrics.get(kind)
+            if not summary:
+                continue
+            lines.append(
+                f"⏱️ {kind.title()} (last {summary['count']}): "
+                f"p50 {summary['p50_seconds'] * 1000:.1f} ms, p95 {summary['p95_seconds'] * 1000:.1f} ms"
+            )
+            for stage, seconds in summary["mean_stage_seconds"].items():
+                lines.append(f"   • {stage}: {seconds * 1000:.1f} ms avg")
+            counters = summary["last"].get("counters", {})
+            if counters:
+                lines.append("   • last: " + ", ".join(f"{name}={value}" for name, value in counters.items()))
         return "\n".join(lines)
     except Exception as e:
         logger.error(f"Error getting debug info for '{name}': {e}")
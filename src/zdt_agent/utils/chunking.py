@@ -0,0 +1,536 @@
+"""
+Chunkers that turn processed documents into index chunks.
+The generic chunker splits on character separators; structure-aware chunkers
+pack whole syntactic units (functions, classes, sections) up to the chunk budget
+and record what each chunk contains as metadata.
+"""
+
+import ast
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from .constants import BRACE_LANGUAGES, COMMENT_PATTERNS
+from .logger import get_logger
+
+logger = get_logger(name=__name__)
+
+TEXT_SEPARATORS = ["\n\n", "\n", "。", "！", "？", "；", "，", " ", ""]
+
+
+@dataclass
+class Chunk:
+    """A piece of document text plus chunk-level metadata (scalars only)."""
+
+    text: str
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+class TextChunker:
+    """Character-based chunking with ``RecursiveCharacterTextSplitter``."""
+
+    name = "recursive"
+
+    def __init__(self, chunk_size: int, chunk_overlap: int):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len,
+            separators=TEXT_SEPARATORS,
+        )
+
+    @property
+    def key(self) -> str:
+        """Identify this chunker's output for the parse cache."""
+        return f"{self.name}:{self.chunk_size}:{self.chunk_overlap}"
+
+    def split_text(self, text: str) -> List[str]:
+        return self.splitter.split_text(text)
+
+    def split(self, parsed_content: dict[str, Any]) -> List[Chunk]:
+        return [Chunk(text) for text in self.split_text(parsed_content.get("content", ""))]
+
+
+# =============================================================================
+# Code chunking
+# =============================================================================
+
+
+@dataclass
+class _Unit:
+    """A run of source lines ``[start, end)`` that should stay together."""
+
+    start: int
+    end: int
+    symbols: List[str] = field(default_factory=list)
+    # Produces finer-grained units covering the same lines, for oversized units
+    children: Optional[Callable[[], List["_Unit"]]] = None
+
+
+# Oversized units are split into members at most this many levels deep
+_MAX_NESTING = 8
+
+# Lines that continue the previous unit in indentation-based languages
+_INDENT_CONTINUATION = re.compile(r"^(?:[)\]}]|(?:end|else|elif|elsif|except|finally|rescue|ensure|when)\b)")
+
+_INDENT_SYMBOL = re.compile(r"^\s*(?:async\s+)?(?:def|class|module|function|fn|sub|proc|local\s+function)\s+([\w.:$]+)")
+
+_BRACE_SYMBOL_PATTERNS = [
+    re.compile(r"\bfunc\s+(?:\([^)]*\)\s*)?([A-Za-z_]\w*)"),
+    re.compile(
+        r"\b(?:class|interface|struct|enum|trait|impl|object|record|namespace|module|protocol|extension|fn|function)"
+        r"\s+([A-Za-z_$][\w$]*)"
+    ),
+    re.compile(r"\b(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s*)?(?:function\b|\(|[A-Za-z_$][\w$]*\s*=>)"),
+    re.compile(r"([A-Za-z_$][\w$]*)\s*\([^;{}]*\)[^;{}()]*\{?\s*$"),
+]
+
+_NOT_SYMBOLS = frozenset({"if", "for", "while", "switch", "catch", "return", "else", "do", "try", "sizeof", "with"})
+
+
+class CodeChunker(TextChunker):
+    """Packs whole functions and classes into chunks up to ``chunk_size``.
+
+    Python is split with ``ast``; languages in ``BRACE_LANGUAGES`` by brace
+    depth; everything else by indentation.  Units larger than the budget are
+    split into their members (methods, nested blocks) and, as a last resort,
+    by lines.  Each chunk records ``symbols``, ``start_line`` and ``end_line``.
+    """
+
+    name = "code"
+
+    def split(self, parsed_content: dict[str, Any]) -> List[Chunk]:
+        content = parsed_content.get("content", "")
+        if not content.strip():
+            return []
+        language = parsed_content.get("language", "unknown")
+        lines = content.splitlines()
+
+        units: Optional[List[_Unit]] = None
+        if language == "python":
+            units = self._python_units(content, lines)
+        if units is None and language in BRACE_LANGUAGES:
+            units = self._brace_units(lines, language)
+        if units is None:
+            units = self._indent_units(lines, language)
+
+        return self._pack(lines, units)
+
+    # ------------------------------------------------------------------
+    # Packing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _size(lines: List[str], start: int, end: int) -> int:
+        return sum(len(line) + 1 for line in lines[start:end])
+
+    def _expand(self, lines: List[str], units: List[_Unit]) -> Iterator[_Unit]:
+        """Yield units that fit the budget, descending into members and then lines as needed."""
+        for unit in units:
+            if self._size(lines, unit.start, unit.end) <= self.chunk_size:
+                yield unit
+                continue
+            children = unit.children() if unit.children else []
+            if len(children) > 1:
+                yield from self._expand(lines, children)
+            else:
+                for i in range(unit.start, unit.end):
+                    yield _Unit(i, i + 1, unit.symbols)
+
+    def _pack(self, lines: List[str], units: List[_Unit]) -> List[Chunk]:
+        chunks: List[Chunk] = []
+        current: List[_Unit] = []
+        current_size = 0
+
+        def flush() -> None:
+            nonlocal current, current_size
+            if current:
+                chunk = self._make_chunk(lines, current[0].start, current[-1].end, current)
+                if chunk is not None:
+                    chunks.append(chunk)
+            current, current_size = [], 0
+
+        for unit in self._expand(lines, units):
+            size = self._size(lines, unit.start, unit.end)
+            if size > self.chunk_size:
+                # A single overlong line (minified code, embedded data)
+                flush()
+                metadata: dict[str, Any] = {"start_line": unit.start + 1, "end_line": unit.end}
+                if unit.symbols:
+                    metadata["symbols"] = ", ".join(unit.symbols)
+                chunks.extend(Chunk(piece, dict(metadata)) for piece in self.split_text(lines[unit.start]))
+                continue
+            if current and current_size + size > self.chunk_size:
+                flush()
+            current.append(unit)
+            current_size += size
+
+        flush()
+        return chunks
+
+    @staticmethod
+    def _make_chunk(lines: List[str], start: int, end: int, units: List[_Unit]) -> Optional[Chunk]:
+        # Trim blank lines so line numbers point at actual code
+        while start < end and not lines[start].strip():
+            start += 1
+        while end > start and not lines[end - 1].strip():
+            end -= 1
+        if start >= end:
+            return None
+
+        symbols = list(dict.fromkeys(s for unit in units for s in unit.symbols))
+        metadata: dict[str, Any] = {"start_line": start + 1, "end_line": end}
+        if symbols:
+            metadata["symbols"] = ", ".join(symbols)
+        return Chunk("\n".join(lines[start:end]), metadata)
+
+    @staticmethod
+    def _qualify(parent: List[str], units: List[_Unit]) -> List[_Unit]:
+        """Prefix member symbols with the enclosing symbol (``Class.method``)."""
+        if not parent:
+            return units
+        owner = parent[0]
+        for unit in units:
+            unit.symbols = [f"{owner}.{s}" for s in unit.symbols] or [owner]
+        return units
+
+    @staticmethod
+    def _units_from_starts(starts: List[int], start: int, end: int) -> List[tuple[int, int]]:
+        bounds = sorted({start, *(s for s in starts if start < s < end)})
+        return [(a, b) for a, b in zip(bounds, bounds[1:] + [end])]
+
+    # ------------------------------------------------------------------
+    # Python (ast)
+    # ------------------------------------------------------------------
+
+    def _python_units(self, content: str, lines: List[str]) -> Optional[List[_Unit]]:
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError, RecursionError) as e:
+            logger.debug(f"ast parse failed, falling back to indentation chunking: {e}")
+            return None
+        return self._python_body_units(tree.body, lines, 0, len(lines))
+
+    def _python_body_units(self, body: List[ast.stmt], lines: List[str], start: int, end: int) -> List[_Unit]:
+        starts: List[int] = []
+        nodes: dict[int, ast.stmt] = {}
+        for node in body:
+            first = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]) - 1
+            # Keep comments directly above a definition with it
+            while first > start and lines[first - 1].lstrip().startswith("#"):
+                first -= 1
+            starts.append(first)
+            nodes[first] = node
+
+        units: List[_Unit] = []
+        for a, b in self._units_from_starts(starts, start, end):
+            node = nodes.get(a)
+            unit = _Unit(a, b)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                unit.symbols = [node.name]
+                if isinstance(node, ast.ClassDef) and node.body:
+                    unit.children = self._python_children(node, lines, unit)
+            units.append(unit)
+        return units
+
+    def _python_children(self, node: ast.ClassDef, lines: List[str], unit: _Unit) -> Callable[[], List[_Unit]]:
+        def children() -> List[_Unit]:
+            return self._qualify(unit.symbols, self._python_body_units(node.body, lines, unit.start, unit.end))
+
+        return children
+
+    # ------------------------------------------------------------------
+    # Brace languages
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _scan_braces(lines: List[str]) -> tuple[List[int], List[bool]]:
+        """Return brace depth before each line (plus the final depth) and whether each line has code."""
+        depths: List[int] = [0]
+        has_code: List[bool] = []
+        depth = 0
+        in_block = False
+        quote: Optional[str] = None
+
+        for line in lines:
+            code = False
+            i, n = 0, len(line)
+            while i < n:
+                ch = line[i]
+                if in_block:
+                    if line.startswith("*/", i):
+                        in_block = False
+                        i += 2
+                    else:
+                        i += 1
+                    continue
+                if quote:
+                    if ch == "\\":
+                        i += 2
+                        continue
+                    if ch == quote:
+                        quote = None
+                    i += 1
+                    continue
+                if line.startswith("//", i):
+                    break
+                if line.startswith("/*", i):
+                    in_block = True
+                    i += 2
+                    continue
+                if not ch.isspace():
+                    code = True
+                if ch in "\"'`":
+                    quote = ch
+                elif ch == "{":
+                    depth += 1
+                elif ch == "}":
+                    depth = max(0, depth - 1)
+                i += 1
+            # Only template literals span lines
+            if quote != "`":
+                quote = None
+            depths.append(depth)
+            has_code.append(code)
+        return depths, has_code
+
+    def _brace_units(self, lines: List[str], language: str) -> List[_Unit]:
+        depths, has_code = self._scan_braces(lines)
+        return self._brace_level_units(lines, depths, has_code, 0, len(lines), 0)
+
+    def _brace_level_units(
+        self,
+        lines: List[str],
+        depths: List[int],
+        has_code: List[bool],
+        start: int,
+        end: int,
+        level: int,
+    ) -> List[_Unit]:
+        # A unit ends on a code line that returns to ``level`` unless the
+        # statement obviously continues (Allman braces, trailing operators).
+        starts: List[int] = []
+        pending_start: Optional[int] = None
+        for i in range(start, end):
+            if pending_start is None and (has_code[i] or lines[i].strip()):
+                pending_start = i
+            if not has_code[i] or depths[i + 1] != level:
+                continue
+            stripped = lines[i].rstrip()
+            nxt = lines[i + 1].lstrip() if i + 1 < end else ""
+            if stripped.endswith((",", "(", "=", "+", "&&", "||", "?", ":", "\\")) or nxt.startswith(("{", ".")):
+                continue
+            if pending_start is not None:
+                starts.append(pending_start)
+            pending_start = None
+
+        units: List[_Unit] = []
+        for a, b in self._units_from_starts(starts, start, end):
+            unit = _Unit(a, b)
+            opening = next((i for i in range(a, b) if depths[i + 1] > level), None)
+            if opening is not None:
+                unit.symbols = self._brace_symbol(lines[a : opening + 1], has_code[a : opening + 1])
+                if level < _MAX_NESTING:
+                    unit.children = self._brace_children(lines, depths, has_code, unit, opening, level)
+            units.append(unit)
+        return units
+
+    @staticmethod
+    def _brace_symbol(lines: List[str], has_code: List[bool]) -> List[str]:
+        signature = " ".join(line.strip() for line, code in zip(lines, has_code) if code)
+        for pattern in _BRACE_SYMBOL_PATTERNS:
+            m = pattern.search(signature)
+            if m and m.group(1) not in _NOT_SYMBOLS:
+                return [m.group(1)]
+        return []
+
+    def _brace_children(
+        self,
+        lines: List[str],
+        depths: List[int],
+        has_code: List[bool],
+        unit: _Unit,
+        opening: int,
+        level: int,
+    ) -> Callable[[], List[_Unit]]:
+        def children() -> List[_Unit]:
+            closing = next((i for i in range(opening + 1, unit.end) if depths[i + 1] <= level), unit.end)
+            parts = [_Unit(unit.start, opening + 1)]
+            parts += self._brace_level_units(lines, depths, has_code, opening + 1, closing, level + 1)
+            if closing < unit.end:
+                parts.append(_Unit(closing, unit.end))
+            return self._qualify(unit.symbols, parts)
+
+        return children
+
+    # ------------------------------------------------------------------
+    # Indentation-based languages
+    # ------------------------------------------------------------------
+
+    def _indent_units(
+        self,
+        lines: List[str],
+        language: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        nesting: int = 0,
+    ) -> List[_Unit]:
+        end = len(lines) if end is None else end
+        comment = COMMENT_PATTERNS["single_line"].get(language, "#")
+
+        indents = [len(line) - len(line.lstrip()) for line in lines[start:end] if line.strip()]
+        if not indents:
+            return [_Unit(start, end)]
+        indent = min(indents)
+
+        starts: List[int] = []
+        for i in range(start, end):
+            stripped = lines[i].strip()
+            if not stripped or len(lines[i]) - len(lines[i].lstrip()) != indent:
+                continue
+            if stripped.startswith(comment) or _INDENT_CONTINUATION.match(stripped):
+                continue
+            first = i
+            while first > start and lines[first - 1].strip().startswith((comment, "@")):
+                first -= 1
+            starts.append(first)
+
+        units: List[_Unit] = []
+        for a, b in self._units_from_starts(starts, start, end):
+            unit = _Unit(a, b)
+            header = next((i for i in range(a, b) if lines[i].strip() and not lines[i].strip().startswith(comment)), a)
+            m = _INDENT_SYMBOL.match(lines[header])
+            if m:
+                unit.symbols = [m.group(1)]
+            if header + 1 < b and nesting < _MAX_NESTING:
+                unit.children = self._indent_children(lines, language, unit, header, nesting)
+            units.append(unit)
+        return units
+
+    def _indent_children(
+        self,
+        lines: List[str],
+        language: str,
+        unit: _Unit,
+        header: int,
+        nesting: int,
+    ) -> Callable[[], List[_Unit]]:
+        def children() -> List[_Unit]:
+            parts = [_Unit(unit.start, header + 1)]
+            parts += self._indent_units(lines, language, header + 1, unit.end, nesting + 1)
+            return self._qualify(unit.symbols, parts)
+
+        return children
+
+
+# =============================================================================
+# Markdown chunking
+# =============================================================================
+
+_MD_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_MD_FENCES = ("```", "~~~")
+
+
+@dataclass
+class _Section:
+    """A heading, the lines up to its first subheading, and its subsections."""
+
+    path: List[str]
+    start: int
+    body_end: int
+    end: int = 0
+    level: int = 0
+    children: List["_Section"] = field(default_factory=list)
+
+
+class MarkdownChunker(TextChunker):
+    """Chunks Markdown along its heading hierarchy.
+
+    A section is kept whole together with its subsections when it fits
+    ``chunk_size``; otherwise its subsections are chunked separately and
+    adjacent small pieces are merged back up to the budget.  Only sections
+    that are too large on their own fall back to character splitting.  Each
+    chunk records the headings it sits under as ``section_path``
+    (``"Guide > Install > Linux"``).
+    """
+
+    name = "markdown"
+
+    def split(self, parsed_content: dict[str, Any]) -> List[Chunk]:
+        content = parsed_content.get("content", "")
+        if not content.strip():
+            return []
+        lines = content.splitlines()
+        root = self._parse_sections(lines)
+        return [Chunk(text, self._section_metadata(path)) for text, path in self._pack_section(lines, root)]
+
+    @staticmethod
+    def _section_metadata(path: List[str]) -> dict[str, Any]:
+        return {"section_path": " > ".join(path)} if path else {}
+
+    @staticmethod
+    def _parse_sections(lines: List[str]) -> _Section:
+        root = _Section(path=[], start=0, body_end=len(lines), end=len(lines))
+        stack = [root]
+        in_fence = False
+
+        for i, line in enumerate(lines):
+            if line.lstrip().startswith(_MD_FENCES):
+                in_fence = not in_fence
+                continue
+            m = None if in_fence else _MD_HEADING.match(line)
+            if not m:
+                continue
+            level = len(m.group(1))
+            while len(stack) > 1 and stack[-1].level >= level:
+                MarkdownChunker._close(stack.pop(), i)
+            parent = stack[-1]
+            if not parent.children:
+                parent.body_end = i
+            section = _Section(path=parent.path + [m.group(2)], start=i, body_end=len(lines), level=level)
+            parent.children.append(section)
+            stack.append(section)
+
+        for section in stack[1:]:
+            MarkdownChunker._close(section, len(lines))
+        return root
+
+    @staticmethod
+    def _close(section: _Section, end: int) -> None:
+        section.end = end
+        if not section.children:
+            section.body_end = end
+
+    def _pack_section(self, lines: List[str], section: _Section) -> List[tuple[str, List[str]]]:
+        """Return ``(text, section_path)`` pieces for a section and its subsections."""
+        whole = "\n".join(lines[section.start : section.end]).strip()
+        if len(whole) <= self.chunk_size:
+            return [(whole, section.path)] if whole else []
+
+        pieces: List[tuple[str, List[str]]] = []
+        intro = "\n".join(lines[section.start : section.body_end]).strip()
+        if intro:
+            pieces.extend((text, section.path) for text in self.split_text(intro))
+        for child in section.children:
+            pieces.extend(self._pack_section(lines, child))
+        return self._merge(pieces)
+
+    def _merge(self, pieces: List[tuple[str, List[str]]]) -> List[tuple[str, List[str]]]:
+        """Merge adjacent pieces up to the budget; a merged chunk keeps their common path."""
+        merged: List[tuple[str, List[str]]] = []
+        for text, path in pieces:
+            if merged and len(merged[-1][0]) + 2 + len(text) <= self.chunk_size:
+                prev_text, prev_path = merged[-1]
+                common: List[str] = []
+                for a, b in zip(prev_path, path):
+                    if a != b:
+                        break
+                    common.append(a)
+                merged[-1] = (f"{prev_text}\n\n{text}", common)
+            else:
+                merged.append((text, path))
+        return merged
@@ -215,6 +215,39 @@ COMMENT_PATTERNS: Dict[str, Dict[str, str]] = {
     },
 }
 
+# =============================================================================
+# Chunking
+# =============================================================================
+
+# Languages whose blocks are delimited by braces; other code is chunked by indentation
+BRACE_LANGUAGES: FrozenSet[str] = frozenset(
+    {
+        "javascript",
+        "typescript",
+        "java",
+        "csharp",
+        "go",
+        "rust",
+        "php",
+        "c",
+        "cpp",
+        "swift",
+        "kotlin",
+        "dart",
+        "scala",
+        "objc",
+        "css",
+        "scss",
+        "less",
+        "groovy",
+        "gradle",
+        "protobuf",
+        "thrift",
+        "graphql",
+        "terraform",
+    }
+)
+
 # =============================================================================
 # Utility Functions
 # =============================================================================
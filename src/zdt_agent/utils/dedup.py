@@ -0,0 +1,194 @@
+"""
+Index-time duplicate detection for knowledge base chunks.
+Exact duplicates are found by hashing normalised text; near duplicates with
+MinHash signatures bucketed by LSH bands.  Only the first (canonical) copy of a
+chunk is embedded; later copies are recorded as its alternates.
+"""
+
+import hashlib
+import json
+import random
+import re
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .ekb_generations import atomic_write_json
+from .logger import get_logger
+
+logger = get_logger(name=__name__)
+
+DEDUP_FILE = "dedup.json"
+
+_NUM_PERM = 64
+_BANDS = 16
+_ROWS = _NUM_PERM // _BANDS
+_PRIME = (1 << 61) - 1
+_SHINGLE_WORDS = 3
+# Chunks shorter than this (normalised characters) are only deduplicated exactly
+_MIN_NEAR_DUP_CHARS = 200
+
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(_NUM_PERM)]
+_WORD = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def minhash_signature(text: str) -> List[int]:
+    """MinHash signature over word 3-gram shingles of already normalised text."""
+    words = _WORD.findall(text)
+    if len(words) < _SHINGLE_WORDS:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i : i + _SHINGLE_WORDS]) for i in range(len(words) - _SHINGLE_WORDS + 1)}
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def estimate_similarity(a: List[int], b: List[int]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class DedupIndex:
+    """Canonical chunks, their alternates, and the exact/LSH lookup tables.
+
+    Chunk ids are ``"<file_key>#<chunk suffix>"`` as produced by the knowledge base.
+    """
+
+    def __init__(self, threshold: float = 0.9, name: str = "default"):
+        self.threshold = threshold
+        self.name = name
+        # canonical chunk id -> {"file_key", "digest", "sig", "size", "alternates": {chunk_id: file_key}}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._exact: Dict[str, str] = {}
+        self._buckets: Dict[Tuple[int, int], Set[str]] = {}
+        # chunk id (canonical or alternate) -> canonical id, grouped by owning file
+        self._by_file: Dict[str, Dict[str, str]] = {}
+        self.run_stats = {"exact": 0, "near": 0, "chars_saved": 0}
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: Path, threshold: float, name: str = "default") -> "DedupIndex":
+        index = cls(threshold=threshold, name=name)
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entries = json.load(f).get("entries", {})
+                for chunk_id, entry in entries.items():
+                    index._insert(chunk_id, entry)
+            except Exception as e:
+                logger.warning(f"[{name}] Failed to load dedup index, starting empty: {e}")
+                index = cls(threshold=threshold, name=name)
+        return index
+
+    def save(self, path: Path) -> None:
+        try:
+            atomic_write_json(path, {"format": 1, "threshold": self.threshold, "entries": self.entries})
+        except Exception as e:
+            logger.warning(f"[{self.name}] Failed to save dedup index: {e}")
+
+    # ------------------------------------------------------------------
+    # Lookup tables
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _bands(sig: List[int]) -> List[Tuple[int, int]]:
+        return [(band, hash(tuple(sig[band * _ROWS : (band + 1) * _ROWS]))) for band in range(_BANDS)]
+
+    def _insert(self, chunk_id: str, entry: Dict[str, Any]) -> None:
+        self.entries[chunk_id] = entry
+        self._exact[entry["digest"]] = chunk_id
+        if entry.get("sig"):
+            for key in self._bands(entry["sig"]):
+                self._buckets.setdefault(key, set()).add(chunk_id)
+        self._by_file.setdefault(entry["file_key"], {})[chunk_id] = chunk_id
+        for alt_id, alt_file in entry["alternates"].items():
+            self._by_file.setdefault(alt_file, {})[alt_id] = chunk_id
+
+    def _discard(self, chunk_id: str) -> Dict[str, Any]:
+        entry = self.entries.pop(chunk_id)
+        if self._exact.get(entry["digest"]) == chunk_id:
+            del self._exact[entry["digest"]]
+        if entry.get("sig"):
+            for key in self._bands(entry["sig"]):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(chunk_id)
+                    if not bucket:
+                        del self._buckets[key]
+        return entry
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def add(self, chunk_id: str, file_key: str, text: str) -> Optional[str]:
+        """Register a chunk; return the canonical chunk id if it duplicates one, else None."""
+        normalized = normalize_text(text)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+        canonical = self._exact.get(digest)
+        sig: List[int] = []
+        if canonical is None and len(normalized) >= _MIN_NEAR_DUP_CHARS:
+            sig = minhash_signature(normalized)
+            canonical = self._near_match(sig)
+            if canonical is not None:
+                self.run_stats["near"] += 1
+        elif canonical is not None:
+            self.run_stats["exact"] += 1
+
+        if canonical is not None and canonical != chunk_id:
+            self.entries[canonical]["alternates"][chunk_id] = file_key
+            self._by_file.setdefault(file_key, {})[chunk_id] = canonical
+            self.run_stats["chars_saved"] += len(text)
+            return canonical
+
+        self._insert(
+            chunk_id, {"file_key": file_key, "digest": digest, "sig": sig, "size": len(text), "alternates": {}}
+        )
+        return None
+
+    def _near_match(self, sig: List[int]) -> Optional[str]:
+        candidates: Set[str] = set()
+        for key in self._bands(sig):
+            candidates.update(self._buckets.get(key, ()))
+        best, best_score = None, self.threshold
+        for candidate in candidates:
+            score = estimate_similarity(sig, self.entries[candidate]["sig"])
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def remove_file(self, file_key: str) -> Set[str]:
+        """Forget every chunk of *file_key*; return files whose chunks depended on it."""
+        dependents: Set[str] = set()
+        for chunk_id, canonical in self._by_file.pop(file_key, {}).items():
+            if chunk_id == canonical:
+                if chunk_id not in self.entries:
+                    continue
+                entry = self._discard(chunk_id)
+                for alt_id, alt_file in entry["alternates"].items():
+                    if alt_file != file_key:
+                        dependents.add(alt_file)
+                        self._by_file.get(alt_file, {}).pop(alt_id, None)
+            elif canonical in self.entries:
+                self.entries[canonical]["alternates"].pop(chunk_id, None)
+        return dependents
+
+    def alternates_of(self, chunk_id: str) -> List[str]:
+        """File keys of the chunks folded into *chunk_id*."""
+        entry = self.entries.get(chunk_id)
+        if not entry:
+            return []
+        return list(dict.fromkeys(entry["alternates"].values()))
+
+    def totals(self) -> Dict[str, int]:
+        duplicates = sum(len(entry["alternates"]) for entry in self.entries.values())
+        chars_saved = sum(entry["size"] * len(entry["alternates"]) for entry in self.entries.values())
+        return {"canonical_chunks": len(self.entries), "duplicate_chunks": duplicates, "chars_saved": chars_saved}
@@ -6,21 +6,61 @@ Handles parsing and metadata extraction from different document formats
 import json
 import re
 from abc import ABC, abstractmethod
+from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, cast
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, cast
 
 import markdown
 import yaml
 
+from .chunking import CodeChunker, MarkdownChunker, TextChunker
 from .constants import COMMENT_PATTERNS, get_language_from_extension, get_language_from_filename, is_code_file
+from .json_stream import iter_json_records, iter_jsonl_records, parse_record_path
 from .logger import get_logger
 
 logger = get_logger(name=__name__)
 
 
+class ProcessorProfile(Enum):
+    """How much metadata processors extract beyond the indexed content"""
+
+    # Content, title and front-matter style fields only
+    MINIMAL = "minimal"
+    # Additionally the scalar statistics that are stored in the vector index
+    STANDARD = "standard"
+    # Everything, including HTML rendering and structural analysis
+    RICH = "rich"
+
+
 class DocumentProcessor(ABC):
     """Abstract base class for document processors"""
 
+    # Bump whenever process() output changes so cached results are invalidated.
+    VERSION = 1
+    # How the knowledge base splits this processor's output into chunks
+    chunker_class: type[TextChunker] = TextChunker
+    # Selects the size limit and content checks applied before processing
+    kind = "document"
+
+    def __init__(self, profile: ProcessorProfile = ProcessorProfile.RICH):
+        self.profile = profile
+
+    def cache_key(self) -> str:
+        """Identify this processor's output format for the parse cache."""
+        return f"{type(self).__name__}:{self.VERSION}:{self.profile.value}"
+
+    def iter_records(self, file_path: Path) -> Optional[Iterator[Dict[str, Any]]]:
+        """Return a stream of per-record results for files indexed record by record.
+
+        Processors that index a file as a single document return None and are
+        handled through ``process``.
+        """
+        return None
+
+    def kind_of(self, file_path: Path) -> str:
+        """Return the pre-filter kind for *file_path* (see ``file_prefilter``)."""
+        return self.kind
+
     @abstractmethod
     def can_process(self, file_path: Path) -> bool:
         """Check if this processor can handle the given file"""
@@ -56,6 +96,8 @@ class MarkdownProcessor(DocumentProcessor):
     """Markdown document processor with enhanced front matter support"""
 
     SUPPORTED_EXTENSIONS = {".md", ".markdown", ".mdown", ".mkd"}
+    chunker_class = MarkdownChunker
+    kind = "markdown"
 
     def can_process(self, file_path: Path) -> bool:
         return file_path.suffix.lower() in self.SUPPORTED_EXTENSIONS
@@ -67,13 +109,15 @@ class MarkdownProcessor(DocumentProcessor):
             return self._get_base_result(file_path)
 
         front_matter, markdown_content = self._parse_front_matter(content)
-        html_content = self._convert_to_html(markdown_content)
-        metadata = self._extract_markdown_metadata(markdown_content, front_matter)
+        metadata: Dict[str, Any] = {}
+        if self.profile is not ProcessorProfile.MINIMAL:
+            metadata = self._extract_markdown_metadata(markdown_content, front_matter)
 
         result = self._get_base_result(file_path, markdown_content)
+        if self.profile is ProcessorProfile.RICH:
+            result["html_content"] = self._convert_to_html(markdown_content)
         result.update(
             {
-                "html_content": html_content,
                 "metadata": {**front_matter, **metadata},
                 "title": front_matter.get("title", file_path.stem),
                 "date": front_matter.get("date", ""),
@@ -116,19 +160,20 @@ class MarkdownProcessor(DocumentProcessor):
         """Extract additional metadata from markdown content"""
         metadata: Dict[str, Any] = {}
 
-        headers = re.findall(r"^(#{1,6})\s+(.+)$", content, re.MULTILINE)
-        if headers:
-            metadata["headers"] = [{"level": len(level), "text": text.strip()} for level, text in headers]
+        if self.profile is ProcessorProfile.RICH:
+            headers = re.findall(r"^(#{1,6})\s+(.+)$", content, re.MULTILINE)
+            if headers:
+                metadata["headers"] = [{"level": len(level), "text": text.strip()} for level, text in headers]
 
-        code_blocks = re.findall(r"```(\w+)?\n(.*?)```", content, re.DOTALL)
-        if code_blocks:
-            metadata["code_languages"] = list({lang for lang, _ in code_blocks if lang})
+            code_blocks = re.findall(r"```(\w+)?\n(.*?)```", content, re.DOTALL)
+            if code_blocks:
+                metadata["code_languages"] = list({lang for lang, _ in code_blocks if lang})
 
-        links = re.findall(r"\[([^\]]+)\]\(([^)]+)\)", content)
-        if links:
-            metadata["external_links"] = [
-                {"text": text, "url": url} for text, url in links if url.startswith(("http://", "https://"))
-            ]
+            links = re.findall(r"\[([^\]]+)\]\(([^)]+)\)", content)
+            if links:
+                metadata["external_links"] = [
+                    {"text": text, "url": url} for text, url in links if url.startswith(("http://", "https://"))
+                ]
 
         word_count = len(re.findall(r"\b\w+\b", content))
         metadata["word_count"] = word_count
@@ -142,6 +187,7 @@ class TextProcessor(DocumentProcessor):
 
     SUPPORTED_EXTENSIONS = {".txt", ".text", ".log", ".readme"}
     SUPPORTED_FILENAMES = {"readme", "changelog", "license"}
+    kind = "text"
 
     def can_process(self, file_path: Path) -> bool:
         return (
@@ -154,7 +200,8 @@ class TextProcessor(DocumentProcessor):
             return self._get_base_result(file_path)
 
         result = self._get_base_result(file_path, content)
-        result["metadata"] = self._analyze_text_content(content)
+        if self.profile is not ProcessorProfile.MINIMAL:
+            result["metadata"] = self._analyze_text_content(content)
         return result
 
     def _analyze_text_content(self, content: str) -> Dict[str, Any]:
@@ -169,12 +216,27 @@ class TextProcessor(DocumentProcessor):
 
 
 class JSONProcessor(DocumentProcessor):
-    """Enhanced JSON document processor"""
+    """Enhanced JSON document processor
+
+    ``.jsonl`` files, and ``.json`` files when ``record_path`` is set (e.g.
+    ``"$.data.items"``), are streamed one record at a time via ``iter_records``.
+    """
+
+    JSONL_EXTENSIONS = {".jsonl", ".ndjson"}
+    kind = "json"
+
+    def __init__(self, profile: ProcessorProfile = ProcessorProfile.RICH, record_path: Optional[str] = None):
+        super().__init__(profile=profile)
+        self.record_path = parse_record_path(record_path)
 
     def can_process(self, file_path: Path) -> bool:
-        return file_path.suffix.lower() == ".json"
+        suffix = file_path.suffix.lower()
+        return suffix == ".json" or suffix in self.JSONL_EXTENSIONS
 
     def process(self, file_path: Path) -> Dict[str, Any]:
+        if file_path.suffix.lower() in self.JSONL_EXTENSIONS:
+            return self._build_result(file_path, [record for _, record in iter_jsonl_records(file_path)])
+
         content = self._safe_read_file(file_path)
         if content is None:
             return self._get_base_result(file_path)
@@ -185,10 +247,35 @@ class JSONProcessor(DocumentProcessor):
             logger.warning("Failed to parse JSON file %s: %s", file_path, e)
             return self._get_base_result(file_path, content)
 
+        return self._build_result(file_path, data)
+
+    def kind_of(self, file_path: Path) -> str:
+        if file_path.suffix.lower() in self.JSONL_EXTENSIONS or self.record_path is not None:
+            return "json_stream"
+        return self.kind
+
+    def iter_records(self, file_path: Path) -> Optional[Iterator[Dict[str, Any]]]:
+        if file_path.suffix.lower() in self.JSONL_EXTENSIONS:
+            return self._record_results(file_path, iter_jsonl_records(file_path))
+        if self.record_path is not None:
+            return self._record_results(file_path, iter_json_records(file_path, self.record_path))
+        return None
+
+    def _record_results(self, file_path: Path, records: Iterator[Tuple[int, Any]]) -> Iterator[Dict[str, Any]]:
+        for index, record in records:
+            result = self._build_result(file_path, record)
+            if "title" not in result["metadata"]:
+                result["title"] = f"{file_path.stem}[{index}]"
+            result["metadata"]["record_index"] = index
+            yield result
+
+    def _build_result(self, file_path: Path, data: Any) -> Dict[str, Any]:
         text_content = self._extract_text_from_json(data)
         metadata = self._extract_json_metadata(data)
 
         result = self._get_base_result(file_path, text_content)
+        if self.profile is ProcessorProfile.RICH:
+            result["raw_data"] = data
         result.update(
             {
                 "metadata": metadata,
@@ -198,7 +285,6 @@ class JSONProcessor(DocumentProcessor):
                 "categories": metadata.get("categories", []),
                 "author": metadata.get("author", ""),
                 "description": metadata.get("description", ""),
-                "raw_data": data,
             }
         )
         return result
@@ -231,31 +317,33 @@ class JSONProcessor(DocumentProcessor):
             for key, value in data.items():
                 if isinstance(value, (str, int, float, bool)) and key != "content":
                     metadata[key] = value
+            if self.profile is ProcessorProfile.MINIMAL:
+                return metadata
             metadata.update(
                 {
-                    "json_structure": {
-                        k: (
-                            "object"
-                            if isinstance(v, dict)
-                            else f"array[{len(v)}]"
-                            if isinstance(v, list)
-                            else type(v).__name__
-                        )
-                        for k, v in data.items()
-                    },
                     "total_keys": len(data),
                     "nested_objects": sum(1 for v in data.values() if isinstance(v, dict)),
                     "arrays": sum(1 for v in data.values() if isinstance(v, list)),
                 }
             )
-        elif isinstance(data, list):
-            metadata.update(
-                {
-                    "json_structure": "array",
-                    "array_length": len(data),
-                    "item_types": list({type(item).__name__ for item in data}),
+            if self.profile is ProcessorProfile.RICH:
+                metadata["json_structure"] = {
+                    k: (
+                        "object"
+                        if isinstance(v, dict)
+                        else f"array[{len(v)}]"
+                        if isinstance(v, list)
+                        else type(v).__name__
+                    )
+                    for k, v in data.items()
                 }
-            )
+        elif isinstance(data, list):
+            if self.profile is ProcessorProfile.MINIMAL:
+                return metadata
+            metadata["array_length"] = len(data)
+            if self.profile is ProcessorProfile.RICH:
+                metadata["json_structure"] = "array"
+                metadata["item_types"] = list({type(item).__name__ for item in data})
 
         return metadata
 
@@ -263,6 +351,9 @@ class JSONProcessor(DocumentProcessor):
 class CodeProcessor(DocumentProcessor):
     """Enhanced code file processor with comprehensive language support"""
 
+    chunker_class = CodeChunker
+    kind = "code"
+
     # Metadata keys that may appear in header comments
     _HEADER_PATTERNS = [
         (r"@?author:?\s*(.+)", "author"),
@@ -308,21 +399,15 @@ class CodeProcessor(DocumentProcessor):
         return get_language_from_extension(file_path.suffix.lower())
 
     def _extract_code_metadata(self, content: str, language: str) -> Dict[str, Any]:
+        if self.profile is ProcessorProfile.MINIMAL:
+            return {}
+
         lines = content.splitlines()
         metadata: Dict[str, Any] = {}
 
         metadata.update(self._extract_header_metadata(lines, language))
-        metadata["code_stats"] = self._extract_code_stats(content, language)
-
-        dependencies = self._extract_dependencies(lines, language)
-        if dependencies:
-            metadata["dependencies"] = dependencies
-
-        signatures = self._extract_signatures(lines, language)
-        if signatures:
-            metadata["signatures"] = signatures
-
-        metadata["complexity"] = self._analyze_complexity(content, language)
+        if self.profile is ProcessorProfile.RICH:
+            metadata.update(self._scan_code_lines(lines, language))
         return metadata
 
     def _extract_header_metadata(self, lines: List[str], language: str) -> Dict[str, Any]:
@@ -376,8 +461,8 @@ class CodeProcessor(DocumentProcessor):
                     break
         return metadata
 
-    def _extract_code_stats(self, content: str, language: str) -> Dict[str, Any]:
-        lines = content.splitlines()
+    def _scan_code_lines(self, lines: List[str], language: str) -> Dict[str, Any]:
+        """Collect code stats, dependencies, signatures and complexity in a single pass."""
         stats: Dict[str, Any] = {
             "total_lines": len(lines),
             "blank_lines": 0,
@@ -388,14 +473,76 @@ class CodeProcessor(DocumentProcessor):
             "imports": 0,
             "complexity_indicators": 0,
         }
+        complexity: Dict[str, Any] = {
+            "cyclomatic_complexity": 0,
+            "nesting_level": 0,
+            "long_functions": 0,
+        }
+        deps: List[str] = []
+        signatures: List[Dict[str, Any]] = []
 
         single_comment = COMMENT_PATTERNS["single_line"].get(language)
         block_start = COMMENT_PATTERNS["block_start"].get(language)
         block_end = COMMENT_PATTERNS["block_end"].get(language)
+        is_python = language == "python"
+        is_js = language in ("javascript", "typescript")
+        is_java = language == "java"
+
         in_block_comment = False
+        max_indent = 0
+        function_lines = 0
+        in_function = False
 
-        for line in lines:
+        for i, line in enumerate(lines):
             stripped = line.strip()
+            indent = len(line) - len(line.lstrip())
+            if indent > max_indent:
+                max_indent = indent
+
+            # Dependencies, signatures and complexity look at every line, comments included.
+            if is_python:
+                if stripped.startswith("import "):
+                    deps.append(stripped[7:].split(" as ")[0].split(".")[0].strip())
+                elif stripped.startswith("from "):
+                    deps.append(stripped[5:].split(" import ")[0].split(".")[0].strip())
+
+                if stripped.startswith("def ") or stripped.startswith("class "):
+                    sig_type = "function" if stripped.startswith("def ") else "class"
+                    signatures.append({"type": sig_type, "signature": stripped, "line": i + 1})
+
+                if any(kw in stripped for kw in ("if ", "elif ", "for ", "while ", "try:", "except", "with ")):
+                    complexity["cyclomatic_complexity"] += 1
+
+                if stripped.startswith("def "):
+                    if in_function and function_lines > 50:
+                        complexity["long_functions"] += 1
+                    in_function = True
+                    function_lines = 0
+                elif in_function:
+                    if stripped and line[0] not in (" ", "\t"):
+                        if function_lines > 50:
+                            complexity["long_functions"] += 1
+                        in_function = False
+                    else:
+                        function_lines += 1
+            elif is_js:
+                if stripped.startswith("import "):
+                    m = re.search(r'from [\'"]([^\'"]+)[\'"]', stripped)
+                    if m:
+                        deps.append(m.group(1))
+                elif "require(" in stripped:
+                    m = re.search(r'require\([\'"]([^\'"]+)[\'"]\)', stripped)
+                    if m:
+                        deps.append(m.group(1))
+
+                if "function " in stripped or "=>" in stripped or stripped.startswith("class "):
+                    sig_type = "class" if stripped.startswith("class ") else "function"
+                    signatures.append({"type": sig_type, "signature": stripped, "line": i + 1})
+            elif is_java:
+                if stripped.startswith("import "):
+                    deps.append(stripped[7:].rstrip(";").split(".")[0])
+
+            # Line classification for code stats
             if not stripped:
                 stats["blank_lines"] += 1
                 continue
@@ -414,7 +561,17 @@ class CodeProcessor(DocumentProcessor):
             stats["code_lines"] += 1
             self._count_language_constructs(stripped, language, stats)
 
-        return stats
+        if in_function and function_lines > 50:
+            complexity["long_functions"] += 1
+        complexity["nesting_level"] = max_indent // 4 if is_python else max_indent // 2
+
+        metadata: Dict[str, Any] = {"code_stats": stats}
+        if deps:
+            metadata["dependencies"] = list(dict.fromkeys(deps))
+        if signatures:
+            metadata["signatures"] = signatures
+        metadata["complexity"] = complexity
+        return metadata
 
     def _count_language_constructs(self, line: str, language: str, stats: Dict[str, Any]) -> None:
         if language == "python":
@@ -447,89 +604,6 @@ class CodeProcessor(DocumentProcessor):
             elif any(kw in line for kw in ("if(", "if ", "for(", "while(", "switch(")):
                 stats["complexity_indicators"] += 1
 
-    def _extract_dependencies(self, lines: List[str], language: str) -> List[str]:
-        deps: List[str] = []
-        for line in lines:
-            stripped = line.strip()
-            if language == "python":
-                if stripped.startswith("import "):
-                    deps.append(stripped[7:].split(" as ")[0].split(".")[0].strip())
-                elif stripped.startswith("from "):
-                    deps.append(stripped[5:].split(" import ")[0].split(".")[0].strip())
-            elif language in ("javascript", "typescript"):
-                if stripped.startswith("import "):
-                    m = re.search(r'from [\'"]([^\'"]+)[\'"]', stripped)
-                    if m:
-                        deps.append(m.group(1))
-                elif "require(" in stripped:
-                    m = re.search(r'require\([\'"]([^\'"]+)[\'"]\)', stripped)
-                    if m:
-                        deps.append(m.group(1))
-            elif language == "java":
-                if stripped.startswith("import "):
-                    deps.append(stripped[7:].rstrip(";").split(".")[0])
-        return list(set(deps))
-
-    def _extract_signatures(self, lines: List[str], language: str) -> List[Dict[str, Any]]:
-        signatures = []
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            if language == "python":
-                if stripped.startswith("def ") or stripped.startswith("class "):
-                    signatures.append(
-                        {
-                            "type": "function" if stripped.startswith("def ") else "class",
-                            "signature": stripped,
-                            "line": i + 1,
-                        }
-                    )
-            elif language in ("javascript", "typescript"):
-                if "function " in stripped or "=>" in stripped or stripped.startswith("class "):
-                    sig_type = "class" if stripped.startswith("class ") else "function"
-                    signatures.append({"type": sig_type, "signature": stripped, "line": i + 1})
-        return signatures
-
-    def _analyze_complexity(self, content: str, language: str) -> Dict[str, Any]:
-        complexity: Dict[str, Any] = {
-            "cyclomatic_complexity": 0,
-            "nesting_level": 0,
-            "long_functions": 0,
-        }
-
-        lines = content.splitlines()
-        max_indent = 0
-        function_lines = 0
-        in_function = False
-
-        for line in lines:
-            indent = len(line) - len(line.lstrip())
-            if indent > max_indent:
-                max_indent = indent
-
-            stripped = line.strip()
-            if language == "python":
-                if any(kw in stripped for kw in ("if ", "elif ", "for ", "while ", "try:", "except", "with ")):
-                    complexity["cyclomatic_complexity"] += 1
-
-                if stripped.startswith("def "):
-                    if in_function and function_lines > 50:
-                        complexity["long_functions"] += 1
-                    in_function = True
-                    function_lines = 0
-                elif in_function:
-                    if stripped and line[0] not in (" ", "\t"):
-                        if function_lines > 50:
-                            complexity["long_functions"] += 1
-                        in_function = False
-                    else:
-                        function_lines += 1
-
-        if in_function and function_lines > 50:
-            complexity["long_functions"] += 1
-
-        complexity["nesting_level"] = max_indent // 4 if language == "python" else max_indent // 2
-        return complexity
-
 
 # =============================================================================
 # Processor Factory and Registry
@@ -3,25 +3,62 @@ Generic embedding knowledge base system.
 Converts various document types into a vector database for AI retrieval.
 """
 
+import contextlib
 import copy
 import hashlib
 import json
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
 
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from .doc_processor import CodeProcessor, DocumentProcessor, JSONProcessor, MarkdownProcessor, TextProcessor
+from .chunking import Chunk, TextChunker
+from .dedup import DEDUP_FILE, DedupIndex
+from .doc_processor import (
+    CodeProcessor,
+    DocumentProcessor,
+    JSONProcessor,
+    MarkdownProcessor,
+    ProcessorProfile,
+    TextProcessor,
+)
+from .ekb_catalog import summarize, write_summary
+from .ekb_generations import PARSE_CACHE_DIR, GenerationStore, atomic_write_json
+from .ekb_metrics import EKBMetrics, InstrumentedEmbedding, StageTimer
+from .file_prefilter import FilePrefilter, SkipReason
 from .gitignore import GitIgnoreChecker
 from .logger import get_logger
+from .metadata_index import MetadataIndex, normalize_filters
+from .parse_cache import ParseCache
 from .regex_pattern_filter import FilterOrder, RegexPatternFilter
-from .vector_db import VectorDatabaseFactory
+from .vector_db import VectorDatabaseInterface
+from .vector_db_sharded import ShardedVectorDatabase, create_vector_db
 
 logger = get_logger(name=__name__)
 
+# Weight of each signal in the relevance score used to rerank vector hits
+DEFAULT_RERANK_WEIGHTS = {"vector": 0.4, "keyword": 0.3, "title": 0.2, "metadata": 0.1}
+# Search settings persisted in config.json; changing them does not require a rebuild
+QUERY_SETTING_KEYS = ("search_k", "rerank_weights")
+# Embedding model used by EKB (and lorebook semantic triggers) unless configured otherwise
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+
+def load_embeddings(model_name: str = DEFAULT_EMBEDDING_MODEL, device: str = "cpu") -> Embeddings:
+    """HuggingFace embedding model producing unit-length vectors (shared by EKB and lorebooks)."""
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={"device": device},
+        encode_kwargs={"normalize_embeddings": True},
+    )
+
 
 class EKBConfig:
     def __init__(
@@ -29,7 +66,7 @@ class EKBConfig:
         name: str = "default",
         source_paths: Optional[list[str]] = None,
         vector_db_path: str = "data/vector_db",
-        embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        embedding_model: str = DEFAULT_EMBEDDING_MODEL,
         embedding_device: str = "cpu",
         chunk_size: int = 2000,
         chunk_overlap: int = 100,
@@ -41,6 +78,13 @@ class EKBConfig:
         include_patterns: Optional[list[str]] = None,
         filter_order: FilterOrder = FilterOrder.EXCLUDE_FIRST,
         use_gitignore: bool = True,
+        processor_profile: ProcessorProfile | str = ProcessorProfile.STANDARD,
+        json_record_path: Optional[str] = None,
+        max_file_sizes: Optional[dict[str, Optional[int]]] = None,
+        dedup: bool = False,
+        dedup_threshold: float = 0.9,
+        shards: int = 1,
+        rerank_weights: Optional[dict[str, float]] = None,
     ):
         self.name = name
         self.source_paths = source_paths
@@ -57,15 +101,47 @@ class EKBConfig:
         self.include_patterns = include_patterns
         self.filter_order = filter_order
         self.use_gitignore = use_gitignore
+        self.processor_profile = ProcessorProfile(processor_profile)
+        # JSON path (e.g. "$.items") whose array elements are indexed as separate documents
+        self.json_record_path = json_record_path or None
+        # Per processor kind ("markdown", "text", "code", "json", ...) in bytes; None = unlimited
+        self.max_file_sizes = max_file_sizes
+        # Store exact / near-duplicate chunks once (MinHash similarity >= dedup_threshold)
+        self.dedup = dedup
+        self.dedup_threshold = dedup_threshold
+        # Hash-partition chunks across this many backend instances (1 = unsharded)
+        self.shards = shards
+        unknown = set(rerank_weights or {}) - set(DEFAULT_RERANK_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown rerank weights: {', '.join(sorted(unknown))}")
+        # Missing signals keep their default weight
+        self.rerank_weights = {**DEFAULT_RERANK_WEIGHTS, **(rerank_weights or {})}
+
+
+@dataclass
+class _PendingGeneration:
+    """A generation being rebuilt while readers keep using the current one."""
+
+    generation_id: str
+    path: Path
+    vector_db: VectorDatabaseInterface
+    config: dict[str, Any]
+    metadata: dict[str, Any] = field(default_factory=dict)
+    dedup: Optional[DedupIndex] = None
 
 
 class EmbeddingKnowledgeBase:
     """Generic embedding knowledge base manager."""
 
+    # Documents embedded and written to the vector store per call
+    _STORE_BATCH_SIZE = 256
+    _HASH_BLOCK_SIZE = 1 << 20
+
     def __init__(
         self,
         config: EKBConfig,
         custom_processors: Optional[list[DocumentProcessor]] = None,
+        embeddings: Optional[Embeddings] = None,
     ):
         self.config = config
 
@@ -84,39 +160,49 @@ class EmbeddingKnowledgeBase:
             filter_order=config.filter_order,
         )
         self.git_ignore_checker = GitIgnoreChecker(working_directory=Path.cwd()) if config.use_gitignore else None
+        self.prefilter = FilePrefilter(config.max_file_sizes, name=config.name)
 
+        profile = config.processor_profile
         self.processors: list[DocumentProcessor] = [
-            MarkdownProcessor(),
-            TextProcessor(),
-            JSONProcessor(),
-            CodeProcessor(),
+            MarkdownProcessor(profile=profile),
+            TextProcessor(profile=profile),
+            JSONProcessor(profile=profile, record_path=config.json_record_path),
+            CodeProcessor(profile=profile),
         ]
         if custom_processors:
             self.processors.extend(custom_processors)
 
-        self._embeddings: Optional[HuggingFaceEmbeddings] = None
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=config.chunk_size,
-            chunk_overlap=config.chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", "。", "！", "？", "；", "，", " ", ""],
-        )
+        # A preset model (e.g. a fake one for benchmarks) bypasses lazy loading of any configured model
+        self._embeddings: Optional[Embeddings] = embeddings
+        # Models loaded so far by name; a pending rebuild may use a different one than the served generation
+        self._models: dict[str, Embeddings] = {}
+        # Backends embed through this wrapper so time spent in the model lands in the active timer
+        self._instrumented_embedding = InstrumentedEmbedding(self)
+        self._timer: Optional[StageTimer] = None
+        self.metrics = EKBMetrics(config.name)
+        self.last_search_metrics: Optional[dict[str, Any]] = None
+        self.text_chunker = TextChunker(config.chunk_size, config.chunk_overlap)
+        self.text_splitter = self.text_chunker.splitter
+        self._chunkers: dict[type[TextChunker], TextChunker] = {TextChunker: self.text_chunker}
+
+        self.parse_cache = ParseCache(self.vector_db_path / PARSE_CACHE_DIR, name=config.name)
 
         self.db_type = config.db_type
         self.debug_mode = config.debug_mode
 
-        self.vector_db = VectorDatabaseFactory.create_database(
-            db_type=config.db_type,
-            persist_directory=str(self.vector_db_path),
-            embedding_function=None,
-            name=config.name,
-            debug_mode=config.debug_mode,
-        )
-        self.vector_db._lazy_embedding_getter = lambda: self.embeddings
-
+        # The saved config describes the served generation's layout (shards, model), so load it first
         self.config_file = self.vector_db_path / "config.json"
-        self.metadata_file = self.vector_db_path / "metadata.json"
         self._load_config()
+
+        self.generations = GenerationStore(self.vector_db_path, name=config.name)
+        self.generation_id, self.generation_path = self.generations.ensure_active()
+        self.vector_db = self._create_vector_db(self.generation_path)
+        self.dedup = self._load_dedup(self.generation_path)
+        self._pending: Optional[_PendingGeneration] = None
+        # Config of a rebuild waiting for the next update, which allocates its generation
+        self._pending_config: Optional[dict[str, Any]] = None
+        self._metadata_index: Optional[MetadataIndex] = None
+
         self._load_metadata()
         self._save_config()
 
@@ -125,19 +211,52 @@ class EmbeddingKnowledgeBase:
     # ------------------------------------------------------------------
 
     @property
-    def embeddings(self) -> HuggingFaceEmbeddings:
-        """Lazy-initialised embedding model."""
-        if self._embeddings is None:
-            logger.info(
-                f"Initializing embedding model '{self.config.embedding_model}' "
-                f"on device '{self.config.embedding_device}'"
-            )
-            self._embeddings = HuggingFaceEmbeddings(
-                model_name=self.config.embedding_model,
-                model_kwargs={"device": self.config.embedding_device},
-                encode_kwargs={"normalize_embeddings": True},
-            )
-        return self._embeddings
+    def embeddings(self) -> Embeddings:
+        """Lazy-initialised model of the served generation."""
+        return self.embeddings_for(self.served_embedding_model)
+
+    @property
+    def served_embedding_model(self) -> str:
+        """Model the served generation was built with; a pending config change applies on flip."""
+        return self.saved_config.get("embedding_model") or self.config.embedding_model
+
+    @property
+    def served_shards(self) -> int:
+        """Shard count the served generation was built with; a new KB uses the configured one."""
+        if not self.saved_config:
+            return self.config.shards
+        return self.saved_config.get("shards") or 1
+
+    def embeddings_for(self, model_name: str) -> Embeddings:
+        """Lazy-initialised embedding model *model_name* (or the preset model, if one was given)."""
+        if self._embeddings is not None:
+            return self._embeddings
+        model = self._models.get(model_name)
+        if model is None:
+            logger.info(f"Initializing embedding model '{model_name}' on device '{self.config.embedding_device}'")
+            started = time.perf_counter()
+            model = self._models[model_name] = load_embeddings(model_name, self.config.embedding_device)
+            elapsed = time.perf_counter() - started
+            self.metrics.model_load_seconds = round(elapsed, 3)
+            if self._timer is not None:
+                self._timer.add("model_load", elapsed)
+        return model
+
+    @property
+    def metadata_file(self) -> Path:
+        return self.generation_path / "metadata.json"
+
+    @property
+    def rebuild_pending(self) -> bool:
+        """True while a config change waits for the next update to build its generation."""
+        return self._pending_config is not None
+
+    @property
+    def metadata_index(self) -> MetadataIndex:
+        """Secondary indexes over file metadata, rebuilt lazily after the metadata changes."""
+        if self._metadata_index is None:
+            self._metadata_index = MetadataIndex.build(self.metadata, self.source_paths)
+        return self._metadata_index
 
     # ------------------------------------------------------------------
     # Config / metadata persistence
@@ -145,6 +264,7 @@ class EmbeddingKnowledgeBase:
 
     def _load_metadata(self) -> None:
         self.metadata: dict[str, Any] = {}
+        self._metadata_index = None
         if self.metadata_file.exists():
             try:
                 with open(self.metadata_file, "r", encoding="utf-8") as f:
@@ -152,10 +272,9 @@ class EmbeddingKnowledgeBase:
             except Exception as e:
                 logger.warning(f"[{self.config.name}] Failed to load metadata: {e}")
 
-    def _save_metadata(self) -> None:
+    def _save_metadata(self, metadata: Optional[dict[str, Any]] = None, path: Optional[Path] = None) -> None:
         try:
-            with open(self.metadata_file, "w", encoding="utf-8") as f:
-                json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+            atomic_write_json(path or self.metadata_file, self.metadata if metadata is None else metadata)
         except Exception as e:
             logger.warning(f"[{self.config.name}] Failed to save metadata: {e}")
 
@@ -178,20 +297,47 @@ class EmbeddingKnowledgeBase:
             "include_patterns": self.config.include_patterns,
             "filter_order": self.config.filter_order.value,
             "use_gitignore": self.config.use_gitignore,
+            "chunk_size": self.config.chunk_size,
+            "chunk_overlap": self.config.chunk_overlap,
+            "embedding_model": self.config.embedding_model,
+            "processor_profile": self.config.processor_profile.value,
+            "json_record_path": self.config.json_record_path or "",
+            "dedup": self.config.dedup,
+            "dedup_threshold": self.config.dedup_threshold,
+            "shards": self.config.shards,
+            "search_k": self.config.search_k,
+            "rerank_weights": self.config.rerank_weights,
         }
 
         if self.has_config_changed(**new_config):
             new_config["created_at"] = self.saved_config.get("created_at", datetime.now().isoformat())
-            self._clear_database()
+            if self.vector_db.exists():
+                # Keep serving the current generation; config.json is written on flip.
+                self._pending_config = new_config
+                logger.info(
+                    f"[{self.config.name}] Config changed — the next update rebuilds into a new generation; "
+                    f"still serving {self.generation_id}"
+                )
+                return
             self.metadata = {}
-        else:
-            new_config = copy.deepcopy(self.saved_config)
-            new_config["updated_at"] = datetime.now().isoformat()
-
+            served_shards = self.served_shards
+            self._write_config(new_config)
+            if self.served_shards != served_shards:
+                # Nothing is stored yet, so the new layout applies right away
+                self.vector_db = self._create_vector_db(self.generation_path)
+            return
+
+        saved = copy.deepcopy(self.saved_config)
+        for key, value in new_config.items():
+            saved.setdefault(key, value)
+        for key in QUERY_SETTING_KEYS:
+            saved[key] = new_config[key]
+        saved["updated_at"] = datetime.now().isoformat()
+        self._write_config(saved)
+
+    def _write_config(self, new_config: dict[str, Any]) -> None:
         try:
-            self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(new_config, f, ensure_ascii=False, indent=2)
+            atomic_write_json(self.config_file, new_config)
             self.saved_config = new_config
             logger.info(f"[{self.config.name}] Saved config: {new_config}")
         except Exception as e:
@@ -204,15 +350,35 @@ class EmbeddingKnowledgeBase:
         include_patterns: Optional[list[str]] = None,
         filter_order: Optional[str] = None,
         use_gitignore: Optional[bool] = None,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+        embedding_model: Optional[str] = None,
+        processor_profile: Optional[str] = None,
+        json_record_path: Optional[str] = None,
+        dedup: Optional[bool] = None,
+        dedup_threshold: Optional[float] = None,
+        shards: Optional[int] = None,
         **_kwargs: Any,
     ) -> bool:
-        """Return True if any supplied parameter differs from the saved config."""
+        """Return True if any supplied parameter differs from the saved config.
+
+        Chunking, model and processor settings are only compared when the saved
+        config records them, so configs written before they were tracked stay valid.
+        """
         checks: list[tuple[Any, str, Any]] = [
             (source_paths, "source_paths", lambda a, b: set(a or []) != set(b or [])),
             (exclude_patterns, "exclude_patterns", lambda a, b: set(a or []) != set(b or [])),
             (include_patterns, "include_patterns", lambda a, b: set(a or []) != set(b or [])),
             (filter_order, "filter_order", lambda a, b: a != b),
             (use_gitignore, "use_gitignore", lambda a, b: a != b),
+            (chunk_size, "chunk_size", lambda a, b: b is not None and a != b),
+            (chunk_overlap, "chunk_overlap", lambda a, b: b is not None and a != b),
+            (embedding_model, "embedding_model", lambda a, b: b is not None and a != b),
+            (processor_profile, "processor_profile", lambda a, b: b is not None and a != b),
+            (json_record_path, "json_record_path", lambda a, b: a != (b or "")),
+            (dedup, "dedup", lambda a, b: a != bool(b)),
+            (dedup_threshold, "dedup_threshold", lambda a, b: b is not None and a != b),
+            (shards, "shards", lambda a, b: a != (b or 1)),
         ]
 
         changed = False
@@ -230,11 +396,87 @@ class EmbeddingKnowledgeBase:
     # Database helpers
     # ------------------------------------------------------------------
 
-    def _clear_database(self) -> None:
-        if self.vector_db.clear():
-            logger.info(f"[{self.config.name}] Database cleared.")
-        else:
-            logger.warning(f"[{self.config.name}] Failed to clear database.")
+    def _create_vector_db(
+        self, persist_directory: Path, embedding_model: Optional[str] = None, shards: Optional[int] = None
+    ) -> VectorDatabaseInterface:
+        """Open a generation's store; without *embedding_model* / *shards* it uses the served generation's."""
+        vector_db = create_vector_db(
+            db_type=self.db_type,
+            persist_directory=str(persist_directory),
+            shards=shards or self.served_shards,
+            name=self.config.name,
+            debug_mode=self.debug_mode,
+        )
+        embedding = (
+            self._instrumented_embedding if embedding_model is None else InstrumentedEmbedding(self, embedding_model)
+        )
+        vector_db._lazy_embedding_getter = lambda: embedding
+        return vector_db
+
+    def _load_dedup(self, generation_path: Path) -> Optional[DedupIndex]:
+        if not self.config.dedup:
+            return None
+        return DedupIndex.load(generation_path / DEDUP_FILE, self.config.dedup_threshold, name=self.config.name)
+
+    # ------------------------------------------------------------------
+    # Generations
+    # ------------------------------------------------------------------
+
+    def _begin_rebuild(self) -> Optional[_PendingGeneration]:
+        """Allocate the pending config's generation, once an update actually starts."""
+        if self._pending is None and self._pending_config is not None:
+            generation_id, path = self.generations.create()
+            self._pending = _PendingGeneration(
+                generation_id=generation_id,
+                path=path,
+                # Embedded with the new model; the served generation keeps its own until the flip
+                vector_db=self._create_vector_db(
+                    path, self._pending_config["embedding_model"], self._pending_config["shards"]
+                ),
+                config=self._pending_config,
+                dedup=self._load_dedup(path),
+            )
+            logger.info(
+                f"[{self.config.name}] Rebuilding into generation {generation_id}; still serving {self.generation_id}"
+            )
+        return self._pending
+
+    def _commit_rebuild(self) -> None:
+        """Persist the pending generation and atomically make it the served one."""
+        pending = self._pending
+        if pending is None:
+            return
+        self._save_metadata(pending.metadata, pending.path / "metadata.json")
+        self._write_config(pending.config)
+        self.generations.flip(pending.generation_id)
+        self.generation_id = pending.generation_id
+        self.generation_path = pending.path
+        self.vector_db = pending.vector_db
+        self.metadata = pending.metadata
+        self._metadata_index = None
+        self.dedup = pending.dedup
+        self._pending = None
+        self._pending_config = None
+
+    def _sync_generation(self) -> None:
+        """Follow a pointer flip made by another process or instance."""
+        current = self.generations.current_id()
+        if not current or current == self.generation_id:
+            return
+        path = self.generations.path_for(current)
+        if not path.is_dir():
+            return
+        logger.info(f"[{self.config.name}] Switching to generation {current}")
+        # config.json is written before the flip; it records the new generation's model
+        pending_config = self._pending_config
+        self._load_config()
+        if pending_config is not None and self._pending is None and not self.has_config_changed(**pending_config):
+            self._pending_config = None
+        self.generation_id = current
+        self.generation_path = path
+        self.vector_db = self._create_vector_db(path)
+        self.dedup = self._load_dedup(path)
+        self._load_metadata()
 
     # ------------------------------------------------------------------
     # File helpers
@@ -242,12 +484,54 @@ class EmbeddingKnowledgeBase:
 
     def _get_file_hash(self, file_path: Path) -> str:
         try:
+            digest = hashlib.md5()
             with open(file_path, "rb") as f:
-                return hashlib.md5(f.read()).hexdigest()
+                while block := f.read(self._HASH_BLOCK_SIZE):
+                    digest.update(block)
+            return digest.hexdigest()
         except Exception as e:
             logger.warning(f"Failed to hash {file_path}: {e}")
             return ""
 
+    def _is_skip_current(self, previous: dict[str, Any], stat: os.stat_result, kind: str) -> bool:
+        """True if the file was skipped before and neither it nor its size limit has changed."""
+        if "skipped" not in previous:
+            return False
+        if previous.get("size") != stat.st_size or previous.get("mtime_ns") != stat.st_mtime_ns:
+            return False
+        if previous["skipped"] == SkipReason.TOO_LARGE.value:
+            return previous.get("size_limit") == self.prefilter.size_limit(kind)
+        return True
+
+    def _skip_entry(self, file_path: Path, stat: os.stat_result, kind: str, reason: SkipReason) -> dict[str, Any]:
+        return {
+            "skipped": reason.value,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "size_limit": self.prefilter.size_limit(kind),
+            "last_updated": datetime.now().isoformat(),
+            "title": file_path.stem,
+            "file_type": file_path.suffix.lower(),
+            "file_path": str(file_path),
+            "display_source": self._get_display_source(file_path),
+        }
+
+    def _delete_file_documents(
+        self,
+        vector_db: VectorDatabaseInterface,
+        file_key: str,
+        previous: dict[str, Any],
+        keep_run: Optional[str] = None,
+    ) -> None:
+        """Delete the chunks stored for *file_key*, except those written by update *keep_run*."""
+        if "hash" not in previous or not vector_db.exists():
+            return
+        criteria: dict[str, Any] = {"file_key": file_key}
+        if keep_run is not None:
+            criteria = {"$and": [criteria, {"update_run": {"$ne": keep_run}}]}
+        if not vector_db.delete_documents(criteria):
+            logger.warning(f"[{self.config.name}] Failed to delete old docs for {file_key}")
+
     def _find_processor(self, file_path: Path) -> Optional[DocumentProcessor]:
         return next((p for p in self.processors if p.can_process(file_path)), None)
 
@@ -279,11 +563,6 @@ class EmbeddingKnowledgeBase:
                 continue
         return str(file_path)
 
-    def _should_update_file(self, file_path: Path) -> bool:
-        file_key = self._get_unique_file_key(file_path)
-        stored_hash = self.metadata.get(file_key, {}).get("hash", "")
-        return self._get_file_hash(file_path) != stored_hash
-
     def get_supported_extensions(self) -> list[str]:
         extensions: set[str] = set()
         for processor in self.processors:
@@ -298,6 +577,68 @@ class EmbeddingKnowledgeBase:
     # Document building helpers
     # ------------------------------------------------------------------
 
+    def _chunker_for(self, processor: DocumentProcessor) -> TextChunker:
+        chunker_class = processor.chunker_class
+        if chunker_class not in self._chunkers:
+            self._chunkers[chunker_class] = chunker_class(self.config.chunk_size, self.config.chunk_overlap)
+        return self._chunkers[chunker_class]
+
+    def _parse_and_split(
+        self,
+        file_path: Path,
+        file_hash: str,
+        processor: DocumentProcessor,
+    ) -> tuple[dict[str, Any], list[Chunk]]:
+        """Return parsed content and chunks, reusing the parse cache when possible."""
+        processor_key = processor.cache_key()
+        chunker = self._chunker_for(processor)
+        parsed_content, cached_chunks = self.parse_cache.get(file_hash, file_path, processor_key, chunker.key)
+        if parsed_content is not None and cached_chunks is not None:
+            return parsed_content, [Chunk(**c) for c in cached_chunks]
+
+        if parsed_content is None:
+            parsed_content = processor.process(file_path)
+        chunks = chunker.split(parsed_content)
+        self.parse_cache.put(
+            file_hash, file_path, processor_key, parsed_content, chunker.key, [asdict(c) for c in chunks]
+        )
+        return parsed_content, chunks
+
+    @staticmethod
+    def _chunk_id(file_key: str, chunk_index: Any, record_index: Any = None) -> str:
+        if record_index is None:
+            return f"{file_key}#{chunk_index}"
+        return f"{file_key}#{record_index}.{chunk_index}"
+
+    def _dedup_chunks(
+        self,
+        dedup: Optional[DedupIndex],
+        file_key: str,
+        chunks: list[Chunk],
+        parsed_content: dict[str, Any],
+    ) -> set[int]:
+        """Register chunks with the dedup index; return indexes of chunks already stored elsewhere."""
+        if dedup is None:
+            return set()
+        record_index = parsed_content.get("metadata", {}).get("record_index")
+        return {
+            i
+            for i, chunk in enumerate(chunks)
+            if dedup.add(self._chunk_id(file_key, i, record_index), file_key, chunk.text) is not None
+        }
+
+    @staticmethod
+    def _dedup_report(dedup: DedupIndex, stored: int, store_seconds: float) -> dict[str, Any]:
+        stats = dedup.run_stats
+        skipped = stats["exact"] + stats["near"]
+        return {
+            "exact_duplicates": stats["exact"],
+            "near_duplicates": stats["near"],
+            "chars_saved": stats["chars_saved"],
+            # Extrapolated from the measured embed-and-store time of the chunks that were stored
+            "estimated_seconds_saved": round(store_seconds / stored * skipped, 3) if stored else 0.0,
+        }
+
     @staticmethod
     def _filter_metadata(raw: dict[str, Any]) -> dict[str, Any]:
         """Keep only metadata values that are ChromaDB-compatible scalars."""
@@ -312,9 +653,10 @@ class EmbeddingKnowledgeBase:
         self,
         parsed_content: dict[str, Any],
         file_path: Path,
-        chunks: list[str],
+        chunks: list[Chunk],
+        skip: Optional[set[int]] = None,
     ) -> list[Document]:
-        """Convert chunks from a processed file into Document objects."""
+        """Convert chunks from a processed file into Document objects, leaving out indexes in *skip*."""
         file_key = self._get_unique_file_key(file_path)
         display_source = self._get_display_source(file_path)
         documents: list[Document] = []
@@ -332,6 +674,8 @@ class EmbeddingKnowledgeBase:
         header += "\n"
 
         for i, chunk in enumerate(chunks):
+            if skip and i in skip:
+                continue
             try:
                 base_metadata: dict[str, Any] = {
                     "source": display_source,
@@ -350,10 +694,12 @@ class EmbeddingKnowledgeBase:
                 for key, value in parsed_content.get("metadata", {}).items():
                     if key not in base_metadata and isinstance(value, (str, int, float, bool)):
                         base_metadata[key] = value
+                for key, value in chunk.metadata.items():
+                    base_metadata.setdefault(key, value)
 
                 documents.append(
                     Document(
-                        page_content=header + chunk,
+                        page_content=header + chunk.text,
                         metadata=self._filter_metadata(base_metadata),
                     )
                 )
@@ -393,6 +739,7 @@ class EmbeddingKnowledgeBase:
                 self.vector_db.create_from_documents(new_documents)
             else:
                 self.vector_db.add_documents(new_documents)
+            self._write_summary()
 
         return {
             "success": True,
@@ -402,7 +749,24 @@ class EmbeddingKnowledgeBase:
 
     def update_knowledge_base(self, file_patterns: Optional[list[str]] = None) -> dict[str, Any]:
         """Update knowledge base from source paths."""
+        timer = StageTimer("update")
+        self._timer = timer
+        try:
+            result = self._run_update(file_patterns, timer)
+        finally:
+            self._timer = None
+        embed_seconds = timer.stages.get("embed_documents", 0.0) + timer.stages.get("store", 0.0)
+        chunks = timer.counters.get("chunks_embedded", 0)
+        result["metrics"] = self.metrics.record(
+            timer, chunks_per_second=round(chunks / embed_seconds, 2) if embed_seconds else None
+        )
+        if result["success"]:
+            self._write_summary()
+        return result
+
+    def _run_update(self, file_patterns: Optional[list[str]], timer: StageTimer) -> dict[str, Any]:
         logger.info(f"[{self.config.name}] Starting knowledge base update")
+        discover_started = time.perf_counter()
 
         all_files: list[Path] = []
         for source_path in self.source_paths:
@@ -414,7 +778,7 @@ class EmbeddingKnowledgeBase:
                 if not self._should_ignore_file(source_path, source_path.parent):
                     all_files.append(source_path)
             else:
-                patterns = file_patterns or ["*.md", "*.txt", "*.json", "*.markdown"]
+                patterns = file_patterns or ["*.md", "*.txt", "*.json", "*.jsonl", "*.markdown"]
                 for pattern in patterns:
                     found_files = list(source_path.rglob(pattern))
 
@@ -439,98 +803,311 @@ class EmbeddingKnowledgeBase:
                                 all_files.append(fp)
 
         logger.info(f"[{self.config.name}] Found {len(all_files)} files")
+        timer.add("discover", time.perf_counter() - discover_started)
+        timer.count("files_scanned", len(all_files))
+
+        # A pending rebuild writes into its own generation; readers stay on the current one.
+        pending = self._begin_rebuild()
+        vector_db = pending.vector_db if pending else self.vector_db
+        metadata = pending.metadata if pending else self.metadata
+        dedup = pending.dedup if pending else self.dedup
+        if dedup is not None:
+            dedup.run_stats = {"exact": 0, "near": 0, "chars_saved": 0}
 
         updated_files: list[str] = []
-        new_documents: list[Document] = []
+        skipped_files: list[str] = []
+        batch: list[Document] = []
+        new_documents_count = 0
+        store_seconds = 0.0
+        # Chunks stored by this update are tagged so a file's older chunks can be told apart
+        update_run = uuid.uuid4().hex
+        # Files whose chunks are all in the batch (or already stored): file_key -> new metadata entry
+        staged: dict[str, dict[str, Any]] = {}
+
+        def flush() -> bool:
+            """Embed and store the current batch so memory stays bounded.
+
+            Once the batch is stored, the staged files replace their previous
+            chunks and metadata; on failure both are left as they were.
+            """
+            nonlocal new_documents_count, store_seconds
+            if batch:
+                for document in batch:
+                    document.metadata["update_run"] = update_run
+                started = time.perf_counter()
+                with timer.stage("store"):
+                    if not vector_db.exists():
+                        ok = vector_db.create_from_documents(batch)
+                    else:
+                        ok = vector_db.add_documents(batch)
+                store_seconds += time.perf_counter() - started
+                if not ok:
+                    return False
+                new_documents_count += len(batch)
+                timer.count("chunks_embedded", len(batch))
+                batch.clear()
+            for file_key, entry in staged.items():
+                self._delete_file_documents(vector_db, file_key, metadata.get(file_key, {}), keep_run=update_run)
+                metadata[file_key] = entry
+                updated_files.append(file_key)
+            staged.clear()
+            return True
 
-        for file_path in all_files:
-            if not self._should_update_file(file_path):
-                continue
+        def failure() -> dict[str, Any]:
+            if pending is None and updated_files:
+                self._save_metadata()
+            return {
+                "success": False,
+                "message": f"Failed to update vector database '{self.config.name}'",
+                "updated_files": updated_files,
+                "new_documents_count": 0,
+                "total_files_processed": len(all_files),
+            }
 
-            processor = self._find_processor(file_path)
-            if processor is None:
-                logger.warning(f"No processor for: {file_path}")
-                continue
+        # Pass 1: decide which files need (re)processing.
+        scanned: dict[str, tuple[Path, DocumentProcessor, str]] = {}
+        work: list[str] = []
+        with timer.stage("scan"):
+            for file_path in all_files:
+                file_key = self._get_unique_file_key(file_path)
+                previous = metadata.get(file_key, {})
+                try:
+                    stat = file_path.stat()
+                except OSError as e:
+                    logger.warning(f"Failed to stat {file_path}: {e}")
+                    continue
 
-            logger.info(f"Processing: {file_path}")
-            parsed_content = processor.process(file_path)
-            chunks = self.text_splitter.split_text(parsed_content["content"])
-            new_documents.extend(self._build_documents_from_parsed(parsed_content, file_path, chunks))
-
-            file_key = self._get_unique_file_key(file_path)
-            self.metadata[file_key] = {
-                "hash": self._get_file_hash(file_path),
-                "last_updated": datetime.now().isoformat(),
-                "title": parsed_content["title"],
-                "chunks_count": len(chunks),
-                "file_type": file_path.suffix.lower(),
-                "file_path": str(file_path),
-                "display_source": self._get_display_source(file_path),
-            }
-            updated_files.append(file_key)
+                processor = self._find_processor(file_path)
+                if processor is None:
+                    logger.warning(f"No processor for: {file_path}")
+                    continue
 
-        if new_documents:
-            if not self.vector_db.exists():
-                success = self.vector_db.create_from_documents(new_documents)
-            else:
-                for file_key in updated_files:
-                    if not self.vector_db.delete_documents({"file_key": file_key}):
-                        logger.warning(f"[{self.config.name}] Failed to delete old docs for {file_key}")
-                success = self.vector_db.add_documents(new_documents)
-
-            if not success:
-                return {
-                    "success": False,
-                    "message": f"Failed to update vector database '{self.config.name}'",
-                    "updated_files": updated_files,
-                    "new_documents_count": 0,
-                    "total_files_processed": len(all_files),
+                kind = processor.kind_of(file_path)
+                if self._is_skip_current(previous, stat, kind):
+                    timer.count("files_unchanged")
+                    continue
+                reason = self.prefilter.check(file_path, stat, kind)
+                if reason is not None:
+                    self._delete_file_documents(vector_db, file_key, previous)
+                    metadata[file_key] = self._skip_entry(file_path, stat, kind, reason)
+                    skipped_files.append(file_key)
+                    timer.count("files_skipped")
+                    continue
+
+                file_hash = self._get_file_hash(file_path)
+                timer.count("files_hashed")
+                scanned[file_key] = (file_path, processor, file_hash)
+                if file_hash != previous.get("hash", ""):
+                    work.append(file_key)
+                else:
+                    timer.count("files_unchanged")
+
+        # Chunks that were folded into a changed file's chunks must be indexed again.
+        if dedup is not None:
+            dependents: set[str] = set()
+            for file_key in work + skipped_files:
+                dependents |= dedup.remove_file(file_key)
+            for file_key in sorted(dependents - set(work)):
+                if file_key in scanned:
+                    logger.info(f"[{self.config.name}] Re-indexing {file_key}: its canonical chunks changed")
+                    dedup.remove_file(file_key)
+                    work.append(file_key)
+
+        # Pass 2: parse, chunk, deduplicate and store.
+        with timer.stage("parse"):
+            for file_key in work:
+                file_path, processor, file_hash = scanned[file_key]
+                logger.info(f"Processing: {file_path}")
+                timer.count("files_parsed")
+                # The previous chunks stay until the new ones are stored (see flush)
+
+                records = processor.iter_records(file_path)
+                if records is None:
+                    parsed_content, chunks = self._parse_and_split(file_path, file_hash, processor)
+                    skip = self._dedup_chunks(dedup, file_key, chunks, parsed_content)
+                    batch.extend(self._build_documents_from_parsed(parsed_content, file_path, chunks, skip))
+                    title, chunks_count, records_count = parsed_content["title"], len(chunks), None
+                    tags, categories = parsed_content.get("tags") or [], parsed_content.get("categories") or []
+                else:
+                    # Streamed files bypass the parse cache, which would hold the whole file.
+                    chunker = self._chunker_for(processor)
+                    title, chunks_count, records_count = file_path.stem, 0, 0
+                    tags, categories = [], []
+                    for record in records:
+                        chunks = chunker.split(record)
+                        skip = self._dedup_chunks(dedup, file_key, chunks, record)
+                        batch.extend(self._build_documents_from_parsed(record, file_path, chunks, skip))
+                        chunks_count += len(chunks)
+                        records_count += 1
+                        tags.extend(t for t in record.get("tags") or [] if t not in tags)
+                        categories.extend(c for c in record.get("categories") or [] if c not in categories)
+                        if len(batch) >= self._STORE_BATCH_SIZE and not flush():
+                            return failure()
+
+                entry: dict[str, Any] = {
+                    "hash": file_hash,
+                    "last_updated": datetime.now().isoformat(),
+                    "title": title,
+                    "chunks_count": chunks_count,
+                    "file_type": file_path.suffix.lower(),
+                    "file_path": str(file_path),
+                    "display_source": self._get_display_source(file_path),
+                    "tags": [str(t) for t in tags],
+                    "categories": [str(c) for c in categories],
                 }
+                if records_count is not None:
+                    entry["records_count"] = records_count
+                staged[file_key] = entry
+
+                if len(batch) >= self._STORE_BATCH_SIZE and not flush():
+                    return failure()
 
-            self._save_metadata()
+        if not flush():
+            return failure()
+
+        if dedup is not None and (updated_files or skipped_files):
+            dedup.save((pending.path if pending else self.generation_path) / DEDUP_FILE)
+
+        if updated_files or skipped_files:
+            if pending is None:
+                self._save_metadata()
             logger.info(
-                f"[{self.config.name}] Update complete — {len(updated_files)} files, {len(new_documents)} chunks"
+                f"[{self.config.name}] Update complete — {len(updated_files)} files, {new_documents_count} chunks, "
+                f"{len(skipped_files)} skipped"
             )
 
-        return {
+        if pending is not None:
+            self._commit_rebuild()
+        self._metadata_index = None
+        if updated_files:
+            self.parse_cache.prune(
+                (meta["hash"], Path(meta["file_path"])) for meta in self.metadata.values() if "hash" in meta
+            )
+
+        result: dict[str, Any] = {
             "success": True,
             "message": f"Knowledge base '{self.config.name}' update completed",
             "updated_files": updated_files,
-            "new_documents_count": len(new_documents),
+            "skipped_files": skipped_files,
+            "new_documents_count": new_documents_count,
             "total_files_processed": len(all_files),
         }
+        if dedup is not None:
+            result["dedup"] = self._dedup_report(dedup, new_documents_count, store_seconds)
+        return result
 
     def search(
         self,
         query: str,
         k: int = 5,
         filter_metadata: Optional[dict[str, Any]] = None,
+        filters: Optional[dict[str, Any]] = None,
+        explain: bool = False,
     ) -> list[dict[str, Any]]:
-        """Search the knowledge base and return ranked results."""
-        if not self.vector_db.exists():
-            return []
+        """Search the knowledge base and return ranked results.
+
+        *filters* restricts results by the indexed fields (``file_type``, ``tags``,
+        ``categories``, ``source_root``); each takes a value or a list of values.
+        Matching chunks are selected before vector scoring. *filter_metadata* is a
+        raw backend filter applied as well. With *explain*, each result carries the
+        components of its relevance score; stage timings are always left in
+        ``last_search_metrics``.
+        """
+        wanted = normalize_filters(filters)
+        timer = StageTimer("search")
+        self._timer = timer
+        try:
+            results = self._run_search(query, k, filter_metadata, wanted, explain, timer)
+        finally:
+            self._timer = None
+        timer.count("results", len(results))
+        self.last_search_metrics = self.metrics.record(timer)
+        return results
+
+    def _run_search(
+        self,
+        query: str,
+        k: int,
+        filter_metadata: Optional[dict[str, Any]],
+        wanted: dict[str, set[str]],
+        explain: bool,
+        timer: StageTimer,
+    ) -> list[dict[str, Any]]:
+        with timer.stage("sync"):
+            self._sync_generation()
+            if not self.vector_db.exists():
+                return []
 
         try:
             initial_k = max(k * 2, self.config.search_k)
-            docs = self.vector_db.search(query, k=initial_k, filter_metadata=filter_metadata)
-
-            results = [
-                {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "score": float(score),
-                    "relevance_score": self._calculate_relevance_score(query, doc, score),
-                }
-                for doc, score in docs
-            ]
-            results.sort(key=lambda x: x["relevance_score"], reverse=True)
-            return results[:k]
+            with timer.stage("vector_search"):
+                if wanted:
+                    docs = self._search_candidates(query, initial_k, wanted, filter_metadata)
+                else:
+                    docs = self.vector_db.search(query, k=initial_k, filter_metadata=filter_metadata)
+            timer.count("candidates", len(docs))
+
+            with timer.stage("rerank"):
+                results = []
+                for doc, score in docs:
+                    components = self._relevance_components(query, doc, score)
+                    result = {
+                        "content": doc.page_content,
+                        "metadata": doc.metadata,
+                        "score": float(score),
+                        "relevance_score": sum(components.values()),
+                    }
+                    if explain:
+                        result["explain"] = components
+                    results.append(result)
+                results.sort(key=lambda x: x["relevance_score"], reverse=True)
+                results = results[:k]
+                if self.dedup is not None:
+                    for result in results:
+                        self._attach_alternate_sources(result)
+            return results
         except Exception as e:
             logger.error(f"[{self.config.name}] Search failed: {e}")
             return []
 
+    def _search_candidates(
+        self,
+        query: str,
+        k: int,
+        wanted: dict[str, set[str]],
+        filter_metadata: Optional[dict[str, Any]],
+    ) -> list[tuple[Document, float]]:
+        """Vector search restricted to the files the metadata index selects."""
+        timer = self._timer
+        with timer.stage("candidate_select") if timer else contextlib.nullcontext():
+            file_keys = self.metadata_index.candidates(wanted)
+        if not file_keys:
+            return []
+        where: dict[str, Any] = {"file_key": {"$in": sorted(file_keys)}}
+        if filter_metadata:
+            where = {"$and": [where, filter_metadata]}
+        docs = self.vector_db.search_within(query, k, where)
+        return [(doc, score) for doc, score in docs if MetadataIndex.chunk_matches(doc.metadata, wanted)]
+
+    def _attach_alternate_sources(self, result: dict[str, Any]) -> None:
+        """List the other files whose copies of this chunk were deduplicated into it."""
+        metadata = result["metadata"]
+        if self.dedup is None or "file_key" not in metadata:
+            return
+        chunk_id = self._chunk_id(metadata["file_key"], metadata.get("chunk_index"), metadata.get("record_index"))
+        sources = [
+            self.metadata.get(file_key, {}).get("display_source", file_key)
+            for file_key in self.dedup.alternates_of(chunk_id)
+        ]
+        if sources:
+            result["alternate_sources"] = sources
+
     def _calculate_relevance_score(self, query: str, doc: Document, vector_score: float) -> float:
         """Combine vector similarity with keyword/title/metadata signals."""
+        return sum(self._relevance_components(query, doc, vector_score).values())
+
+    def _relevance_components(self, query: str, doc: Document, vector_score: float) -> dict[str, float]:
+        """Weighted contributions to the relevance score, keyed by signal."""
         try:
             content = doc.page_content.lower()
             query_lower = query.lower()
@@ -549,7 +1126,7 @@ class EmbeddingKnowledgeBase:
                 title_score = sum(0.5 for w in query_words if w in title)
 
             metadata_score = 0.0
-            for field in ("tags", "categories", "author", "description"):
+            for field in ("tags", "categories", "author", "description", "section_path"):
                 field_val = metadata.get(field, "").lower()
                 if not field_val:
                     continue
@@ -558,11 +1135,31 @@ class EmbeddingKnowledgeBase:
                 else:
                     metadata_score += sum(0.3 for w in query_words if w in field_val)
 
-            return base_score * 0.4 + keyword_score * 0.3 + title_score * 0.2 + metadata_score * 0.1
+            weights = self.config.rerank_weights
+            return {
+                "vector": base_score * weights["vector"],
+                "keyword": keyword_score * weights["keyword"],
+                "title": title_score * weights["title"],
+                "metadata": metadata_score * weights["metadata"],
+            }
 
         except Exception as e:
             logger.warning(f"Failed to calculate relevance score: {e}")
-            return 1.0 / (1.0 + vector_score)
+            return {"vector": 1.0 / (1.0 + vector_score)}
+
+    def _write_summary(self) -> None:
+        """Refresh the catalog entry read by listing tools."""
+        try:
+            count = self.vector_db.get_stats().get("collection_count") if self.vector_db.exists() else 0
+        except Exception as e:
+            logger.warning(f"[{self.config.name}] Failed to count documents for summary: {e}")
+            count = None
+        write_summary(
+            self.vector_db_path,
+            summarize(
+                self.config.name, self.vector_db_path, self.saved_config, self.metadata, self.generation_id, count
+            ),
+        )
 
     def get_stats(self) -> dict[str, Any]:
         if not self.vector_db.exists():
@@ -571,17 +1168,24 @@ class EmbeddingKnowledgeBase:
         try:
             db_stats = self.vector_db.get_stats()
             file_types: dict[str, int] = {}
+            skipped: dict[str, int] = {}
             for meta in self.metadata.values():
+                if "skipped" in meta:
+                    skipped[meta["skipped"]] = skipped.get(meta["skipped"], 0) + 1
+                    continue
                 ft = meta.get("file_type", "unknown")
                 file_types[ft] = file_types.get(ft, 0) + 1
 
             return {
                 "name": self.config.name,
                 "total_documents": db_stats.get("collection_count", 0),
-                "total_files": len(self.metadata),
+                "total_files": sum(file_types.values()),
                 "file_types": file_types,
+                "skipped_files": skipped,
+                "dedup": self.dedup.totals() if self.dedup is not None else None,
                 "source_paths": [str(p) for p in self.source_paths],
                 "vector_db_path": str(self.vector_db_path),
+                "generation": self.generation_id,
                 "supported_extensions": self.get_supported_extensions(),
                 "last_updated": max(
                     (meta.get("last_updated", "") for meta in self.metadata.values()),
@@ -592,13 +1196,29 @@ class EmbeddingKnowledgeBase:
             logger.error(f"[{self.config.name}] Failed to get stats: {e}")
             return {"error": str(e)}
 
+    def rebuild_shard(self, index: int) -> dict[str, Any]:
+        """Re-embed one shard of a sharded knowledge base while the others keep serving."""
+        self._sync_generation()
+        if not isinstance(self.vector_db, ShardedVectorDatabase):
+            return {"success": False, "message": f"Knowledge base '{self.config.name}' is not sharded"}
+        try:
+            count = self.vector_db.rebuild_shard(index, batch_size=self._STORE_BATCH_SIZE)
+        except Exception as e:
+            logger.error(f"[{self.config.name}] Failed to rebuild shard {index}: {e}")
+            return {"success": False, "message": str(e)}
+        return {"success": True, "message": f"Rebuilt shard {index}", "new_documents_count": count}
+
     def get_database_info(self) -> dict[str, Any]:
         info: dict[str, Any] = {
             "name": self.config.name,
             "db_type": self.db_type,
             "debug_mode": self.debug_mode,
             "vector_db_path": str(self.vector_db_path),
+            "generation": self.generation_id,
+            "rebuild_pending": self.rebuild_pending,
+            "rebuild_generation": self._pending.generation_id if self._pending else None,
             "database_exists": self.vector_db.exists(),
+            "metrics": self.metrics.summary(),
         }
         try:
             info.update(self.vector_db.get_stats())
@@ -614,16 +1234,14 @@ class EmbeddingKnowledgeBase:
 
             logger.info(f"[{self.config.name}] Switching backend: '{self.db_type}' -> '{new_db_type}'")
 
-            new_vector_db = VectorDatabaseFactory.create_database(
-                db_type=new_db_type,
-                persist_directory=str(self.vector_db_path),
-                embedding_function=None,
-                name=self.config.name,
-                debug_mode=self.debug_mode,
-            )
-            new_vector_db._lazy_embedding_getter = lambda: self.embeddings
-
+            previous_db_type = self.db_type
             self.db_type = new_db_type
+            try:
+                new_vector_db = self._create_vector_db(self.generation_path)
+            except Exception:
+                self.db_type = previous_db_type
+                raise
+
             self.vector_db = new_vector_db
             logger.info(f"[{self.config.name}] Switched to '{new_db_type}' backend.")
             return True
@@ -0,0 +1,277 @@
+"""
+Indexing and retrieval benchmark for the embedding knowledge base.
+Builds a synthetic Markdown / code / JSON corpus, indexes it with a
+deterministic fake embedding (no model download, runs offline) and measures
+cold index throughput, no-op re-index cost and search latency percentiles per
+backend.  Results are written as JSON so runs can be diffed across commits.
+
+Usage:
+    python -m zdt_agent.utils.ekb_bench --files 200 --backends chroma chroma:4 --output bench.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from .ekb import EKBConfig, EmbeddingKnowledgeBase
+from .ekb_metrics import percentile
+from .logger import get_logger
+
+logger = get_logger(name=__name__)
+
+BENCH_FORMAT = 1
+FILE_PATTERNS = ["*.md", "*.py", "*.json"]
+
+_WORDS = (
+    "deploy service cluster index vector query cache shard replica token parser schema config release "
+    "rollback metric latency throughput budget worker queue stream batch record field document chunk "
+    "embedding model search filter ranking score policy session prompt agent tool graph node edge"
+).split()
+_TAGS = ("ops", "api", "infra", "ml", "docs", "security")
+
+
+# ------------------------------------------------------------------
+# Synthetic corpus
+# ------------------------------------------------------------------
+
+
+def _sentence(rng: random.Random, n: int = 12) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+
+def _markdown(rng: random.Random, i: int) -> str:
+    tags = ", ".join(rng.sample(_TAGS, 2))
+    lines = [f"---\ntitle: Note {i}\ntags: [{tags}]\ncategories: [{rng.choice(_TAGS)}]\n---\n", f"# Note {i}\n"]
+    for section in range(rng.randint(2, 5)):
+        lines.append(f"## {rng.choice(_WORDS).title()} {section}\n")
+        lines.extend(" ".join(_sentence(rng) for _ in range(rng.randint(3, 8))) + "\n" for _ in range(2))
+    return "\n".join(lines)
+
+
+def _code(rng: random.Random, i: int) -> str:
+    parts = [f'"""Module {i}: {_sentence(rng, 6)}"""\n']
+    for fn in range(rng.randint(3, 8)):
+        name = f"{rng.choice(_WORDS)}_{rng.choice(_WORDS)}_{fn}"
+        body = "\n".join(f"    {rng.choice(_WORDS)}_{n} = {rng.randint(0, 999)}" for n in range(rng.randint(3, 10)))
+        parts.append(f'def {name}(value):\n    """{_sentence(rng, 8)}"""\n{body}\n    return value\n')
+    return "\n\n".join(parts)
+
+
+def _json(rng: random.Random, i: int) -> str:
+    records = [
+        {
+            "id": f"{i}-{n}",
+            "title": _sentence(rng, 4),
+            "body": " ".join(_sentence(rng) for _ in range(rng.randint(2, 5))),
+            "tags": rng.sample(_TAGS, 2),
+        }
+        for n in range(rng.randint(3, 10))
+    ]
+    return json.dumps(records, indent=2)
+
+
+_GENERATORS = {"md": (_markdown, "docs"), "py": (_code, "src"), "json": (_json, "data")}
+
+
+def generate_corpus(root: Path, files_per_kind: int, seed: int = 0) -> Dict[str, int]:
+    """Write *files_per_kind* files of each kind under *root*; return bytes written per kind."""
+    rng = random.Random(seed)
+    written: Dict[str, int] = {}
+    for ext, (generate, subdir) in _GENERATORS.items():
+        directory = root / subdir
+        directory.mkdir(parents=True, exist_ok=True)
+        total = 0
+        for i in range(files_per_kind):
+            text = generate(rng, i)
+            (directory / f"{ext}_{i:05d}.{ext}").write_text(text, encoding="utf-8")
+            total += len(text.encode("utf-8"))
+        written[ext] = total
+    return written
+
+
+def generate_queries(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed + 1)
+    return [" ".join(rng.sample(_WORDS, rng.randint(2, 4))) for _ in range(count)]
+
+
+# ------------------------------------------------------------------
+# Measurements
+# ------------------------------------------------------------------
+
+
+def _latency_ms(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+    }
+
+
+def _time_searches(kb: EmbeddingKnowledgeBase, queries: List[str], k: int, **kwargs: Any) -> Dict[str, float]:
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        kb.search(query, k=k, **kwargs)
+        samples.append(time.perf_counter() - started)
+    return _latency_ms(samples)
+
+
+def parse_backend(spec: str) -> tuple[str, int]:
+    """``chroma`` -> (chroma, 1); ``chroma:4`` -> (chroma, 4)."""
+    db_type, _, shards = spec.partition(":")
+    return db_type, int(shards) if shards else 1
+
+
+def bench_backend(
+    spec: str,
+    corpus: Path,
+    work_dir: Path,
+    queries: List[str],
+    k: int = 5,
+    dimension: int = 384,
+) -> Dict[str, Any]:
+    """Index *corpus* into a fresh knowledge base on backend *spec* and measure it."""
+    db_type, shards = parse_backend(spec)
+    config = EKBConfig(
+        name=f"bench_{db_type}_{shards}",
+        source_paths=[str(corpus)],
+        vector_db_path=str(work_dir),
+        db_type=db_type,
+        use_gitignore=False,
+        shards=shards,
+    )
+    kb = EmbeddingKnowledgeBase(config, embeddings=DeterministicFakeEmbedding(size=dimension))
+
+    started = time.perf_counter()
+    cold = kb.update_knowledge_base(FILE_PATTERNS)
+    cold_seconds = time.perf_counter() - started
+    if not cold.get("success"):
+        raise RuntimeError(f"Indexing failed on {spec}: {cold.get('message')}")
+
+    started = time.perf_counter()
+    noop = kb.update_knowledge_base(FILE_PATTERNS)
+    noop_seconds = time.perf_counter() - started
+
+    # One untimed search so lazy initialisation is not charged to the first sample
+    kb.search(queries[0], k=k)
+    files = cold["metrics"]["counters"].get("files_parsed", 0)
+    chunks = cold["metrics"]["counters"].get("chunks_embedded", 0)
+    result = {
+        "backend": spec,
+        "db_type": db_type,
+        "shards": shards,
+        "index": {
+            "seconds": round(cold_seconds, 4),
+            "files": files,
+            "chunks": chunks,
+            "files_per_second": round(files / cold_seconds, 2) if cold_seconds else None,
+            "chunks_per_second": round(chunks / cold_seconds, 2) if cold_seconds else None,
+            "stages": cold["metrics"]["stages"],
+        },
+        "noop_reindex": {
+            "seconds": round(noop_seconds, 4),
+            "files_unchanged": noop["metrics"]["counters"].get("files_unchanged", 0),
+            "stages": noop["metrics"]["stages"],
+        },
+        "search": _time_searches(kb, queries, k),
+        "filtered_search": _time_searches(kb, queries, k, filters={"file_type": "md"}),
+    }
+    logger.info(f"[{config.name}] cold {cold_seconds:.2f}s, no-op {noop_seconds:.2f}s, search {result['search']}")
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, timeout=10)
+        return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(
+    files_per_kind: int = 50,
+    backends: Optional[List[str]] = None,
+    query_count: int = 100,
+    k: int = 5,
+    dimension: int = 384,
+    seed: int = 0,
+    work_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Run the full suite and return the machine-readable report."""
+    backends = backends or ["chroma"]
+    queries = generate_queries(query_count, seed)
+    with tempfile.TemporaryDirectory(prefix="ekb_bench_", dir=work_dir) as tmp:
+        root = Path(tmp)
+        corpus_bytes = generate_corpus(root / "corpus", files_per_kind, seed)
+        results = [
+            bench_backend(spec, root / "corpus", root / "db", queries, k=k, dimension=dimension) for spec in backends
+        ]
+    return {
+        "format": BENCH_FORMAT,
+        "created_at": datetime.now().isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "files_per_kind": files_per_kind,
+            "queries": query_count,
+            "k": k,
+            "dimension": dimension,
+            "seed": seed,
+            "corpus_bytes": corpus_bytes,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark knowledge base indexing and search")
+    parser.add_argument("--files", type=int, default=50, help="Files generated per kind (md, py, json)")
+    parser.add_argument(
+        "--backends", nargs="+", default=["chroma"], help="Backends to compare, 'type' or 'type:shards'"
+    )
+    parser.add_argument("--queries", type=int, default=100, help="Search queries timed per backend")
+    parser.add_argument("-k", type=int, default=5, help="Results per search")
+    parser.add_argument("--dimension", type=int, default=384, help="Fake embedding dimension")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus and query seed")
+    parser.add_argument("--work-dir", help="Directory for the temporary corpus and databases")
+    parser.add_argument("--output", "-o", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        files_per_kind=args.files,
+        backends=args.backends,
+        query_count=args.queries,
+        k=args.k,
+        dimension=args.dimension,
+        seed=args.seed,
+        work_dir=Path(args.work_dir) if args.work_dir else None,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        for result in report["results"]:
+            search = result["search"]
+            print(
+                f"{result['backend']}: index {result['index']['seconds']}s "
+                f"({result['index']['chunks_per_second']} chunks/s), no-op {result['noop_reindex']['seconds']}s, "
+                f"search p50/p95/p99 {search['p50_ms']}/{search['p95_ms']}/{search['p99_ms']} ms"
+            )
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Catalog of knowledge bases on disk.
+Every update writes a small ``summary.json`` next to ``config.json``; listing
+and stats read those files instead of constructing an EmbeddingKnowledgeBase,
+so no backend client or embedding model is ever loaded.  Knowledge bases
+without a current summary fall back to their ``config.json`` and the served
+generation's ``metadata.json``.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .ekb_generations import GENERATIONS_DIR, POINTER_FILE, SUMMARY_FILE, atomic_write_json
+from .logger import get_logger
+
+logger = get_logger(name=__name__)
+
+SUMMARY_FORMAT = 1
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to read {path}: {e}")
+        return None
+
+
+def summarize(
+    name: str,
+    root: Path,
+    config: Dict[str, Any],
+    metadata: Dict[str, Any],
+    generation: Optional[str],
+    total_documents: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Build a summary from a knowledge base's config and file metadata.
+
+    Without *total_documents* (the backend's chunk count) the per-file chunk
+    counts are summed instead; text added with ``add`` is then not included.
+    """
+    file_types: Dict[str, int] = {}
+    skipped: Dict[str, int] = {}
+    chunks = 0
+    for meta in metadata.values():
+        if "skipped" in meta:
+            skipped[meta["skipped"]] = skipped.get(meta["skipped"], 0) + 1
+            continue
+        ft = meta.get("file_type", "unknown")
+        file_types[ft] = file_types.get(ft, 0) + 1
+        chunks += meta.get("chunks_count", 0)
+
+    return {
+        "format": SUMMARY_FORMAT,
+        "name": name,
+        "generation": generation,
+        "total_documents": total_documents if isinstance(total_documents, int) else chunks,
+        "total_files": sum(file_types.values()),
+        "file_types": file_types,
+        "skipped_files": skipped,
+        "source_paths": config.get("source_paths") or [],
+        "vector_db_path": str(root),
+        "embedding_model": config.get("embedding_model"),
+        "shards": config.get("shards", 1),
+        "last_updated": max((meta.get("last_updated", "") for meta in metadata.values()), default=""),
+        "summarized_at": datetime.now().isoformat(),
+    }
+
+
+def write_summary(root: Path, summary: Dict[str, Any]) -> None:
+    try:
+        atomic_write_json(root / SUMMARY_FILE, summary)
+    except Exception as e:
+        logger.warning(f"[{summary.get('name')}] Failed to write summary: {e}")
+
+
+def read_summary(root: Path) -> Optional[Dict[str, Any]]:
+    """Summary of the knowledge base at *root*, or None if it has no configuration.
+
+    A summary left behind by an older generation is recomputed from metadata.
+    """
+    config = _read_json(root / "config.json")
+    if config is None:
+        return None
+    current = (_read_json(root / POINTER_FILE) or {}).get("current")
+    summary = _read_json(root / SUMMARY_FILE)
+    if summary and summary.get("format") == SUMMARY_FORMAT and summary.get("generation") == current:
+        return summary
+
+    metadata = _read_json(root / GENERATIONS_DIR / current / "metadata.json") if current else None
+    return summarize(root.name, root, config, metadata or {}, current)
+
+
+def list_summaries(vector_db_root: Path) -> List[Dict[str, Any]]:
+    """Summaries of every knowledge base under *vector_db_root*, by name.
+
+    Directories without a ``config.json`` are listed as ``{"name", "error"}``.
+    """
+    if not vector_db_root.exists():
+        return []
+    summaries = []
+    for kb_dir in sorted(d for d in vector_db_root.iterdir() if d.is_dir()):
+        summary = read_summary(kb_dir)
+        summaries.append(summary if summary is not None else {"name": kb_dir.name, "error": "No valid configuration"})
+    return summaries
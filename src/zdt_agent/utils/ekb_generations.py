@@ -0,0 +1,162 @@
+"""
+Versioned index generations for an embedding knowledge base.
+A rebuild writes into a fresh generation directory and then flips a small
+pointer file atomically, so readers never observe a half-built index.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from .logger import get_logger
+
+logger = get_logger(name=__name__)
+
+POINTER_FILE = "current.json"
+GENERATIONS_DIR = "generations"
+PARSE_CACHE_DIR = "parse_cache"
+# Catalog entry describing the served generation (see ekb_catalog)
+SUMMARY_FILE = "summary.json"
+
+# Entries that live directly under the knowledge base root and are shared by
+# every generation.  Anything else found at the root belongs to a legacy,
+# pre-generation layout and is migrated into the first generation.
+_ROOT_ENTRIES = {"config.json", POINTER_FILE, GENERATIONS_DIR, PARSE_CACHE_DIR, SUMMARY_FILE}
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write *text* to *path* via a temp file and ``os.replace``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_json(path: Path, data: Any) -> None:
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=2))
+
+
+class GenerationStore:
+    """Manages ``<root>/generations/<id>/`` directories and the ``current.json`` pointer."""
+
+    def __init__(self, root: Path, name: str = "default"):
+        self.root = root
+        self.name = name
+        self.generations_dir = root / GENERATIONS_DIR
+        self.pointer_file = root / POINTER_FILE
+        self._pointer_stamp: Optional[int] = None
+        self._pointer_cache: dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # Pointer
+    # ------------------------------------------------------------------
+
+    def _read_pointer(self) -> dict[str, Any]:
+        """Return the pointer contents, re-reading the file only when its mtime changed."""
+        try:
+            stamp = self.pointer_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._pointer_stamp = None
+            self._pointer_cache = {}
+            return {}
+
+        if stamp != self._pointer_stamp:
+            try:
+                with open(self.pointer_file, "r", encoding="utf-8") as f:
+                    self._pointer_cache = json.load(f)
+                self._pointer_stamp = stamp
+            except Exception as e:
+                logger.warning(f"[{self.name}] Failed to read generation pointer: {e}")
+                return self._pointer_cache
+        return self._pointer_cache
+
+    def current_id(self) -> Optional[str]:
+        return self._read_pointer().get("current")
+
+    def path_for(self, generation_id: str) -> Path:
+        return self.generations_dir / generation_id
+
+    def committed_ids(self) -> list[str]:
+        """Generations that have been served and not yet pruned, oldest first."""
+        pointer = self._read_pointer()
+        if "committed" in pointer:
+            return list(pointer["committed"])
+        # Pointers written before commits were tracked
+        return [g for g in (pointer.get("previous"), pointer.get("current")) if g]
+
+    def flip(self, generation_id: str) -> None:
+        """Atomically make *generation_id* the generation served to readers."""
+        current = self.current_id()
+        previous = current if current != generation_id else None
+        committed = [g for g in self.committed_ids() if g != generation_id] + [generation_id]
+        keep = {generation_id, previous}
+        pointer = {
+            "current": generation_id,
+            "previous": previous,
+            "committed": [g for g in committed if g in keep],
+            "flipped_at": datetime.now().isoformat(),
+        }
+        atomic_write_json(self.pointer_file, pointer)
+        self._read_pointer()
+        logger.info(f"[{self.name}] Generation pointer flipped: {current!r} -> {generation_id!r}")
+        self.prune([g for g in committed if g not in keep])
+
+    # ------------------------------------------------------------------
+    # Generations
+    # ------------------------------------------------------------------
+
+    def list_ids(self) -> list[str]:
+        if not self.generations_dir.exists():
+            return []
+        return sorted(d.name for d in self.generations_dir.iterdir() if d.is_dir())
+
+    def create(self) -> tuple[str, Path]:
+        """Allocate a new, empty generation directory (not yet visible to readers)."""
+        self.generations_dir.mkdir(parents=True, exist_ok=True)
+        existing = [int(g[1:]) for g in self.list_ids() if g[:1] == "g" and g[1:].isdigit()]
+        number = max(existing, default=0) + 1
+        while True:
+            generation_id = f"g{number:06d}"
+            path = self.path_for(generation_id)
+            try:
+                path.mkdir()
+                return generation_id, path
+            except FileExistsError:
+                number += 1
+
+    def prune(self, generation_ids: list[str]) -> None:
+        """Remove retired generations (committed ones older than the previous one).
+
+        ``flip`` passes only generations that were served once; a generation
+        that was never flipped to may still be being built by another process.
+        """
+        for generation_id in generation_ids:
+            shutil.rmtree(self.path_for(generation_id), ignore_errors=True)
+            logger.info(f"[{self.name}] Pruned generation {generation_id}")
+
+    def ensure_active(self) -> tuple[str, Path]:
+        """Return the current generation, creating or migrating one if needed."""
+        current = self.current_id()
+        if current and self.path_for(current).is_dir():
+            return current, self.path_for(current)
+
+        generation_id, path = self.create()
+        if self.root.exists():
+            legacy = [p for p in self.root.iterdir() if p.name not in _ROOT_ENTRIES]
+            for entry in legacy:
+                shutil.move(str(entry), str(path / entry.name))
+            if legacy:
+                logger.info(f"[{self.name}] Migrated legacy index into generation {generation_id}")
+        self.flip(generation_id)
+        return generation_id, path
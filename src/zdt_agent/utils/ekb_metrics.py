@@ -0,0 +1,127 @@
+"""
+Per-stage timing and counters for knowledge base searches and updates.
+Each operation gets a StageTimer; finished reports are logged as structured
+records (``extra={"ekb_metrics": ...}``) and kept in a small rolling window
+for debug output.
+"""
+
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from .logger import get_logger
+
+logger = get_logger(name=__name__)
+
+_WINDOW = 200
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Value at the *pct* (0-100) position of *values*, rounded to the nearest rank."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class StageTimer:
+    """Accumulates exclusive time per stage: time spent in a nested stage is not counted twice."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._active: List[str] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self._active.append(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._active.pop()
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Attribute *seconds* to *name*, taking them out of the enclosing stage."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        if self._active and self._active[-1] != name:
+            parent = self._active[-1]
+            self.stages[parent] = self.stages.get(parent, 0.0) - seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+
+class InstrumentedEmbedding(Embeddings):
+    """Delegates to the knowledge base's model and charges the time to its active timer.
+
+    Without *model_name* it follows the model of the served generation.
+    """
+
+    def __init__(self, owner: Any, model_name: Optional[str] = None):
+        self.owner = owner
+        self.model_name = model_name
+
+    def _timed(self, stage: str, method: str, arg: Any) -> Any:
+        # Resolve (and possibly load) the model first so loading is not charged to this stage
+        model = self.owner.embeddings if self.model_name is None else self.owner.embeddings_for(self.model_name)
+        started = time.perf_counter()
+        try:
+            return getattr(model, method)(arg)
+        finally:
+            timer: Optional[StageTimer] = self.owner._timer
+            if timer is not None:
+                timer.add(stage, time.perf_counter() - started)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._timed("embed_documents", "embed_documents", texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._timed("embed_query", "embed_query", text)
+
+
+class EKBMetrics:
+    """Rolling window of operation reports for one knowledge base."""
+
+    def __init__(self, name: str = "default", window: int = _WINDOW):
+        self.name = name
+        self.model_load_seconds: Optional[float] = None
+        self._recent: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._window = window
+
+    def record(self, timer: StageTimer, **extra: Any) -> Dict[str, Any]:
+        report = {**timer.report(), **extra}
+        self._recent.setdefault(timer.kind, deque(maxlen=self._window)).append(report)
+        logger.info(f"[{self.name}] {timer.kind} metrics: {json.dumps(report)}", extra={"ekb_metrics": report})
+        return report
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, latency percentiles and mean stage times per operation kind."""
+        summary: Dict[str, Any] = {"model_load_seconds": self.model_load_seconds}
+        for kind, reports in self._recent.items():
+            totals = [r["total_seconds"] for r in reports]
+            stages: Dict[str, float] = {}
+            for report in reports:
+                for stage, seconds in report["stages"].items():
+                    stages[stage] = stages.get(stage, 0.0) + seconds
+            summary[kind] = {
+                "count": len(reports),
+                "p50_seconds": round(percentile(totals, 50), 6),
+                "p95_seconds": round(percentile(totals, 95), 6),
+                "mean_stage_seconds": {stage: round(total / len(reports), 6) for stage, total in stages.items()},
+                "last": reports[-1],
+            }
+        return summary
@@ -0,0 +1,228 @@
+"""
+Portable knowledge base snapshots.
+A snapshot is a single zip archive holding the chunks, their embeddings, the
+file metadata and the build config of the served generation, with a manifest
+of SHA-256 checksums.  Importing one writes the stored vectors straight into a
+backend, so a node can be stood up without running the embedding model.
+
+Archive members:
+    manifest.json   format, counts, dimension, embedding model, member checksums
+    config.json     the knowledge base build config
+    metadata.json   per-file index metadata
+    dedup.json      duplicate-suppression index (only if the KB uses dedup)
+    records.jsonl   one ``{"id", "text", "metadata"}`` object per chunk
+    vectors.f32     little-endian float32 embeddings, one row per record line
+"""
+
+import hashlib
+import json
+import shutil
+import sys
+import tempfile
+import zipfile
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+from .dedup import DEDUP_FILE
+from .ekb import EmbeddingKnowledgeBase
+from .ekb_catalog import summarize, write_summary
+from .ekb_generations import GenerationStore, atomic_write_json
+from .logger import get_logger
+from .vector_db_base import VectorRecord
+from .vector_db_sharded import create_vector_db
+
+logger = get_logger(name=__name__)
+
+SNAPSHOT_FORMAT = 1
+MANIFEST_FILE = "manifest.json"
+RECORDS_FILE = "records.jsonl"
+VECTORS_FILE = "vectors.f32"
+
+_BATCH_SIZE = 256
+_COPY_BLOCK = 1 << 20
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+class SnapshotError(Exception):
+    """The archive is missing, corrupt, or of an unsupported format."""
+
+
+def _pack_vector(embedding: List[float]) -> bytes:
+    row = array("f", embedding)
+    if _BIG_ENDIAN:
+        row.byteswap()
+    return row.tobytes()
+
+
+def _unpack_vector(data: bytes) -> List[float]:
+    row = array("f")
+    row.frombytes(data)
+    if _BIG_ENDIAN:
+        row.byteswap()
+    return row.tolist()
+
+
+class _HashingWriter:
+    """Write-through wrapper that tracks a SHA-256 of everything written."""
+
+    def __init__(self, f: IO[bytes]):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data: bytes) -> None:
+        self.sha256.update(data)
+        self.f.write(data)
+
+
+def export_snapshot(kb: EmbeddingKnowledgeBase, archive_path: Path) -> Dict[str, Any]:
+    """Write the served generation of *kb* to *archive_path*; return the manifest."""
+    archive_path = Path(archive_path)
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    kb._sync_generation()
+
+    checksums: Dict[str, str] = {}
+    count = 0
+    dimension = 0
+    tmp_archive = archive_path.with_name(f".{archive_path.name}.tmp")
+    try:
+        with (
+            zipfile.ZipFile(tmp_archive, "w", compression=zipfile.ZIP_DEFLATED) as zf,
+            tempfile.TemporaryFile() as vectors,
+        ):
+            # Records stream into the archive; vectors go to a temp file until the records entry is closed.
+            vector_writer = _HashingWriter(vectors)
+            with zf.open(RECORDS_FILE, "w", force_zip64=True) as entry:
+                records_writer = _HashingWriter(entry)
+                for batch in kb.vector_db.export_records(_BATCH_SIZE):
+                    for record in batch:
+                        if not dimension:
+                            dimension = len(record.embedding)
+                        elif len(record.embedding) != dimension:
+                            raise SnapshotError(
+                                f"Record {record.id} has dimension {len(record.embedding)}, expected {dimension}"
+                            )
+                        line = {"id": record.id, "text": record.text, "metadata": record.metadata}
+                        records_writer.write((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+                        vector_writer.write(_pack_vector(record.embedding))
+                        count += 1
+            checksums[RECORDS_FILE] = records_writer.sha256.hexdigest()
+
+            vectors.seek(0)
+            with zf.open(VECTORS_FILE, "w", force_zip64=True) as entry:
+                while block := vectors.read(_COPY_BLOCK):
+                    entry.write(block)
+            checksums[VECTORS_FILE] = vector_writer.sha256.hexdigest()
+
+            members = {"config.json": kb.saved_config, "metadata.json": kb.metadata}
+            if kb.dedup is not None:
+                members[DEDUP_FILE] = {"format": 1, "threshold": kb.dedup.threshold, "entries": kb.dedup.entries}
+            for member, data in members.items():
+                payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+                zf.writestr(member, payload)
+                checksums[member] = hashlib.sha256(payload).hexdigest()
+
+            manifest = {
+                "format": SNAPSHOT_FORMAT,
+                "name": kb.config.name,
+                "generation": kb.generation_id,
+                "created_at": datetime.now().isoformat(),
+                "embedding_model": kb.saved_config.get("embedding_model", kb.config.embedding_model),
+                "dimension": dimension,
+                "records": count,
+                "files": checksums,
+            }
+            zf.writestr(MANIFEST_FILE, json.dumps(manifest, indent=2))
+        tmp_archive.replace(archive_path)
+    except BaseException:
+        tmp_archive.unlink(missing_ok=True)
+        raise
+
+    logger.info(f"[{kb.config.name}] Exported {count} records ({dimension}-d) to {archive_path}")
+    return manifest
+
+
+def read_manifest(zf: zipfile.ZipFile) -> Dict[str, Any]:
+    """Load the manifest and verify every listed member against its checksum."""
+    try:
+        manifest = json.loads(zf.read(MANIFEST_FILE))
+    except KeyError:
+        raise SnapshotError(f"Not a knowledge base snapshot: {MANIFEST_FILE} missing") from None
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"Unsupported snapshot format {manifest.get('format')!r}")
+
+    for member, expected in manifest.get("files", {}).items():
+        digest = hashlib.sha256()
+        try:
+            with zf.open(member) as f:
+                while block := f.read(_COPY_BLOCK):
+                    digest.update(block)
+        except KeyError:
+            raise SnapshotError(f"Snapshot member {member} missing") from None
+        if digest.hexdigest() != expected:
+            raise SnapshotError(f"Checksum mismatch for {member}")
+    return manifest
+
+
+def _iter_batches(zf: zipfile.ZipFile, dimension: int) -> Iterator[List[VectorRecord]]:
+    row_size = dimension * 4
+    batch: List[VectorRecord] = []
+    with zf.open(RECORDS_FILE) as records, zf.open(VECTORS_FILE) as vectors:
+        for line in records:
+            item = json.loads(line)
+            row = vectors.read(row_size)
+            if len(row) != row_size:
+                raise SnapshotError("Vector data ends before the records do")
+            batch.append(VectorRecord(item["id"], item["text"], item["metadata"], _unpack_vector(row)))
+            if len(batch) >= _BATCH_SIZE:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def import_snapshot(
+    archive_path: Path,
+    vector_db_root: Path,
+    name: Optional[str] = None,
+    db_type: str = "chroma",
+) -> Dict[str, Any]:
+    """Load a snapshot into a new generation of knowledge base *name* and make it current.
+
+    The knowledge base keeps serving its current generation until the import
+    has been written completely.
+    """
+    with zipfile.ZipFile(archive_path) as zf:
+        manifest = read_manifest(zf)
+        name = name or manifest["name"]
+        root = Path(vector_db_root) / name
+        generations = GenerationStore(root, name=name)
+        generation_id, path = generations.create()
+
+        try:
+            config = json.loads(zf.read("config.json"))
+            if manifest["records"]:
+                vector_db = create_vector_db(
+                    db_type=db_type, persist_directory=str(path), shards=config.get("shards", 1), name=name
+                )
+                if not vector_db.import_records(_iter_batches(zf, manifest["dimension"])):
+                    raise SnapshotError(f"Backend '{db_type}' failed to import records")
+
+            metadata = json.loads(zf.read("metadata.json"))
+            atomic_write_json(path / "metadata.json", metadata)
+            if DEDUP_FILE in manifest["files"]:
+                atomic_write_json(path / DEDUP_FILE, json.loads(zf.read(DEDUP_FILE)))
+
+            config["imported_at"] = datetime.now().isoformat()
+            config["imported_from"] = manifest["name"]
+            config.pop("updated_at", None)
+        except BaseException:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+    atomic_write_json(root / "config.json", config)
+    generations.flip(generation_id)
+    write_summary(root, summarize(name, root, config, metadata, generation_id, manifest["records"]))
+    logger.info(f"[{name}] Imported {manifest['records']} records from {archive_path} into generation {generation_id}")
+    return {**manifest, "name": name, "generation": generation_id}
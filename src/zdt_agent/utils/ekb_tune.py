@@ -0,0 +1,252 @@
+"""
+Parameter sweep for knowledge base chunking and retrieval settings.
+A labelled query set names the files each query should find.  The sweep copies
+a sample of the indexed corpus (every labelled file plus random others), builds
+one trial index per chunking setting and scores each search setting on it by
+recall@k, index size and p95 latency.
+
+Query set format (JSON list or JSONL), ``relevant`` holding display sources as
+shown in search results:
+    {"query": "how to roll back a release", "relevant": ["ops/rollback.md"]}
+"""
+
+import json
+import random
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .ekb import DEFAULT_RERANK_WEIGHTS, EKBConfig, EmbeddingKnowledgeBase
+from .ekb_metrics import percentile
+from .logger import get_logger
+
+logger = get_logger(name=__name__)
+
+# Named rerank weightings the sweep can try; "v,k,t,m" strings give custom ones
+RERANK_PRESETS: Dict[str, Dict[str, float]] = {
+    "default": dict(DEFAULT_RERANK_WEIGHTS),
+    "vector": {"vector": 0.7, "keyword": 0.2, "title": 0.05, "metadata": 0.05},
+    "keyword": {"vector": 0.3, "keyword": 0.5, "title": 0.1, "metadata": 0.1},
+    "vector_only": {"vector": 1.0, "keyword": 0.0, "title": 0.0, "metadata": 0.0},
+}
+
+
+@dataclass
+class LabelledQuery:
+    query: str
+    relevant: set[str] = field(default_factory=set)
+
+
+def _norm_source(source: str) -> str:
+    return Path(source).as_posix()
+
+
+def load_query_set(path: Path) -> List[LabelledQuery]:
+    """Read a JSON list or JSONL file of ``{"query", "relevant"}`` objects."""
+    text = Path(path).read_text(encoding="utf-8")
+    stripped = text.lstrip()
+    items = (
+        json.loads(text)
+        if stripped.startswith("[")
+        else [json.loads(line) for line in text.splitlines() if line.strip()]
+    )
+    queries = []
+    for n, item in enumerate(items, 1):
+        relevant = item.get("relevant") if isinstance(item, dict) else None
+        if not isinstance(item, dict) or not item.get("query") or not relevant:
+            raise ValueError(f"Query set entry {n} needs a 'query' and a non-empty 'relevant' list")
+        if isinstance(relevant, str):
+            relevant = [relevant]
+        queries.append(LabelledQuery(item["query"], {_norm_source(r) for r in relevant}))
+    return queries
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """A preset name or four comma-separated weights (vector, keyword, title, metadata)."""
+    if spec in RERANK_PRESETS:
+        return dict(RERANK_PRESETS[spec])
+    parts = spec.split(",")
+    if len(parts) != len(DEFAULT_RERANK_WEIGHTS):
+        raise ValueError(
+            f"Rerank weights must be one of {', '.join(RERANK_PRESETS)} or 'vector,keyword,title,metadata'"
+        )
+    return dict(zip(DEFAULT_RERANK_WEIGHTS, (float(p) for p in parts)))
+
+
+# ------------------------------------------------------------------
+# Corpus sample
+# ------------------------------------------------------------------
+
+
+def _sample_corpus(
+    kb: EmbeddingKnowledgeBase,
+    queries: List[LabelledQuery],
+    target: Path,
+    sample_files: int,
+    seed: int,
+) -> tuple[List[Path], List[str], int]:
+    """Copy labelled files plus a random sample of the rest under *target*, keeping relative paths.
+
+    Returns the per-source-path sample roots, the file patterns covering the sample and its file count.
+    """
+    labelled = set().union(*(q.relevant for q in queries))
+    files = []
+    for file_key, meta in sorted(kb.metadata.items()):
+        prefix, _, _ = file_key.partition(":")
+        if "skipped" in meta or not prefix.startswith("source_") or "file_path" not in meta:
+            continue
+        files.append((int(prefix[7:]), Path(meta["file_path"]), _norm_source(meta["display_source"])))
+
+    chosen = [f for f in files if f[2] in labelled]
+    others = [f for f in files if f[2] not in labelled]
+    random.Random(seed).shuffle(others)
+    chosen += others[: max(0, sample_files - len(chosen))]
+
+    missing = labelled - {f[2] for f in chosen}
+    if missing:
+        logger.warning(f"[{kb.config.name}] Labelled files not in the index: {', '.join(sorted(missing))}")
+
+    roots = [target / f"source_{i}" for i in range(len(kb.source_paths))]
+    for root in roots:
+        root.mkdir(parents=True, exist_ok=True)
+    patterns = set()
+    copied = 0
+    for index, path, display in chosen:
+        if not path.exists():
+            continue
+        destination = roots[index] / display
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, destination)
+        patterns.add(f"*{path.suffix}" if path.suffix else path.name)
+        copied += 1
+    return roots, sorted(patterns), copied
+
+
+# ------------------------------------------------------------------
+# Sweep
+# ------------------------------------------------------------------
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def _evaluate(kb: EmbeddingKnowledgeBase, queries: List[LabelledQuery], k: int) -> Dict[str, float]:
+    recalls = []
+    latencies = []
+    for labelled in queries:
+        started = time.perf_counter()
+        results = kb.search(labelled.query, k=k)
+        latencies.append(time.perf_counter() - started)
+        found = {_norm_source(r["metadata"].get("source", "")) for r in results}
+        recalls.append(len(found & labelled.relevant) / len(labelled.relevant))
+    return {
+        "recall_at_k": round(sum(recalls) / len(recalls), 4),
+        "p95_latency_ms": round(percentile(latencies, 95) * 1000, 3),
+    }
+
+
+def _rank_key(trial: Dict[str, Any]) -> tuple:
+    # Best recall first; ties go to the faster, then the smaller index
+    return (-trial["recall_at_k"], trial["p95_latency_ms"], trial["index_chunks"])
+
+
+def tune(
+    kb: EmbeddingKnowledgeBase,
+    queries: List[LabelledQuery],
+    chunk_sizes: List[int],
+    chunk_overlaps: List[int],
+    search_ks: List[int],
+    weights: Dict[str, Dict[str, float]],
+    k: int = 5,
+    sample_files: int = 200,
+    seed: int = 0,
+    work_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Sweep every setting combination on a corpus sample; return all trials and the best one."""
+    if not queries:
+        raise ValueError("The query set is empty")
+    kb._sync_generation()
+    trials: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="ekb_tune_", dir=work_dir) as tmp:
+        root = Path(tmp)
+        source_roots, patterns, sampled = _sample_corpus(kb, queries, root / "corpus", sample_files, seed)
+        embeddings = kb.embeddings
+
+        for chunk_size, chunk_overlap in product(chunk_sizes, chunk_overlaps):
+            if chunk_overlap >= chunk_size:
+                logger.info(f"[{kb.config.name}] Skipping chunk_size={chunk_size}, overlap={chunk_overlap}")
+                continue
+            config = EKBConfig(
+                name=f"tune_{chunk_size}_{chunk_overlap}",
+                source_paths=[str(p) for p in source_roots],
+                vector_db_path=str(root / "db"),
+                embedding_model=kb.config.embedding_model,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                use_gitignore=False,
+                processor_profile=kb.config.processor_profile,
+                json_record_path=kb.config.json_record_path,
+                dedup=kb.config.dedup,
+                dedup_threshold=kb.config.dedup_threshold,
+            )
+            trial_kb = EmbeddingKnowledgeBase(config, embeddings=embeddings)
+            built = trial_kb.update_knowledge_base(patterns)
+            if not built.get("success"):
+                logger.warning(f"[{kb.config.name}] Trial build failed: {built.get('message')}")
+                continue
+            index = {
+                "index_chunks": trial_kb.vector_db.get_stats().get("collection_count", 0),
+                "index_bytes": _dir_size(trial_kb.generation_path),
+                "index_seconds": built["metrics"]["total_seconds"],
+            }
+            for search_k, (weights_name, rerank_weights) in product(search_ks, weights.items()):
+                trial_kb.config.search_k = search_k
+                trial_kb.config.rerank_weights = rerank_weights
+                trial = {
+                    "chunk_size": chunk_size,
+                    "chunk_overlap": chunk_overlap,
+                    "search_k": search_k,
+                    "rerank_weights": weights_name,
+                    **index,
+                    **_evaluate(trial_kb, queries, k),
+                }
+                logger.info(f"[{kb.config.name}] Trial {trial}")
+                trials.append(trial)
+
+    if not trials:
+        raise RuntimeError("No trial configuration could be built")
+    best = min(trials, key=_rank_key)
+    return {
+        "k": k,
+        "queries": len(queries),
+        "sample_files": sampled,
+        "trials": sorted(trials, key=_rank_key),
+        "best": {**best, "rerank_weights": weights[best["rerank_weights"]], "rerank_preset": best["rerank_weights"]},
+    }
+
+
+def apply_best(
+    config: EKBConfig,
+    best: Dict[str, Any],
+    file_patterns: Optional[List[str]] = None,
+    embeddings: Any = None,
+) -> Dict[str, Any]:
+    """Write the winning settings to the knowledge base's config.json.
+
+    Search settings take effect immediately; new chunking settings rebuild the
+    index into a fresh generation, which is served once complete.
+    """
+    config.chunk_size = best["chunk_size"]
+    config.chunk_overlap = best["chunk_overlap"]
+    config.search_k = best["search_k"]
+    config.rerank_weights = dict(best["rerank_weights"])
+    kb = EmbeddingKnowledgeBase(config, embeddings=embeddings)
+    if not kb.rebuild_pending:
+        return {"success": True, "rebuilt": False}
+    result = kb.update_knowledge_base(file_patterns)
+    return {"success": result["success"], "rebuilt": True, "message": result["message"]}
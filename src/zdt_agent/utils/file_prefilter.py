@@ -0,0 +1,99 @@
+"""
+Cheap checks that reject files before they are read, hashed or parsed.
+Files are rejected on ``stat`` size against per-kind limits, or when the first
+few KB look binary or minified.
+"""
+
+import os
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Optional
+
+from .logger import get_logger
+
+logger = get_logger(name=__name__)
+
+_MB = 1024 * 1024
+
+# Per processor kind; None means unlimited (streamed formats use constant memory)
+DEFAULT_SIZE_LIMITS: Dict[str, Optional[int]] = {
+    "markdown": 5 * _MB,
+    "text": 10 * _MB,
+    "code": 2 * _MB,
+    "json": 64 * _MB,
+    "json_stream": None,
+}
+_FALLBACK_SIZE_LIMIT = 10 * _MB
+
+# Kinds whose content is checked for minification
+_MINIFIED_KINDS = {"code", "text"}
+_MINIFIED_SUFFIXES = (".min.js", ".min.css", ".min.mjs", ".bundle.js")
+
+SNIFF_BYTES = 8192
+_TEXT_CONTROL_BYTES = {8, 9, 10, 12, 13, 27}
+
+
+class SkipReason(Enum):
+    """Why a file was not indexed (stored in metadata as the value)"""
+
+    TOO_LARGE = "too_large"
+    BINARY = "binary"
+    MINIFIED = "minified"
+
+
+class FilePrefilter:
+    """Decides whether a file is worth handing to a processor."""
+
+    def __init__(self, size_limits: Optional[Dict[str, Optional[int]]] = None, name: str = "default"):
+        self.size_limits = {**DEFAULT_SIZE_LIMITS, **(size_limits or {})}
+        self.name = name
+
+    def size_limit(self, kind: str) -> Optional[int]:
+        return self.size_limits.get(kind, _FALLBACK_SIZE_LIMIT)
+
+    def check(self, file_path: Path, stat: os.stat_result, kind: str) -> Optional[SkipReason]:
+        """Return why the file should be skipped, or None to process it."""
+        limit = self.size_limit(kind)
+        if limit is not None and stat.st_size > limit:
+            logger.info(f"[{self.name}] Skipping {file_path}: {stat.st_size} bytes exceeds {kind} limit {limit}")
+            return SkipReason.TOO_LARGE
+
+        if kind in _MINIFIED_KINDS and file_path.name.lower().endswith(_MINIFIED_SUFFIXES):
+            logger.info(f"[{self.name}] Skipping minified file {file_path}")
+            return SkipReason.MINIFIED
+
+        try:
+            with open(file_path, "rb") as f:
+                sample = f.read(SNIFF_BYTES)
+        except OSError as e:
+            logger.warning(f"[{self.name}] Failed to read {file_path}: {e}")
+            return None
+
+        if self._looks_binary(sample):
+            logger.info(f"[{self.name}] Skipping binary file {file_path}")
+            return SkipReason.BINARY
+        if kind in _MINIFIED_KINDS and self._looks_minified(sample):
+            logger.info(f"[{self.name}] Skipping minified file {file_path}")
+            return SkipReason.MINIFIED
+        return None
+
+    @staticmethod
+    def _looks_binary(sample: bytes) -> bool:
+        if not sample:
+            return False
+        if b"\x00" in sample:
+            return True
+        control = sum(1 for b in sample if b < 32 and b not in _TEXT_CONTROL_BYTES)
+        if control / len(sample) > 0.1:
+            return True
+        # Tolerate a multi-byte character cut off at the end of the sample
+        text = sample.decode("utf-8", errors="replace")
+        return text.count("�") / len(text) > 0.05
+
+    @staticmethod
+    def _looks_minified(sample: bytes) -> bool:
+        if len(sample) < 4096:
+            return False
+        lines = sample.split(b"\n")
+        longest = max(len(line) for line in lines)
+        return longest > 1000 and len(sample) / len(lines) > 300
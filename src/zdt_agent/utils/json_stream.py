@@ -0,0 +1,180 @@
+"""
+Incremental readers for large JSON and JSON Lines files.
+Records are decoded one at a time, so memory use is bounded by the largest
+single record rather than the file size.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, TextIO, Tuple
+
+from .logger import get_logger
+
+logger = get_logger(name=__name__)
+
+_READ_SIZE = 1 << 16
+_WHITESPACE = " \t\r\n"
+
+
+def parse_record_path(record_path: Optional[str]) -> Optional[List[str]]:
+    """Turn ``"$.data.items"`` / ``"data.items"`` / ``"$"`` into a key list; None disables streaming."""
+    if record_path is None:
+        return None
+    path = record_path.strip()
+    if path.startswith("$"):
+        path = path[1:]
+    return [key for key in path.split(".") if key]
+
+
+class _JSONStream:
+    """A buffered cursor over a JSON text that decodes or skips one value at a time."""
+
+    def __init__(self, f: TextIO, read_size: int = _READ_SIZE):
+        self.f = f
+        self.read_size = read_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> int:
+        """Append more input, dropping consumed text; return how far indices shifted."""
+        shift = self.pos
+        # Grow reads with the pending text so buffering a huge record stays linear
+        data = self.f.read(max(self.read_size, len(self.buf) - self.pos))
+        if not data:
+            self.eof = True
+        self.buf = self.buf[self.pos :] + data
+        self.pos = 0
+        return shift
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ""
+            self._fill()
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError(f"Expected one of {chars!r} in JSON stream, found {c!r}")
+        self.pos += 1
+        return c
+
+    def _scan_value(self, keep: bool) -> int:
+        """Return the index just past the value at the cursor.
+
+        With ``keep`` the value's text stays buffered for decoding; otherwise
+        consumed text is discarded as the scan proceeds.
+        """
+        if not self.peek():
+            raise ValueError("Unexpected end of JSON input")
+        i = self.pos
+        scalar = self.buf[i] not in '{["'
+        depth = 0
+        in_string = False
+        escaped = False
+
+        while True:
+            if i >= len(self.buf):
+                if self.eof:
+                    if scalar:
+                        return i
+                    raise ValueError("Unexpected end of JSON input")
+                if not keep:
+                    self.pos = i
+                i -= self._fill()
+                continue
+
+            c = self.buf[i]
+            if scalar:
+                if c in ",]}" or c in _WHITESPACE:
+                    return i
+            elif in_string:
+                if escaped:
+                    escaped = False
+                elif c == "\\":
+                    escaped = True
+                elif c == '"':
+                    in_string = False
+                    if depth == 0:
+                        return i + 1
+            elif c == '"':
+                in_string = True
+            elif c in "{[":
+                depth += 1
+            elif c in "}]":
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            i += 1
+
+    def read_value(self) -> Any:
+        end = self._scan_value(keep=True)
+        value, _ = self.decoder.raw_decode(self.buf, self.pos)
+        self.pos = end
+        return value
+
+    def skip_value(self) -> None:
+        self.pos = self._scan_value(keep=False)
+
+    def enter_key(self, key: str) -> bool:
+        """Move the cursor onto the value of *key* in the object at the cursor."""
+        if self.peek() != "{":
+            return False
+        self.expect("{")
+        if self.peek() == "}":
+            return False
+        while True:
+            name = self.read_value()
+            self.expect(":")
+            if name == key:
+                return True
+            self.skip_value()
+            if self.expect(",}") == "}":
+                return False
+
+
+def iter_json_records(file_path: Path, record_path: List[str]) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(index, record)`` for each element of the array at *record_path*.
+
+    If the path points at a non-array value, that value is the single record.
+    """
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        stream = _JSONStream(f)
+        for key in record_path:
+            if not stream.enter_key(key):
+                logger.warning(f"JSON path {'.'.join(record_path)!r} not found in {file_path}")
+                return
+
+        if stream.peek() != "[":
+            yield 0, stream.read_value()
+            return
+
+        stream.expect("[")
+        if stream.peek() == "]":
+            return
+        index = 0
+        while True:
+            yield index, stream.read_value()
+            index += 1
+            if stream.expect(",]") == "]":
+                return
+
+
+def iter_jsonl_records(file_path: Path) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(line_number, record)`` for each valid line of a JSON Lines file."""
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping invalid JSON on line {line_number} of {file_path}: {e}")
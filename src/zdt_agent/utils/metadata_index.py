@@ -0,0 +1,95 @@
+"""
+Secondary indexes over per-file knowledge base metadata.
+Maps values of common fields (file type, tags, categories, source root) to the
+file keys that carry them, so a filtered search can restrict its candidates
+before any vector is scored.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Fields a search can be pre-filtered on
+INDEXED_FIELDS = ("file_type", "tags", "categories", "source_root")
+# Fields that can vary between the chunks of one file (JSON records), so hits are re-checked per chunk
+_CHUNK_LEVEL_FIELDS = ("tags", "categories")
+
+
+def _norm(field: str, value: Any) -> str:
+    text = str(value).strip().lower()
+    if field == "file_type" and text and not text.startswith("."):
+        return f".{text}"
+    if field == "source_root":
+        return str(Path(str(value).strip()))
+    return text
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Set[str]]:
+    """Validate *filters* and turn each value (a string, comma-separated string or list) into a set."""
+    normalized: Dict[str, Set[str]] = {}
+    for field, value in (filters or {}).items():
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Cannot filter on '{field}'. Indexed fields: {', '.join(INDEXED_FIELDS)}")
+        values = value.split(",") if isinstance(value, str) else value
+        wanted = {_norm(field, v) for v in values if str(v).strip()}
+        if wanted:
+            normalized[field] = wanted
+    return normalized
+
+
+class MetadataIndex:
+    """Inverted index ``field -> value -> file keys`` built from ``metadata.json`` entries."""
+
+    def __init__(self) -> None:
+        self.postings: Dict[str, Dict[str, Set[str]]] = {field: {} for field in INDEXED_FIELDS}
+        # Files indexed before a field was recorded; always candidates for filters on it
+        self.unindexed: Dict[str, Set[str]] = {field: set() for field in INDEXED_FIELDS}
+        self.chunk_counts: Dict[str, int] = {}
+
+    @classmethod
+    def build(cls, files: Dict[str, Dict[str, Any]], source_roots: List[Path]) -> "MetadataIndex":
+        index = cls()
+        for file_key, meta in files.items():
+            if "skipped" in meta:
+                continue
+            index.chunk_counts[file_key] = meta.get("chunks_count", 0)
+            values: Dict[str, Iterable[Any]] = {"source_root": [index._source_root(file_key, source_roots)]}
+            if "file_type" in meta:
+                values["file_type"] = [meta["file_type"]]
+            for field in _CHUNK_LEVEL_FIELDS:
+                if field in meta:
+                    values[field] = meta[field]
+            for field in INDEXED_FIELDS:
+                if field not in values:
+                    index.unindexed[field].add(file_key)
+                    continue
+                for value in values[field]:
+                    index.postings[field].setdefault(_norm(field, value), set()).add(file_key)
+        return index
+
+    @staticmethod
+    def _source_root(file_key: str, source_roots: List[Path]) -> str:
+        prefix, _, rest = file_key.partition(":")
+        if prefix.startswith("source_") and prefix[7:].isdigit() and int(prefix[7:]) < len(source_roots):
+            return str(source_roots[int(prefix[7:])])
+        return str(Path(rest).parent)
+
+    def candidates(self, filters: Dict[str, Set[str]]) -> Set[str]:
+        """File keys matching every field (any of its values); filters must be normalised."""
+        result: Optional[Set[str]] = None
+        for field, wanted in filters.items():
+            matched = set(self.unindexed[field])
+            for value in wanted:
+                matched |= self.postings[field].get(value, set())
+            result = matched if result is None else result & matched
+            if not result:
+                return set()
+        return result if result is not None else set(self.chunk_counts)
+
+    @staticmethod
+    def chunk_matches(metadata: Dict[str, Any], filters: Dict[str, Set[str]]) -> bool:
+        """Re-check chunk-level fields against the chunk's own (comma-joined) metadata."""
+        for field in _CHUNK_LEVEL_FIELDS:
+            wanted = filters.get(field)
+            if wanted and not wanted & {_norm(field, v) for v in str(metadata.get(field, "")).split(",") if v.strip()}:
+                return False
+        return True
@@ -0,0 +1,109 @@
+"""
+On-disk cache of document processor output.
+Entries are keyed by file content hash and file name, and tagged with the
+processor's cache key so a processor upgrade invalidates stale results.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from .ekb_generations import atomic_write_text
+from .logger import get_logger
+
+logger = get_logger(name=__name__)
+
+# 2: chunks are stored as {"text", "metadata"} objects
+_FORMAT_VERSION = 2
+
+
+class ParseCache:
+    """Stores parsed content and split chunks so rebuilds can skip I/O and parsing."""
+
+    def __init__(self, cache_dir: Path, name: str = "default"):
+        self.cache_dir = cache_dir
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _entry_key(file_hash: str, file_path: Path) -> str:
+        # The file name participates because processors derive titles from it.
+        return hashlib.md5(f"{file_hash}:{file_path.name}".encode("utf-8")).hexdigest()
+
+    def _entry_path(self, entry_key: str) -> Path:
+        return self.cache_dir / entry_key[:2] / f"{entry_key}.json"
+
+    def _load(self, file_hash: str, file_path: Path, processor_key: str) -> Optional[dict[str, Any]]:
+        if not file_hash:
+            return None
+        path = self._entry_path(self._entry_key(file_hash, file_path))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"[{self.name}] Ignoring unreadable parse cache entry {path}: {e}")
+            return None
+        if entry.get("format") != _FORMAT_VERSION or entry.get("processor") != processor_key:
+            return None
+        return entry
+
+    def _store(self, file_hash: str, file_path: Path, entry: dict[str, Any]) -> None:
+        if not file_hash:
+            return
+        path = self._entry_path(self._entry_key(file_hash, file_path))
+        try:
+            atomic_write_text(path, json.dumps(entry, ensure_ascii=False, default=str))
+        except Exception as e:
+            logger.warning(f"[{self.name}] Failed to write parse cache entry {path}: {e}")
+
+    def get(
+        self,
+        file_hash: str,
+        file_path: Path,
+        processor_key: str,
+        chunking_key: str,
+    ) -> tuple[Optional[dict[str, Any]], Optional[list[dict[str, Any]]]]:
+        """Return ``(parsed_content, chunks)``; either may be None on a miss."""
+        entry = self._load(file_hash, file_path, processor_key)
+        if entry is None:
+            self.misses += 1
+            return None, None
+        self.hits += 1
+        return entry.get("parsed"), entry.get("chunks", {}).get(chunking_key)
+
+    def put(
+        self,
+        file_hash: str,
+        file_path: Path,
+        processor_key: str,
+        parsed_content: dict[str, Any],
+        chunking_key: str,
+        chunks: list[dict[str, Any]],
+    ) -> None:
+        """Record parsed content and the chunks produced by *chunking_key*."""
+        entry = self._load(file_hash, file_path, processor_key) or {
+            "format": _FORMAT_VERSION,
+            "processor": processor_key,
+            "parsed": parsed_content,
+            "chunks": {},
+        }
+        entry["chunks"][chunking_key] = chunks
+        self._store(file_hash, file_path, entry)
+
+    def prune(self, live_files: Iterable[tuple[str, Path]]) -> int:
+        """Delete entries not referenced by any ``(file_hash, file_path)`` pair; return count removed."""
+        if not self.cache_dir.exists():
+            return 0
+        keep = {self._entry_key(file_hash, file_path) for file_hash, file_path in live_files}
+        removed = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            if path.stem not in keep:
+                path.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.info(f"[{self.name}] Pruned {removed} parse cache entries")
+        return removed
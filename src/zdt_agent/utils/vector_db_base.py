@@ -4,11 +4,22 @@ Public interfaces and factory — import from here in application code.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Callable, cast
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, cast
 
 from langchain_core.documents import Document
 
 
+@dataclass(slots=True)
+class VectorRecord:
+    """A stored chunk with its embedding, as moved between backends by snapshots."""
+
+    id: str
+    text: str
+    metadata: dict[str, Any]
+    embedding: list[float]
+
+
 class VectorDatabaseInterface(ABC):
     """Abstract interface for vector database backends."""
 
@@ -35,6 +46,18 @@ class VectorDatabaseInterface(ABC):
     ) -> list[tuple[Document, float]]:
         """Return the *k* most similar documents together with their scores."""
 
+    def search_within(
+        self,
+        query: str,
+        k: int,
+        candidate_filter: dict[str, Any],
+    ) -> list[tuple[Document, float]]:
+        """Search only documents matching *candidate_filter*, restricting them before scoring.
+
+        Backends that cannot do better fall back to a filtered :meth:`search`.
+        """
+        return self.search(query, k=k, filter_metadata=candidate_filter)
+
     @abstractmethod
     def clear(self) -> bool:
         """Remove all data from the database."""
@@ -47,6 +70,14 @@ class VectorDatabaseInterface(ABC):
     def get_stats(self) -> dict[str, Any]:
         """Return a dictionary of database statistics."""
 
+    @abstractmethod
+    def export_records(self, batch_size: int = 256) -> Iterator[list[VectorRecord]]:
+        """Yield every stored record, embeddings included, in batches (used by snapshots)."""
+
+    @abstractmethod
+    def import_records(self, batches: Iterable[list[VectorRecord]]) -> bool:
+        """Store pre-embedded records without calling the embedding model (used by snapshots)."""
+
 
 class VectorDatabaseFactory:
     """Factory for creating VectorDatabaseInterface instances."""
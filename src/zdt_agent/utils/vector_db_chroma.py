@@ -5,7 +5,7 @@ ChromaDB implementation of VectorDatabaseInterface.
 import shutil
 import time
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterable, Iterator
 
 try:
     from langchain_chroma import Chroma
@@ -15,13 +15,15 @@ except ImportError:
 from langchain_core.documents import Document
 
 from .logger import get_logger
-from .vector_db_base import VectorDatabaseInterface
+from .vector_db_base import VectorDatabaseInterface, VectorRecord
 
 logger = get_logger(name=__name__)
 
 _MAX_CREATE_RETRIES = 3
 _CHROMA_DB_FILE = "chroma.sqlite3"
 _CHROMA_WAL_FILES = ("chroma.sqlite3", "chroma.sqlite3-shm", "chroma.sqlite3-wal")
+# Candidate sets up to this size are scored directly by id instead of through a filtered ANN query
+_EXACT_SEARCH_LIMIT = 20000
 
 
 class ChromaVectorDatabase(VectorDatabaseInterface):
@@ -127,6 +129,40 @@ class ChromaVectorDatabase(VectorDatabaseInterface):
             logger.error(f"[{self.name}] Search failed: {exc}")
             return []
 
+    def search_within(
+        self,
+        query: str,
+        k: int,
+        candidate_filter: dict[str, Any],
+    ) -> list[tuple[Document, float]]:
+        if not self._ensure_vectorstore():
+            return []
+
+        vs = self._vectorstore
+        assert vs is not None
+        try:
+            ids = vs._collection.get(where=candidate_filter, include=[])["ids"]
+            if not ids:
+                return []
+            if len(ids) > _EXACT_SEARCH_LIMIT:
+                return self.search(query, k=k, filter_metadata=candidate_filter)
+            embedding = self._resolve_embedding().embed_query(query)
+            result = vs._collection.query(
+                query_embeddings=[embedding],
+                ids=ids,
+                n_results=min(k, len(ids)),
+                include=["documents", "metadatas", "distances"],
+            )
+            return [
+                (Document(id=id_, page_content=text or "", metadata=metadata or {}), distance)
+                for id_, text, metadata, distance in zip(
+                    result["ids"][0], result["documents"][0], result["metadatas"][0], result["distances"][0]
+                )
+            ]
+        except Exception as exc:
+            logger.error(f"[{self.name}] Candidate search failed: {exc}")
+            return []
+
     def clear(self) -> bool:
         try:
             self._release_vectorstore()
@@ -153,10 +189,57 @@ class ChromaVectorDatabase(VectorDatabaseInterface):
         }
         return stats
 
+    def export_records(self, batch_size: int = 256) -> Iterator[list[VectorRecord]]:
+        if not self.exists():
+            return
+        collection = self._raw_collection()
+        offset = 0
+        while True:
+            page = collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas", "embeddings"])
+            ids = page["ids"]
+            if not ids:
+                return
+            yield [
+                VectorRecord(id=id_, text=text or "", metadata=dict(metadata or {}), embedding=[float(x) for x in emb])
+                for id_, text, metadata, emb in zip(ids, page["documents"], page["metadatas"], page["embeddings"])
+            ]
+            offset += len(ids)
+
+    def import_records(self, batches: Iterable[list[VectorRecord]]) -> bool:
+        if not self._ensure_directory_writable():
+            return False
+        try:
+            collection = self._raw_collection()
+            count = 0
+            for batch in batches:
+                if not batch:
+                    continue
+                collection.upsert(
+                    ids=[r.id for r in batch],
+                    embeddings=[r.embedding for r in batch],
+                    documents=[r.text for r in batch],
+                    metadatas=[r.metadata or None for r in batch],
+                )
+                count += len(batch)
+            logger.info(f"[{self.name}] Imported {count} pre-embedded records.")
+            return True
+        except Exception as exc:
+            logger.error(f"[{self.name}] Failed to import records: {exc}")
+            return False
+        finally:
+            # Reopen with the embedding function on next use
+            self._vectorstore = None
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _raw_collection(self) -> Any:
+        """Return the Chroma collection without loading the embedding model."""
+        if self._vectorstore is not None:
+            return self._vectorstore._collection
+        return Chroma(persist_directory=str(self.persist_directory))._collection
+
     def _resolve_embedding(self) -> Any:
         """Return the embedding function, invoking the lazy getter if needed."""
         if self.embedding_function is None and self._lazy_embedding_getter is not None:
@@ -0,0 +1,238 @@
+"""
+Hash-partitioned vector database made of N backend instances.
+Each shard is an ordinary backend persisted under ``shard_<i>/``.  Chunks are
+routed by a stable hash of their identity, searches fan out to every shard on a
+thread pool and the per-shard hits are merged into a global top-k.
+"""
+
+import heapq
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from .logger import get_logger
+from .vector_db_base import VectorDatabaseFactory, VectorDatabaseInterface, VectorRecord
+
+logger = get_logger(name=__name__)
+
+_SHARD_DIR = "shard_{:03d}"
+
+
+def shard_key(metadata: dict[str, Any], text: str) -> str:
+    """Stable identity of a chunk used for routing; falls back to its text."""
+    file_key = metadata.get("file_key")
+    if file_key is None:
+        return text
+    return f"{file_key}#{metadata.get('record_index', '')}.{metadata.get('chunk_index', '')}"
+
+
+def create_vector_db(
+    db_type: str,
+    persist_directory: str,
+    shards: int = 1,
+    name: str = "default",
+    **kwargs: Any,
+) -> VectorDatabaseInterface:
+    """Create a plain backend, or a sharded one over *db_type* when ``shards > 1``."""
+    if shards > 1:
+        return ShardedVectorDatabase(persist_directory, shard_type=db_type, shards=shards, name=name, **kwargs)
+    return VectorDatabaseFactory.create_database(
+        db_type=db_type, persist_directory=persist_directory, embedding_function=None, name=name, **kwargs
+    )
+
+
+class _SharedQueryEmbedding(Embeddings):
+    """Embeds a query once for all shards searching it concurrently."""
+
+    def __init__(self, inner: Embeddings):
+        self.inner = inner
+        self._lock = threading.Lock()
+        self._last: tuple[str, list[float]] | None = None
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        with self._lock:
+            if self._last is None or self._last[0] != text:
+                self._last = (text, self.inner.embed_query(text))
+            return self._last[1]
+
+
+class ShardedVectorDatabase(VectorDatabaseInterface):
+    """Scatter-gather wrapper over ``shards`` instances of one backend type."""
+
+    def __init__(
+        self,
+        persist_directory: str,
+        shard_type: str = "chroma",
+        shards: int = 2,
+        embedding_function: Any = None,
+        name: str = "default",
+        **kwargs: Any,
+    ):
+        if shards < 1:
+            raise ValueError(f"shards must be >= 1, got {shards}")
+        self.persist_directory = Path(persist_directory)
+        self.shard_type = shard_type
+        self.name = name
+        self.embedding_function = embedding_function
+        self._lazy_embedding_getter = None
+        self._shared_embedding: _SharedQueryEmbedding | None = None
+        self._pool: ThreadPoolExecutor | None = None
+
+        self.shards: list[VectorDatabaseInterface] = []
+        for index in range(shards):
+            shard = VectorDatabaseFactory.create_database(
+                db_type=shard_type,
+                persist_directory=str(self.persist_directory / _SHARD_DIR.format(index)),
+                embedding_function=None,
+                name=f"{name}/{index}",
+                **kwargs,
+            )
+            shard._lazy_embedding_getter = self._resolve_embedding
+            self.shards.append(shard)
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def shard_index(self, metadata: dict[str, Any], text: str) -> int:
+        return zlib.crc32(shard_key(metadata, text).encode("utf-8")) % len(self.shards)
+
+    def _partition(self, documents: list[Document]) -> dict[int, list[Document]]:
+        groups: dict[int, list[Document]] = {}
+        for doc in documents:
+            groups.setdefault(self.shard_index(doc.metadata, doc.page_content), []).append(doc)
+        return groups
+
+    def _resolve_embedding(self) -> Any:
+        if self._shared_embedding is None:
+            if self.embedding_function is None and self._lazy_embedding_getter is not None:
+                self.embedding_function = self._lazy_embedding_getter()
+            if self.embedding_function is None:
+                return None
+            self._shared_embedding = _SharedQueryEmbedding(self.embedding_function)
+        return self._shared_embedding
+
+    def _map(self, fn: Any, shards: Iterable[VectorDatabaseInterface]) -> list[Any]:
+        """Run *fn* on each shard concurrently and return results in shard order."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix=f"shard-{self.name}")
+        return list(self._pool.map(fn, shards))
+
+    # ------------------------------------------------------------------
+    # VectorDatabaseInterface
+    # ------------------------------------------------------------------
+
+    def create_from_documents(self, documents: list[Document]) -> bool:
+        if not documents:
+            logger.warning(f"[{self.name}] No documents provided — skipping creation.")
+            return False
+        results = [
+            self.shards[i].create_from_documents(group) for i, group in sorted(self._partition(documents).items())
+        ]
+        return all(results)
+
+    def add_documents(self, documents: list[Document]) -> bool:
+        ok = True
+        # One shard at a time keeps only a single backend writer busy.
+        for index, group in sorted(self._partition(documents).items()):
+            shard = self.shards[index]
+            stored = shard.add_documents(group) if shard.exists() else shard.create_from_documents(group)
+            ok = ok and stored
+        return ok
+
+    def delete_documents(self, filter_criteria: dict[str, Any]) -> bool:
+        existing = [shard for shard in self.shards if shard.exists()]
+        return all(shard.delete_documents(filter_criteria) for shard in existing)
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        filter_metadata: dict | None = None,
+    ) -> list[tuple[Document, float]]:
+        existing = [shard for shard in self.shards if shard.exists()]
+        if not existing:
+            return []
+        hits = self._map(lambda shard: shard.search(query, k=k, filter_metadata=filter_metadata), existing)
+        # Scores are distances, so the global top-k are the smallest across shards.
+        return heapq.nsmallest(k, chain.from_iterable(hits), key=lambda hit: hit[1])
+
+    def search_within(
+        self,
+        query: str,
+        k: int,
+        candidate_filter: dict[str, Any],
+    ) -> list[tuple[Document, float]]:
+        existing = [shard for shard in self.shards if shard.exists()]
+        if not existing:
+            return []
+        hits = self._map(lambda shard: shard.search_within(query, k, candidate_filter), existing)
+        return heapq.nsmallest(k, chain.from_iterable(hits), key=lambda hit: hit[1])
+
+    def clear(self) -> bool:
+        return all([shard.clear() for shard in self.shards])
+
+    def exists(self) -> bool:
+        return any(shard.exists() for shard in self.shards)
+
+    def get_stats(self) -> dict[str, Any]:
+        shard_stats = [shard.get_stats() for shard in self.shards]
+        counts = [s.get("collection_count", 0) for s in shard_stats]
+        return {
+            "name": self.name,
+            "type": f"Sharded({self.shard_type} x {len(self.shards)})",
+            "exists": self.exists(),
+            "directory": str(self.persist_directory),
+            "collection_count": sum(c for c in counts if isinstance(c, int)),
+            "shard_counts": counts,
+        }
+
+    def export_records(self, batch_size: int = 256) -> Iterator[list[VectorRecord]]:
+        for shard in self.shards:
+            if shard.exists():
+                yield from shard.export_records(batch_size)
+
+    def import_records(self, batches: Iterable[list[VectorRecord]]) -> bool:
+        ok = True
+        for batch in batches:
+            groups: dict[int, list[VectorRecord]] = {}
+            for record in batch:
+                groups.setdefault(self.shard_index(record.metadata, record.text), []).append(record)
+            for index, group in sorted(groups.items()):
+                ok = self.shards[index].import_records([group]) and ok
+        return ok
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def rebuild_shard(self, index: int, batch_size: int = 256) -> int:
+        """Re-embed one shard's stored chunks in place; return the number of chunks.
+
+        Records are upserted under their existing ids, so this shard and the
+        others keep serving searches while it runs.
+        """
+        embedding = self._resolve_embedding()
+        if embedding is None:
+            raise RuntimeError("No embedding function available")
+        shard = self.shards[index]
+        records = [
+            VectorRecord(r.id, r.text, r.metadata, []) for batch in shard.export_records(batch_size) for r in batch
+        ]
+        for start in range(0, len(records), batch_size):
+            batch = records[start : start + batch_size]
+            for record, vector in zip(batch, embedding.embed_documents([r.text for r in batch])):
+                record.embedding = vector
+            if not shard.import_records([batch]):
+                raise RuntimeError(f"Failed to store chunks in shard {index}")
+        logger.info(f"[{self.name}] Rebuilt shard {index} with {len(records)} chunks")
+        return len(records)
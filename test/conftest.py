@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from zdt_agent.utils.ekb import EKBConfig, EmbeddingKnowledgeBase
+
+
+@pytest.fixture
+def make_kb(tmp_path: Path) -> Callable[..., EmbeddingKnowledgeBase]:
+    """Factory for knowledge bases stored under ``tmp_path/db`` that embed with a small fake model.
+
+    Sources default to ``tmp_path/src``; keyword arguments go to ``EKBConfig``.
+    """
+
+    def factory(
+        name: str = "kb",
+        sources: list[Path] | None = None,
+        embeddings: Embeddings | None = None,
+        **overrides: Any,
+    ) -> EmbeddingKnowledgeBase:
+        config = EKBConfig(
+            name=name,
+            source_paths=[str(source) for source in sources or [tmp_path / "src"]],
+            vector_db_path=str(tmp_path / "db"),
+            use_gitignore=False,
+            **overrides,
+        )
+        kb = EmbeddingKnowledgeBase(config)
+        kb._embeddings = embeddings if embeddings is not None else DeterministicFakeEmbedding(size=16)
+        return kb
+
+    return factory
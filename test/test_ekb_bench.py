@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from zdt_agent.utils.ekb_bench import run_benchmark
+
+
+def test_benchmark_reports_index_and_search_figures(tmp_path: Path) -> None:
+    report = run_benchmark(
+        files_per_kind=2, backends=["chroma", "chroma:2"], query_count=5, dimension=16, work_dir=tmp_path
+    )
+
+    assert report["params"]["files_per_kind"] == 2
+    assert [r["backend"] for r in report["results"]] == ["chroma", "chroma:2"]
+    for result in report["results"]:
+        assert result["index"]["files"] == 6
+        assert result["index"]["chunks"] >= 6
+        assert result["noop_reindex"]["files_unchanged"] == 6
+        assert result["search"]["p50_ms"] <= result["search"]["p99_ms"]
+        assert "p95_ms" in result["filtered_search"]
+    assert not any(tmp_path.iterdir())
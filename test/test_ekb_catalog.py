@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from zdt_agent.tools import embedding_knowledge_base as ekb_tools
+from zdt_agent.utils.ekb import EKBConfig, EmbeddingKnowledgeBase
+from zdt_agent.utils.ekb_catalog import list_summaries, read_summary
+from zdt_agent.utils.ekb_generations import SUMMARY_FILE
+
+
+def test_catalog_lists_knowledge_bases_without_loading_them(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.md").write_text("# Deploy\n\nHow to deploy the service.\n", encoding="utf-8")
+    (src / "b.txt").write_text("Release notes for the service.", encoding="utf-8")
+    db = tmp_path / "db"
+
+    config = EKBConfig(name="docs", source_paths=[str(src)], vector_db_path=str(db), use_gitignore=False)
+    kb = EmbeddingKnowledgeBase(config, embeddings=DeterministicFakeEmbedding(size=16))
+    kb.update_knowledge_base(["*.md", "*.txt"])
+    kb.add_documents_from_texts(["Extra note"])
+    (db / "broken").mkdir()
+
+    summary = read_summary(db / "docs")
+    assert summary is not None
+    assert (summary["total_documents"], summary["total_files"]) == (3, 2)
+    assert summary["file_types"] == {".md": 1, ".txt": 1}
+    assert summary["generation"] == kb.generation_id
+
+    # A knowledge base indexed before summaries existed is described from its metadata
+    (db / "docs" / SUMMARY_FILE).unlink()
+    fallback = read_summary(db / "docs")
+    assert fallback is not None and (fallback["total_documents"], fallback["total_files"]) == (2, 2)
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("catalog must not construct knowledge bases")
+
+    monkeypatch.setattr(EmbeddingKnowledgeBase, "__init__", fail)
+    monkeypatch.setattr(ekb_tools, "_CONFIG_BASE", db)
+    assert [s["name"] for s in list_summaries(db)] == ["broken", "docs"]
+    listing = ekb_tools.list_knowledge_bases.invoke({})
+    assert "**docs**" in listing and "Files: 2" in listing and "No valid configuration" in listing
+    assert "Total files: 2" in ekb_tools.get_knowledge_base_stats.invoke({"name": "docs"})
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from zdt_agent.utils.chunking import CodeChunker, MarkdownChunker
+
+
+def _function(name: str, body_lines: int) -> str:
+    body = "".join(f"    value_{i} = {i}\n" for i in range(body_lines))
+    return f"def {name}():\n{body}    return value_0\n"
+
+
+def test_python_chunks_keep_functions_whole() -> None:
+    source = "import os\n\n\n" + "\n\n".join(_function(f"f{i}", 12) for i in range(6))
+    chunks = CodeChunker(chunk_size=600, chunk_overlap=0).split({"content": source, "language": "python"})
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(chunk.text) <= 600
+        # Every chunk starts at a definition boundary and ends after a return
+        assert chunk.text.rstrip().endswith("return value_0")
+    symbols = [s for chunk in chunks for s in chunk.metadata["symbols"].split(", ")]
+    assert symbols == [f"f{i}" for i in range(6)]
+    assert chunks[0].metadata["start_line"] == 1
+    assert chunks[-1].metadata["end_line"] == len(source.splitlines())
+
+
+def test_oversized_brace_class_is_split_into_qualified_members() -> None:
+    methods = "\n".join(
+        f"    public int m{i}(int x) {{\n"
+        + "".join(f"        x += {j};\n" for j in range(10))
+        + "        return x;\n    }\n"
+        for i in range(4)
+    )
+    source = f"package demo;\n\npublic class Demo {{\n{methods}}}\n"
+    chunks = CodeChunker(chunk_size=400, chunk_overlap=0).split({"content": source, "language": "java"})
+
+    assert len(chunks) >= 2
+    assert all(len(chunk.text) <= 400 for chunk in chunks)
+    symbols = {s for chunk in chunks for s in chunk.metadata.get("symbols", "").split(", ") if s}
+    assert {f"Demo.m{i}" for i in range(4)} <= symbols
+    assert "\n".join(chunk.text for chunk in chunks).count("public int m") == 4
+
+
+def test_markdown_chunks_follow_heading_hierarchy() -> None:
+    filler = "lorem ipsum " * 20
+    source = "\n".join(
+        [
+            "# Guide",
+            "Intro.",
+            "## Install",
+            "### Linux",
+            filler,
+            "### macOS",
+            filler,
+            "## Usage",
+            "```bash",
+            "# not a heading",
+            "run --fast",
+            "```",
+            filler,
+        ]
+    )
+    chunks = MarkdownChunker(chunk_size=600, chunk_overlap=0).split({"content": source})
+
+    # The intro merges with the whole Install section, so that chunk keeps their common path.
+    assert [c.metadata.get("section_path") for c in chunks] == ["Guide", "Guide > Usage"]
+    assert chunks[0].text.startswith("# Guide\nIntro.\n\n## Install")
+    assert "### macOS" in chunks[0].text
+    assert "# not a heading" in chunks[1].text
+    assert all(len(c.text) <= 600 for c in chunks)
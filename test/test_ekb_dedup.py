@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+from zdt_agent.utils.dedup import DedupIndex
+from zdt_agent.utils.ekb import EmbeddingKnowledgeBase
+
+_LICENSE = (
+    "Permission is hereby granted, free of charge, to any person obtaining a copy of this software and "
+    "associated documentation files, to deal in the software without restriction, including without "
+    "limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and sell copies "
+    "of the software, subject to the following conditions: the above copyright notice shall be included "
+    "in all copies or substantial portions of the software, which is provided as is, without warranty."
+)
+
+
+def test_near_duplicates_match_above_threshold() -> None:
+    index = DedupIndex(threshold=0.8)
+    assert index.add("a.txt#0", "a.txt", _LICENSE) is None
+    assert index.add("b.txt#0", "b.txt", _LICENSE.replace("free of charge", "free of cost")) == "a.txt#0"
+    assert index.add("c.txt#0", "c.txt", "An entirely different paragraph about parsing. " * 8) is None
+    assert index.run_stats["near"] == 1
+    assert index.remove_file("a.txt") == {"b.txt"}
+    assert index.alternates_of("a.txt#0") == []
+
+
+def test_duplicate_chunks_are_stored_once(make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.txt").write_text(_LICENSE, encoding="utf-8")
+    (src / "b.txt").write_text(_LICENSE, encoding="utf-8")
+    (src / "c.txt").write_text("Unrelated notes about the build.", encoding="utf-8")
+
+    kb = make_kb(name="dedup", dedup=True)
+    result = kb.update_knowledge_base(["*.txt"])
+    assert result["new_documents_count"] == 2
+    assert result["dedup"]["exact_duplicates"] == 1
+    assert result["dedup"]["chars_saved"] == len(_LICENSE)
+
+    hit = next(r for r in kb.search("software warranty", k=2) if "alternate_sources" in r)
+    other = {"source_0:a.txt": "source_0:b.txt", "source_0:b.txt": "source_0:a.txt"}[hit["metadata"]["file_key"]]
+    assert hit["alternate_sources"] == [kb.metadata[other]["display_source"]]
+    assert kb.get_stats()["dedup"]["duplicate_chunks"] == 1
+
+    # Changing the canonical copy re-indexes the file that relied on it.
+    canonical = src / hit["metadata"]["file_key"].split(":", 1)[1]
+    canonical.write_text("Now this file says something else.", encoding="utf-8")
+    result = kb.update_knowledge_base(["*.txt"])
+    assert sorted(result["updated_files"]) == ["source_0:a.txt", "source_0:b.txt"]
+    assert result["new_documents_count"] == 2
+    assert kb.get_stats()["dedup"]["duplicate_chunks"] == 0
+
+    reopened = make_kb(name="dedup", dedup=True)
+    assert reopened.dedup is not None and len(reopened.dedup.entries) == 3
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from zdt_agent.utils.ekb import EmbeddingKnowledgeBase
+
+
+@pytest.fixture
+def corpus(tmp_path: Path) -> Path:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "keep.md").write_text("# Keep\nCats and dogs.\n", encoding="utf-8")
+    (src / "drop.md").write_text("# Drop\nParrots.\n", encoding="utf-8")
+    return src
+
+
+def test_rebuild_keeps_serving_old_generation_until_flip(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path, corpus: Path
+) -> None:
+    kb = make_kb(name="gen")
+    assert kb.update_knowledge_base()["success"]
+    first_generation = kb.generation_id
+    assert kb.search("cats", k=5)
+
+    rebuilt = make_kb(name="gen", exclude_patterns=[r"drop\.md$"])
+    # Config changed: the old generation is still served and config.json is untouched.
+    assert rebuilt.generation_id == first_generation
+    assert rebuilt.search("cats", k=5)
+    saved = json.loads((tmp_path / "db" / "gen" / "config.json").read_text(encoding="utf-8"))
+    assert saved["exclude_patterns"] is None
+
+    result = rebuilt.update_knowledge_base()
+    assert result["success"]
+    assert rebuilt.generation_id != first_generation
+    assert set(rebuilt.metadata) == {"source_0:keep.md"}
+
+    # The first instance follows the pointer flip on its next search.
+    sources = {r["metadata"]["source"] for r in kb.search("parrots", k=5)}
+    assert kb.generation_id == rebuilt.generation_id
+    assert sources == {"keep.md"}
+
+
+def test_legacy_layout_is_migrated_into_first_generation(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path, corpus: Path
+) -> None:
+    legacy_root = tmp_path / "db" / "gen"
+    legacy_root.mkdir(parents=True)
+    (legacy_root / "metadata.json").write_text(json.dumps({"source_0:keep.md": {"hash": "x"}}), encoding="utf-8")
+
+    kb = make_kb(name="gen")
+    assert kb.generation_path.parent.name == "generations"
+    assert (kb.generation_path / "metadata.json").exists()
+    assert not (legacy_root / "metadata.json").exists()
+
+
+def test_pending_rebuild_embeds_queries_with_the_served_generation_model(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], corpus: Path
+) -> None:
+    models = {"old-model": DeterministicFakeEmbedding(size=16), "new-model": DeterministicFakeEmbedding(size=32)}
+    kb = make_kb(name="gen", embedding_model="old-model")
+    kb._embeddings, kb._models = None, dict(models)
+    assert kb.update_knowledge_base()["success"]
+
+    rebuilt = make_kb(name="gen", embedding_model="new-model")
+    rebuilt._embeddings, rebuilt._models = None, dict(models)
+    assert rebuilt.rebuild_pending
+    # Still served by the 16-dimensional generation, so the query must use the old model
+    assert rebuilt.search("cats", k=5)
+
+    assert rebuilt.update_knowledge_base()["success"]
+    assert rebuilt.served_embedding_model == "new-model"
+    assert rebuilt.search("cats", k=5)
+
+
+def test_generations_are_allocated_on_update_and_unflipped_ones_survive_pruning(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path, corpus: Path
+) -> None:
+    kb = make_kb(name="gen")
+    assert kb.update_knowledge_base()["success"]
+    generations = tmp_path / "db" / "gen" / "generations"
+    assert len(list(generations.iterdir())) == 1
+
+    make_kb(name="gen", chunk_size=500)
+    assert len(list(generations.iterdir())) == 1
+
+    # Another process is still building this generation
+    building, _ = kb.generations.create()
+    for chunk_size in (500, 400, 300):
+        assert make_kb(name="gen", chunk_size=chunk_size).update_knowledge_base()["success"]
+    pointer = json.loads((tmp_path / "db" / "gen" / "current.json").read_text(encoding="utf-8"))
+    assert sorted(p.name for p in generations.iterdir()) == sorted({building, pointer["current"], pointer["previous"]})
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from zdt_agent.utils.ekb import EmbeddingKnowledgeBase
+from zdt_agent.utils.json_stream import iter_json_records
+
+
+def test_iter_json_records_streams_nested_array_with_small_reads(tmp_path: Path, monkeypatch) -> None:
+    records = [{"id": i, "text": f"entry {i} with ] and }} inside"} for i in range(50)]
+    payload = {"meta": {"skip": [1, 2, {"deep": "[{"}]}, "data": {"items": records}, "after": "ignored"}
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+    monkeypatch.setattr("zdt_agent.utils.json_stream._JSONStream.__init__.__defaults__", (7,))
+    assert [record for _, record in iter_json_records(path, ["data", "items"])] == records
+    assert list(iter_json_records(path, ["missing"])) == []
+
+
+def test_jsonl_and_record_path_index_one_document_per_record(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path
+) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    lines = [json.dumps({"title": f"event {i}", "message": f"user {i} logged in"}) for i in range(3)]
+    (src / "events.jsonl").write_text("\n".join(lines + ["not json"]) + "\n", encoding="utf-8")
+    (src / "export.json").write_text(json.dumps({"items": [{"text": "alpha"}, {"text": "beta"}]}), encoding="utf-8")
+
+    kb = make_kb(name="records", json_record_path="$.items")
+    result = kb.update_knowledge_base()
+    assert result["new_documents_count"] == 5
+    assert kb.metadata["source_0:events.jsonl"]["records_count"] == 3
+    assert kb.metadata["source_0:export.json"]["records_count"] == 2
+
+    titles = {r["metadata"]["title"] for r in kb.search("logged in", k=10)}
+    assert {"event 0", "event 1", "event 2", "export[0]", "export[1]"} == titles
+
+
+def test_failed_store_keeps_previous_chunks_and_metadata(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    note = src / "a.md"
+    note.write_text("# A\nalpha\n", encoding="utf-8")
+    kb = make_kb(name="records")
+    assert kb.update_knowledge_base()["success"]
+    stored_hash = kb.metadata["source_0:a.md"]["hash"]
+
+    note.write_text("# A\nalpha, revised\n", encoding="utf-8")
+    monkeypatch.setattr(kb.vector_db, "add_documents", lambda documents: False)
+    result = kb.update_knowledge_base()
+    assert not result["success"]
+    assert "chunks_embedded" not in result["metrics"]["counters"]
+    assert kb.metadata["source_0:a.md"]["hash"] == stored_hash
+    assert kb.vector_db.get_stats()["collection_count"] == 1
+
+    monkeypatch.undo()
+    assert kb.update_knowledge_base()["updated_files"] == ["source_0:a.md"]
+    assert kb.vector_db.get_stats()["collection_count"] == 1
+    assert "revised" in kb.search("alpha", k=1)[0]["content"]
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from zdt_agent.utils.ekb import EmbeddingKnowledgeBase
+
+
+def test_filtered_search_selects_candidates_before_scoring(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path
+) -> None:
+    notes, guides = tmp_path / "notes", tmp_path / "guides"
+    notes.mkdir()
+    guides.mkdir()
+    for i in range(40):
+        (notes / f"n{i}.txt").write_text(f"Deploy log {i}: rolled out build {i}.", encoding="utf-8")
+    (guides / "deploy.md").write_text(
+        "---\ntitle: Deploying\ntags: [ops, release]\n---\n\nHow to deploy the service.\n", encoding="utf-8"
+    )
+    (guides / "style.md").write_text("---\ntitle: Style\ntags: [docs]\n---\n\nWriting style.\n", encoding="utf-8")
+
+    kb = make_kb(name="filters", sources=[notes, guides])
+    kb.update_knowledge_base(["*.txt", "*.md"])
+    assert kb.metadata["source_1:deploy.md"]["tags"] == ["ops", "release"]
+
+    def sources(**filters) -> list[str]:
+        return sorted(r["metadata"]["source"] for r in kb.search("deploy", k=5, filters=filters))
+
+    assert sources(file_type="md") == ["deploy.md", "style.md"]
+    assert sources(tags="release") == ["deploy.md"]
+    assert sources(tags=["ops", "docs"], file_type=".md") == ["deploy.md", "style.md"]
+    assert sources(source_root=str(guides), tags="missing") == []
+    assert len(sources(source_root=str(notes))) == 5
+    assert all(s.endswith(".txt") for s in sources(source_root=str(notes)))
+
+    with pytest.raises(ValueError, match="author"):
+        kb.search("deploy", filters={"author": "me"})
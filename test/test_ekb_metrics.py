@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from zdt_agent.utils.ekb import EKBConfig, EmbeddingKnowledgeBase
+from zdt_agent.utils.ekb_metrics import logger as metrics_logger
+
+
+class _Collect(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.reports: list[dict] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if hasattr(record, "ekb_metrics"):
+            self.reports.append(record.ekb_metrics)
+
+
+def test_search_and_update_report_stage_metrics(tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.md").write_text("# Deploy\n\nHow to deploy the service.\n", encoding="utf-8")
+    (src / "b.txt").write_text("Release notes for the service.", encoding="utf-8")
+
+    config = EKBConfig(
+        name="metrics", source_paths=[str(src)], vector_db_path=str(tmp_path / "db"), use_gitignore=False
+    )
+    kb = EmbeddingKnowledgeBase(config)
+    kb._embeddings = DeterministicFakeEmbedding(size=16)
+    handler = _Collect()
+    metrics_logger.addHandler(handler)
+    try:
+        first = kb.update_knowledge_base(["*.md", "*.txt"])["metrics"]
+        second = kb.update_knowledge_base(["*.md", "*.txt"])["metrics"]
+        results = kb.search("deploy", k=2, explain=True)
+    finally:
+        metrics_logger.removeHandler(handler)
+
+    assert first["counters"] == {"files_scanned": 2, "files_hashed": 2, "files_parsed": 2, "chunks_embedded": 2}
+    assert {"discover", "scan", "parse", "store", "embed_documents"} <= set(first["stages"])
+    assert first["chunks_per_second"] > 0
+    assert second["counters"]["files_unchanged"] == 2
+    assert "files_parsed" not in second["counters"]
+
+    search = kb.last_search_metrics
+    assert search is not None
+    assert {"embed_query", "vector_search", "rerank"} <= set(search["stages"])
+    assert search["counters"]["results"] == 2
+    assert sum(search["stages"].values()) <= search["total_seconds"] + 1e-6
+    for result in results:
+        assert set(result["explain"]) == {"vector", "keyword", "title", "metadata"}
+        assert sum(result["explain"].values()) == pytest.approx(result["relevance_score"])
+
+    assert [r["kind"] for r in handler.reports] == ["update", "update", "search"]
+    summary = kb.get_database_info()["metrics"]
+    assert summary["update"]["count"] == 2 and summary["search"]["count"] == 1
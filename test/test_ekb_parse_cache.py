@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from zdt_agent.utils.doc_processor import CodeProcessor, MarkdownProcessor, ProcessorProfile
+from zdt_agent.utils.ekb import EmbeddingKnowledgeBase
+
+
+def test_chunking_change_rebuilds_without_reparsing(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "notes.md").write_text("# Notes\n" + "word " * 300, encoding="utf-8")
+
+    calls: list[Path] = []
+    original = MarkdownProcessor.process
+
+    def counting_process(self, file_path: Path):
+        calls.append(file_path)
+        return original(self, file_path)
+
+    monkeypatch.setattr(MarkdownProcessor, "process", counting_process)
+
+    first = make_kb(name="cache", chunk_size=2000)
+    assert first.update_knowledge_base()["new_documents_count"] == 1
+    assert len(calls) == 1
+
+    rebuilt = make_kb(name="cache", chunk_size=500)
+    assert rebuilt.rebuild_pending
+    result = rebuilt.update_knowledge_base()
+    assert result["new_documents_count"] > 1
+    assert len(calls) == 1
+    assert rebuilt.parse_cache.hits == 1
+    assert rebuilt.saved_config["chunk_size"] == 500
+
+
+def test_legacy_config_without_chunk_settings_is_not_rebuilt(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path
+) -> None:
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.md").write_text("# A\nalpha\n", encoding="utf-8")
+    kb = make_kb(name="cache")
+    kb.update_knowledge_base()
+
+    for key in ("chunk_size", "chunk_overlap", "embedding_model"):
+        kb.saved_config.pop(key)
+    kb._write_config(kb.saved_config)
+
+    reopened = make_kb(name="cache")
+    assert not reopened.rebuild_pending
+    assert reopened.saved_config["chunk_size"] == 2000
+
+
+def test_standard_profile_skips_rich_only_fields(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path
+) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "mod.py").write_text("# author: Ada\nimport os\n\n\ndef run():\n    return os.getcwd()\n", encoding="utf-8")
+
+    kb = make_kb(name="cache")
+    processor = next(p for p in kb.processors if isinstance(p, CodeProcessor))
+    parsed = processor.process(src / "mod.py")
+    assert parsed["metadata"] == {"author": "Ada"}
+
+    rich = CodeProcessor(profile=ProcessorProfile.RICH).process(src / "mod.py")
+    assert rich["metadata"]["dependencies"] == ["os"]
+    assert rich["metadata"]["code_stats"]["functions"] == 1
+    assert processor.cache_key() != CodeProcessor(profile=ProcessorProfile.RICH).cache_key()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from zdt_agent.utils.ekb import EmbeddingKnowledgeBase
+from zdt_agent.utils.file_prefilter import FilePrefilter
+
+
+def test_skipped_files_are_recorded_and_not_reexamined(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "ok.txt").write_text("plain notes\n", encoding="utf-8")
+    (src / "blob.txt").write_bytes(b"\x00\x01binary" * 100)
+    (src / "big.md").write_text("# Big\n" + "x" * 2000, encoding="utf-8")
+    (src / "bundle.txt").write_text("var a=1;" * 1000, encoding="utf-8")
+
+    kb = make_kb(name="prefilter", max_file_sizes={"markdown": 1000})
+    result = kb.update_knowledge_base(["*.txt", "*.md"])
+    assert result["updated_files"] == ["source_0:ok.txt"]
+    reasons = {key: meta["skipped"] for key, meta in kb.metadata.items() if "skipped" in meta}
+    assert reasons == {
+        "source_0:blob.txt": "binary",
+        "source_0:big.md": "too_large",
+        "source_0:bundle.txt": "minified",
+    }
+    stats = kb.get_stats()
+    assert stats["total_files"] == 1
+    assert stats["skipped_files"] == {"binary": 1, "too_large": 1, "minified": 1}
+
+    checks: list[Path] = []
+    original = FilePrefilter.check
+    monkeypatch.setattr(FilePrefilter, "check", lambda self, path, *a: checks.append(path) or original(self, path, *a))
+    assert kb.update_knowledge_base(["*.txt", "*.md"])["skipped_files"] == []
+    assert checks == [src / "ok.txt"]
+
+    # Raising the limit re-examines the oversized file.
+    kb.prefilter.size_limits["markdown"] = 10_000
+    assert kb.update_knowledge_base(["*.md"])["updated_files"] == ["source_0:big.md"]
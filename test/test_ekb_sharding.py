@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from zdt_agent.utils.ekb import EmbeddingKnowledgeBase
+from zdt_agent.utils.vector_db_sharded import ShardedVectorDatabase
+
+
+class _CountingEmbedding(DeterministicFakeEmbedding):
+    queries: int = 0
+
+    def embed_query(self, text: str) -> list[float]:
+        self.queries += 1
+        return super().embed_query(text)
+
+
+def test_sharded_search_matches_single_store(make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(12):
+        (src / f"note{i}.txt").write_text(f"Note {i} covers topic {i % 4} in some detail.", encoding="utf-8")
+
+    single = make_kb("single", embeddings=_CountingEmbedding(size=16))
+    sharded = make_kb("sharded", embeddings=_CountingEmbedding(size=16), shards=3)
+    assert isinstance(sharded.vector_db, ShardedVectorDatabase)
+    single.update_knowledge_base(["*.txt"])
+    sharded.update_knowledge_base(["*.txt"])
+
+    counts = sharded.get_database_info()["shard_counts"]
+    assert sum(counts) == 12 and all(counts)
+
+    expected = [(r["content"], r["score"]) for r in single.search("topic 2", k=5)]
+    embedding = sharded._embeddings
+    assert isinstance(embedding, _CountingEmbedding)
+    embedding.queries = 0
+    assert [(r["content"], r["score"]) for r in sharded.search("topic 2", k=5)] == pytest.approx(expected)
+    assert embedding.queries == 1
+
+    # A changed file replaces its chunk on whichever shard holds it.
+    (src / "note0.txt").write_text("Note 0 was rewritten.", encoding="utf-8")
+    sharded.update_knowledge_base(["*.txt"])
+    assert sharded.get_stats()["total_documents"] == 12
+
+    assert sharded.rebuild_shard(1)["new_documents_count"] == counts[1]
+    assert sharded.get_database_info()["shard_counts"][1] == counts[1]
+    assert single.rebuild_shard(0)["success"] is False
+
+
+def test_resharding_keeps_serving_until_the_rebuild_flips(
+    make_kb: Callable[..., EmbeddingKnowledgeBase], tmp_path: Path
+) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(6):
+        (src / f"note{i}.txt").write_text(f"Note {i} covers topic {i % 3}.", encoding="utf-8")
+    make_kb().update_knowledge_base(["*.txt"])
+
+    resharded = make_kb(shards=3)
+    assert resharded.rebuild_pending
+    assert not isinstance(resharded.vector_db, ShardedVectorDatabase)
+    assert len(resharded.search("topic 1", k=3)) == 3
+
+    resharded.update_knowledge_base(["*.txt"])
+    assert not resharded.rebuild_pending
+    assert isinstance(resharded.vector_db, ShardedVectorDatabase)
+    assert sum(resharded.get_database_info()["shard_counts"]) == 6
+    assert len(resharded.search("topic 1", k=3)) == 3
+    assert isinstance(make_kb(shards=3).vector_db, ShardedVectorDatabase)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from zdt_agent.utils.ekb import EKBConfig, EmbeddingKnowledgeBase
+from zdt_agent.utils.ekb_snapshot import SnapshotError, export_snapshot, import_snapshot
+
+
+class _QueryOnlyEmbedding(DeterministicFakeEmbedding):
+    """Embeds queries but fails if asked to embed documents."""
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise AssertionError("documents must not be re-embedded")
+
+
+def _open_kb(root: Path, name: str, source: Path) -> EmbeddingKnowledgeBase:
+    config = EKBConfig(name=name, source_paths=[str(source)], vector_db_path=str(root), use_gitignore=False)
+    kb = EmbeddingKnowledgeBase(config)
+    kb._embeddings = DeterministicFakeEmbedding(size=16)
+    return kb
+
+
+def test_snapshot_round_trip_without_reembedding(tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "alpha.md").write_text("# Alpha\n\nThe alpha service handles billing.\n", encoding="utf-8")
+    (src / "beta.txt").write_text("Beta runs the nightly reports.", encoding="utf-8")
+
+    kb = _open_kb(tmp_path / "build", "kb", src)
+    assert kb.update_knowledge_base(["*.md", "*.txt"])["new_documents_count"] == 2
+    archive = tmp_path / "kb.zip"
+    manifest = export_snapshot(kb, archive)
+    assert manifest["records"] == 2
+    assert manifest["dimension"] == 16
+
+    result = import_snapshot(archive, tmp_path / "node", name="shipped")
+    assert result["name"] == "shipped"
+
+    shipped = _open_kb(tmp_path / "node", "shipped", src)
+    shipped._embeddings = _QueryOnlyEmbedding(size=16)
+    assert not shipped.rebuild_pending
+    assert shipped.metadata == kb.metadata
+    assert shipped.saved_config["imported_from"] == "kb"
+
+    expected = [(r["content"], r["score"]) for r in kb.search("billing", k=2)]
+    assert [(r["content"], r["score"]) for r in shipped.search("billing", k=2)] == pytest.approx(expected)
+    # Unchanged sources are not re-processed on the imported node.
+    assert shipped.update_knowledge_base(["*.md", "*.txt"])["updated_files"] == []
+
+
+def test_corrupt_snapshot_is_rejected(tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "notes.txt").write_text("Some notes.", encoding="utf-8")
+    kb = _open_kb(tmp_path / "build", "kb", src)
+    kb.update_knowledge_base(["*.txt"])
+    archive = tmp_path / "kb.zip"
+    export_snapshot(kb, archive)
+
+    tampered = tmp_path / "tampered.zip"
+    with zipfile.ZipFile(archive) as src_zip, zipfile.ZipFile(tampered, "w") as dst_zip:
+        for item in src_zip.infolist():
+            data = src_zip.read(item)
+            if item.filename == "metadata.json":
+                data = json.dumps({"forged": {}}).encode("utf-8")
+            dst_zip.writestr(item, data)
+
+    with pytest.raises(SnapshotError, match="metadata.json"):
+        import_snapshot(tampered, tmp_path / "node")
+    assert not list((tmp_path / "node").glob("kb/generations/*"))
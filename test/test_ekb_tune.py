@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from zdt_agent import manage_kb
+from zdt_agent.utils.ekb import EKBConfig, EmbeddingKnowledgeBase
+from zdt_agent.utils.ekb_tune import RERANK_PRESETS, apply_best, load_query_set, tune
+
+
+def test_tune_sweeps_settings_and_writes_best_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    src = tmp_path / "src"
+    (src / "ops").mkdir(parents=True)
+    (src / "ops" / "rollback.md").write_text("# Rollback\n\nHow to roll back a release.\n" * 20, encoding="utf-8")
+    (src / "ops" / "deploy.md").write_text("# Deploy\n\nHow to deploy the service.\n" * 20, encoding="utf-8")
+    (src / "notes.md").write_text("# Notes\n\nMeeting notes about hiring.\n" * 20, encoding="utf-8")
+    queries_file = tmp_path / "queries.jsonl"
+    queries_file.write_text(
+        '{"query": "rollback", "relevant": ["ops/rollback.md"]}\n{"query": "deploy", "relevant": "ops/deploy.md"}\n',
+        encoding="utf-8",
+    )
+
+    def config() -> EKBConfig:
+        return EKBConfig(name="tune", source_paths=[str(src)], vector_db_path=str(tmp_path / "db"), use_gitignore=False)
+
+    embeddings = DeterministicFakeEmbedding(size=16)
+    kb = EmbeddingKnowledgeBase(config(), embeddings=embeddings)
+    kb.update_knowledge_base(["*.md"])
+
+    queries = load_query_set(queries_file)
+    report = tune(
+        kb,
+        queries,
+        chunk_sizes=[200, 2000],
+        chunk_overlaps=[0, 500],
+        search_ks=[4, 10],
+        weights={"default": RERANK_PRESETS["default"], "keyword": RERANK_PRESETS["keyword"]},
+        k=1,
+        work_dir=tmp_path,
+    )
+
+    # 200/500 is skipped: overlap must be smaller than the chunk size
+    assert len(report["trials"]) == 3 * 2 * 2
+    assert report["sample_files"] == 3
+    best = report["best"]
+    assert best["recall_at_k"] == max(t["recall_at_k"] for t in report["trials"])
+    assert {"index_chunks", "index_bytes", "p95_latency_ms"} <= set(best)
+    assert best["recall_at_k"] == 1.0  # keyword weighting finds the labelled file by name
+    assert not any(p.name.startswith("ekb_tune_") for p in tmp_path.iterdir())
+
+    best = {**best, "chunk_size": 200, "chunk_overlap": 0}
+    result = apply_best(config(), best, ["*.md"], embeddings=embeddings)
+    assert result["success"] and result["rebuilt"]
+    saved = json.loads((tmp_path / "db" / "tune" / "config.json").read_text(encoding="utf-8"))
+    assert (saved["chunk_size"], saved["search_k"]) == (200, best["search_k"])
+    assert saved["rerank_weights"] == best["rerank_weights"]
+
+    # Search settings alone do not trigger a rebuild
+    result = apply_best(config(), {**best, "search_k": 20}, ["*.md"], embeddings=embeddings)
+    assert result == {"success": True, "rebuilt": False}
+
+    # A plain `update` keeps the tuned chunking instead of resetting it and re-embedding everything
+    monkeypatch.setattr(manage_kb, "_vector_db_root", lambda: tmp_path / "db")
+    args = manage_kb.setup_parsers().parse_args(["update", "-n", "tune", "-s", str(src), "--no-gitignore"])
+    update_config = manage_kb.create_kb_config(args)
+    update_config.vector_db_path = str(tmp_path / "db")
+    assert (update_config.chunk_size, update_config.chunk_overlap) == (200, 0)
+    assert not EmbeddingKnowledgeBase(update_config, embeddings=embeddings).rebuild_pending
+    args = manage_kb.setup_parsers().parse_args(["update", "-n", "tune", "-s", str(src), "--chunk-size", "300"])
+    assert manage_kb.create_kb_config(args).chunk_size == 300
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from zdt_agent.prompt_manager.preset import engine_manager as engine_manager_module
+from zdt_agent.prompt_manager.preset.engine_manager import LoreBookEngineManager
+from zdt_agent.prompt_manager.runtime import MultiLoreBookRuntimeEngine, RuntimeContext
+from zdt_agent.prompt_manager.utils import semantic as semantic_module
+
+_ENTRY = """---
+triggers:
+  keywords: [{keyword}]
+advanced:
+  sticky_turns: 3
+---
+
+{body}
+"""
+
+
+def _write_entry(entries: Path, name: str, keyword: str, body: str) -> None:
+    (entries / f"{name}.md").write_text(_ENTRY.format(keyword=keyword, body=body), encoding="utf-8")
+
+
+def test_engine_is_rebuilt_only_when_sources_change(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    entries = tmp_path / "book" / "entries"
+    entries.mkdir(parents=True)
+    _write_entry(entries, "python", "python", "Use uv for Python environments.")
+    _write_entry(entries, "rust", "rust", "Use cargo.")
+
+    builds: list[Path] = []
+    real_build = engine_manager_module.build_lorebook
+
+    def counting_build(source: Path, output: Path, **kwargs: object) -> dict:
+        builds.append(source)
+        return real_build(source=source, output=output, **kwargs)
+
+    monkeypatch.setattr(engine_manager_module, "build_lorebook", counting_build)
+    manager = LoreBookEngineManager(tmp_path)
+
+    engine = manager.get_engine("book")
+    assert manager.get_engine("book") is engine
+    assert len(builds) == 1
+
+    # Inject "python" on turn 0 so it is sticky for the next turns
+    context = RuntimeContext(request_id="r0", session_id="s", role="user", text="python?", turn_index=0)
+    assert MultiLoreBookRuntimeEngine([engine]).run(context).injected_entries == ["book:python"]
+
+    path = entries / "python.md"
+    _write_entry(entries, "python", "python", "Use uv and ruff for Python projects.")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    rebuilt = manager.get_engine("book")
+    assert rebuilt is not engine and len(builds) == 2
+    assert "ruff" in next(e.content for e in rebuilt.lorebook.entries if e.id == "python")
+
+    later = RuntimeContext(request_id="r1", session_id="s", role="user", text="unrelated", turn_index=1)
+    assert MultiLoreBookRuntimeEngine([rebuilt]).run(later).injected_entries == ["book:python"]
+
+    (entries / "rust.md").unlink()
+    assert [e.id for e in manager.get_engine("book").lorebook.entries] == ["python"]
+    assert len(builds) == 3
+
+
+def test_new_manager_loads_the_compiled_lorebook_without_building(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    entries = tmp_path / "book" / "entries"
+    entries.mkdir(parents=True)
+    _write_entry(entries, "python", "python", "Use uv for Python environments.")
+    LoreBookEngineManager(tmp_path, tokenizer="whitespace").get_engine("book")
+    # Plain data only: nothing in the artifact is executed on load
+    compiled = json.loads((tmp_path / "book" / "lorebook.compiled.json").read_text(encoding="utf-8"))
+    assert compiled["fingerprint"]["tokenizer"] == "whitespace"
+
+    def failing_build(source: Path, output: Path, **kwargs: object) -> dict:
+        raise AssertionError("unchanged sources must not be rebuilt")
+
+    monkeypatch.setattr(engine_manager_module, "build_lorebook", failing_build)
+    engine = LoreBookEngineManager(tmp_path, tokenizer="whitespace").get_engine("book")
+    assert engine.get_entry("python") is engine.lorebook.entries[0]
+    context = RuntimeContext(request_id="r0", session_id="s", role="user", text="python?", turn_index=0)
+    assert MultiLoreBookRuntimeEngine([engine]).run(context).injected_entries == ["book:python"]
+
+    # Different build parameters invalidate the artifact
+    with pytest.raises(AssertionError, match="must not be rebuilt"):
+        LoreBookEngineManager(tmp_path, tokenizer="whitespace", embedding_model="other").get_engine("book")
+
+
+class _DragonEmbedding(Embeddings):
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [float(text.lower().count("dragon")), 1.0]
+
+
+def test_build_without_embeddings_is_retried_by_the_next_manager(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    entries = tmp_path / "book" / "entries"
+    entries.mkdir(parents=True)
+    (entries / "dragon.md").write_text("---\ntriggers:\n  semantic_threshold: 0.9\n---\n\nA dragon.\n")
+    model = "test-dragon-embedding"
+    context = RuntimeContext(request_id="r0", session_id="s", role="user", text="dragon", turn_index=0)
+
+    # The model fails to load: the lorebook still works, but no artifact freezes the missing embedding
+    monkeypatch.setitem(semantic_module._models, model, None)
+    engine = LoreBookEngineManager(tmp_path, tokenizer="whitespace", embedding_model=model).get_engine("book")
+    assert engine.lorebook.entries[0].embedding is None
+    assert not (tmp_path / "book" / "lorebook.compiled.json").exists()
+
+    semantic_module.register_embeddings(model, _DragonEmbedding())
+    engine = LoreBookEngineManager(tmp_path, tokenizer="whitespace", embedding_model=model).get_engine("book")
+    assert engine.lorebook.entries[0].embedding is not None
+    assert MultiLoreBookRuntimeEngine([engine]).run(context).injected_entries == ["book:dragon"]
+    assert (tmp_path / "book" / "lorebook.compiled.json").exists()
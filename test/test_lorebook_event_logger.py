@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from zdt_agent.prompt_manager.runtime import LoreBookRuntimeEngine, RuntimeContext
+from zdt_agent.prompt_manager.types import (
+    EntryAdvanced,
+    EntryBudget,
+    EntryFilters,
+    EntryInjection,
+    EntryResolved,
+    EntryTriggers,
+    LoreBook,
+    LoreBookBudget,
+    LoreEntry,
+    RuntimeConfig,
+    RuntimeEvent,
+    Stage,
+)
+from zdt_agent.prompt_manager.utils import logger as logger_module
+from zdt_agent.prompt_manager.utils.logger import LoreBookEventLogger
+
+
+def _events(count: int, start: int = 0) -> list[RuntimeEvent]:
+    return [
+        RuntimeEvent(time.monotonic(), f"r{n}", "s", "book", Stage.MATCH, "completed", "match_completed")
+        for n in range(start, start + count)
+    ]
+
+
+def _lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_ring_buffer_keeps_newest_events_and_rotates(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    event_logger = LoreBookEventLogger(path, capacity=3, batch_size=100, flush_interval=60, max_bytes=1)
+    event_logger.append_events(_events(5))
+    assert event_logger.dropped_events == 2
+    event_logger.flush()
+    lines = _lines(path)
+    assert [line["request_id"] for line in lines] == ["r2", "r3", "r4"]
+    assert lines[0]["ts"].endswith("+00:00") and lines[0]["stage"] == "match"
+
+    event_logger.append_events(_events(1, start=5))
+    event_logger.close()
+    assert [line["request_id"] for line in _lines(path)] == ["r5"]
+    assert len(_lines(tmp_path / "events.jsonl.1")) == 3
+
+
+def test_background_writer_flushes_on_interval(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    event_logger = LoreBookEventLogger(path, flush_interval=0.01)
+    event_logger.append_events(_events(2))
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    event_logger.close()
+    assert len(_lines(path)) == 2
+
+
+def test_flush_waits_for_the_batch_the_writer_is_writing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "events.jsonl"
+    writing = threading.Event()
+    real_event_line = logger_module._event_line
+
+    def slow_event_line(event: RuntimeEvent) -> str:
+        if event.request_id == "r0":
+            writing.set()
+            time.sleep(0.2)
+        return real_event_line(event)
+
+    monkeypatch.setattr(logger_module, "_event_line", slow_event_line)
+    event_logger = LoreBookEventLogger(path, batch_size=1, flush_interval=60)
+    event_logger.append_events(_events(1))
+    assert writing.wait(5)
+    # The writer thread holds batch r0; a flush of r1 must not overtake it
+    event_logger.append_events(_events(1, start=1))
+    event_logger.flush()
+    event_logger.close()
+    assert [line["request_id"] for line in _lines(path)] == ["r0", "r1"]
+
+
+@pytest.mark.parametrize(("log_level", "has_match_events"), [("normal", False), ("debug", True)])
+def test_per_entry_match_events_are_debug_only(log_level: str, has_match_events: bool) -> None:
+    triggers = EntryTriggers(keywords=["python"])
+    resolved = EntryResolved(triggers, EntryFilters(), EntryInjection(), EntryAdvanced(), EntryBudget())
+    entry = LoreEntry(id="python", path="entries/python.md", enabled=True, content="uv", resolved=resolved)
+    lorebook = LoreBook(
+        id="book",
+        name="book",
+        enabled=True,
+        description="",
+        budget=LoreBookBudget(),
+        entries=[entry],
+        runtime=RuntimeConfig(log_level=log_level),
+    )
+    context = RuntimeContext(request_id="r", session_id="s", role="user", text="python")
+    events = LoreBookRuntimeEngine(lorebook).run_pre_inject(context).events
+    assert any(e.stage == Stage.MATCH and e.entry_id == "python" for e in events) is has_match_events
+    assert any(e.stage == Stage.MATCH and e.action == "completed" for e in events)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from zdt_agent.prompt_manager.preset.builder import scan_window
+from zdt_agent.prompt_manager.runtime import LoreBookRuntimeEngine, RuntimeContext, ScanMessage
+from zdt_agent.prompt_manager.runtime.trigger_index import TriggerIndex
+from zdt_agent.prompt_manager.types import (
+    EntryAdvanced,
+    EntryBudget,
+    EntryFilters,
+    EntryInjection,
+    EntryResolved,
+    EntryTriggers,
+    LoreBook,
+    LoreBookBudget,
+    LoreEntry,
+)
+
+
+def _engine() -> LoreBookRuntimeEngine:
+    resolved = EntryResolved(
+        EntryTriggers(keywords=["ruff"]), EntryFilters(), EntryInjection(), EntryAdvanced(), EntryBudget()
+    )
+    entry = LoreEntry(id="ruff", path="entries/ruff.md", enabled=True, content="Use ruff.", resolved=resolved)
+    return LoreBookRuntimeEngine(
+        LoreBook(id="book", name="book", enabled=True, description="", budget=LoreBookBudget(), entries=[entry])
+    )
+
+
+def test_window_messages_trigger_and_are_scanned_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    scanned: list[str] = []
+    real_scan = TriggerIndex.scan
+
+    def counting_scan(self: TriggerIndex, text: str) -> dict:
+        scanned.append(text)
+        return real_scan(self, text)
+
+    monkeypatch.setattr(TriggerIndex, "scan", counting_scan)
+    engine = _engine()
+    window = [ScanMessage("m1", "ruff failed: E501"), ScanMessage("m2", "fixed, ruff passes")]
+
+    for turn, text in enumerate(["hello", "thanks"]):
+        context = RuntimeContext(
+            request_id=f"r{turn}", session_id="s", role="user", text=text, turn_index=turn, recent_messages=window
+        )
+        result = engine.run_pre_inject(context)
+        assert [entry.id for entry in result.matched] == ["ruff"]
+        assert result.match_scores == {"ruff": 2}
+
+    assert scanned == ["hello", "ruff failed: E501", "fixed, ruff passes", "thanks"]
+
+
+def test_scan_window_keeps_the_last_messages_with_stable_ids() -> None:
+    history = [
+        HumanMessage(content="first"),
+        AIMessage(content="run ruff", id="ai-1"),
+        ToolMessage(content="ruff: 3 errors", tool_call_id="call-1"),
+    ]
+    window = scan_window(history, 2)
+    assert [message.text for message in window] == ["run ruff", "ruff: 3 errors"]
+    assert window[0].id == "ai-1"
+    assert scan_window(history, 2)[1].id == window[1].id
+    assert scan_window(history, 0) == []
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from zdt_agent.prompt_manager import build_lorebook, load_lorebook
+from zdt_agent.prompt_manager.runtime import LoreBookRuntimeEngine, RuntimeContext
+from zdt_agent.prompt_manager.utils.semantic import register_embeddings
+
+_VOCABULARY = ("dragon", "fire", "rain", "cloud", "sword")
+_ENTRIES = {
+    "dragon": ("semantic_threshold: 0.6", "beasts", "A dragon breathes fire."),
+    "wyrm": ("semantic_threshold: 0.3", "beasts", "No fire here, only a sword hoard."),
+    "storm": ("semantic_threshold: 0.5", None, "Rain from every cloud."),
+    "blade": ("keywords: [sword]\n  semantic_threshold: 0.3", None, "Swords are sharp."),
+}
+
+
+class _BagOfWords(Embeddings):
+    """Counts vocabulary words, so similarity is predictable without a model download."""
+
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+
+    def _vector(self, text: str) -> list[float]:
+        return [float(text.lower().count(word)) for word in _VOCABULARY]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        self.queries.append(text)
+        return self._vector(text)
+
+
+@pytest.fixture()
+def embeddings() -> _BagOfWords:
+    model = _BagOfWords()
+    register_embeddings("test-bag-of-words", model)
+    return model
+
+
+def _build(tmp_path: Path) -> Path:
+    (tmp_path / "entries").mkdir()
+    for entry_id, (trigger, group, content) in _ENTRIES.items():
+        advanced = f"advanced:\n  inclusion_group: {group}\n  group_scoring: true\n" if group else ""
+        (tmp_path / "entries" / f"{entry_id}.md").write_text(
+            f"---\ntriggers:\n  {trigger}\n{advanced}---\n\n{content}\n", encoding="utf-8"
+        )
+    output = tmp_path / "lorebook.json"
+    build_lorebook(source=tmp_path, output=output, tokenizer="whitespace", embedding_model="test-bag-of-words")
+    return output
+
+
+def test_entry_embeddings_are_stored_at_build(tmp_path: Path, embeddings: _BagOfWords) -> None:
+    data = json.loads(_build(tmp_path).read_text(encoding="utf-8"))
+    assert data["embedding_model"] == "test-bag-of-words"
+    stored = {entry["id"]: entry.get("embedding") for entry in data["entries"]}
+    assert set(stored) == set(_ENTRIES) and all(stored.values())
+    assert stored["dragon"] == pytest.approx([2**-0.5, 2**-0.5, 0.0, 0.0, 0.0])
+    assert embeddings.queries == []
+
+
+def test_similarity_triggers_entries_and_feeds_group_scoring(tmp_path: Path, embeddings: _BagOfWords) -> None:
+    engine = LoreBookRuntimeEngine(load_lorebook(_build(tmp_path)))
+    context = RuntimeContext(request_id="r", session_id="s", role="user", text="the dragon spat fire")
+    result = engine.run_pre_inject(context)
+
+    assert sorted(entry.id for entry in result.matched) == ["dragon", "wyrm"]
+    assert result.match_scores == pytest.approx({"dragon": 1.0, "wyrm": 0.5})
+    assert [entry.id for entry in engine.sort_expanded(result.expanded, context, [], result.match_scores)] == ["dragon"]
+
+    # A keyword hit adds to the similarity; the input is embedded once per text
+    context = RuntimeContext(request_id="r2", session_id="s", role="user", text="a fire sword")
+    result = engine.run_pre_inject(context)
+    assert result.match_scores == pytest.approx({"wyrm": 1.0, "blade": 1 + 2**-0.5})
+    LoreBookRuntimeEngine(engine.lorebook).run_pre_inject(context)
+    assert embeddings.queries == ["the dragon spat fire", "a fire sword"]
+
+
+def test_query_embedding_failure_skips_semantic_triggers(tmp_path: Path, embeddings: _BagOfWords) -> None:
+    engine = LoreBookRuntimeEngine(load_lorebook(_build(tmp_path)))
+
+    class _Failing(_BagOfWords):
+        def embed_query(self, text: str) -> list[float]:
+            raise RuntimeError("embedding service down")
+
+    register_embeddings("test-bag-of-words", _Failing())
+    context = RuntimeContext(request_id="r", session_id="s", role="user", text="the dragon spat fire sword")
+    result = engine.run_pre_inject(context)
+    # Keyword triggers still match; semantic ones are skipped for this turn only
+    assert [entry.id for entry in result.matched] == ["blade"]
+
+    register_embeddings("test-bag-of-words", embeddings)
+    assert "dragon" in [entry.id for entry in engine.run_pre_inject(context).matched]
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from zdt_agent.prompt_manager.runtime import session_state as session_state_module
+from zdt_agent.prompt_manager.runtime import state_store as state_store_module
+from zdt_agent.prompt_manager.runtime.session_state import LoreBookSessionState
+from zdt_agent.prompt_manager.runtime.state_store import LoreBookStateStore
+from zdt_agent.prompt_manager.types import (
+    EntryAdvanced,
+    EntryBudget,
+    EntryFilters,
+    EntryInjection,
+    EntryResolved,
+    EntryTriggers,
+    LoreBook,
+    LoreBookBudget,
+    LoreEntry,
+    RuntimeContext,
+)
+
+_ENTRY = LoreEntry(
+    id="python",
+    path="entries/python.md",
+    enabled=True,
+    content="Use uv.",
+    resolved=EntryResolved(
+        EntryTriggers(keywords=["python"]),
+        EntryFilters(),
+        EntryInjection(),
+        EntryAdvanced(sticky_turns=2, cooldown_turns=5),
+        EntryBudget(),
+    ),
+)
+_LOREBOOK = LoreBook(id="book", name="book", enabled=True, description="", budget=LoreBookBudget(), entries=[_ENTRY])
+
+
+def _context(session_id: str, turn_index: int) -> RuntimeContext:
+    return RuntimeContext(request_id="r", session_id=session_id, role="user", text="", turn_index=turn_index)
+
+
+def test_inactive_sessions_are_evicted(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [0.0]
+    monkeypatch.setattr(session_state_module.time, "monotonic", lambda: now[0])
+    state = LoreBookSessionState(_LOREBOOK, max_sessions=2, ttl_seconds=60)
+    for session_id in ("a", "b", "c"):
+        state.apply_after_injection(_ENTRY, _context(session_id, 0))
+    assert len(state) == 2
+    assert not state.is_sticky_active(_ENTRY, _context("a", 1))
+
+    now[0] = 120.0
+    assert state.is_sticky_active(_ENTRY, _context("c", 1))
+    assert len(state) == 1
+
+
+def test_timers_persist_across_engines_and_evictions(tmp_path: Path) -> None:
+    store = LoreBookStateStore(tmp_path / "state.sqlite3")
+    state = LoreBookSessionState(_LOREBOOK, store, max_sessions=1)
+    state.apply_after_injection(_ENTRY, _context("a", 0))
+    state.persist(_context("a", 0))
+    state.is_sticky_active(_ENTRY, _context("b", 0))  # evicts "a"
+    assert len(state) == 1
+    assert state.is_sticky_active(_ENTRY, _context("a", 2))
+    store.close()
+
+    reopened = LoreBookSessionState(_LOREBOOK, LoreBookStateStore(tmp_path / "state.sqlite3"))
+    assert reopened.is_sticky_active(_ENTRY, _context("a", 2))
+    assert not reopened.is_sticky_active(_ENTRY, _context("a", 3))
+    assert reopened.is_cooldown_active(_ENTRY, _context("a", 5))
+
+
+def test_each_turn_is_one_write_that_drops_expired_timers(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    store = LoreBookStateStore(tmp_path / "state.sqlite3")
+    writes: list[int] = []
+    real_save_turn = store.save_turn
+
+    def counting_save_turn(session_id: str, lorebook_id: str, turn_index: int, changes: list) -> None:
+        writes.append(len(changes))
+        real_save_turn(session_id, lorebook_id, turn_index, changes)
+
+    monkeypatch.setattr(store, "save_turn", counting_save_turn)
+    other = LoreEntry(id="rust", path="entries/rust.md", enabled=True, content="cargo", resolved=_ENTRY.resolved)
+    state = LoreBookSessionState(_LOREBOOK, store)
+    state.apply_after_injection(_ENTRY, _context("a", 0))
+    state.apply_after_injection(other, _context("a", 0))
+    assert writes == []
+    state.persist(_context("a", 0))
+    assert writes == [4]
+
+    # Turn 6: every timer (sticky until 2, cooldown until 5) has expired
+    state.apply_after_injection(other, _context("a", 6))
+    state.persist(_context("a", 6))
+    assert store.load("a", "book") == {"sticky": {"rust": 8}, "cooldown": {"rust": 11}}
+    assert state.sticky_timers(_context("a", 6)) == {"rust": 8}
+
+
+def test_sweep_removes_idle_sessions(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1_000_000.0]
+    monkeypatch.setattr(state_store_module.time, "time", lambda: now[0])
+    store = LoreBookStateStore(tmp_path / "state.sqlite3", ttl_seconds=60)
+    store.save_turn("old", "book", 0, [("python", "sticky", 3)])
+    now[0] += 30
+    store.save_turn("new", "book", 0, [("python", "sticky", 3)])
+    now[0] += 40
+    assert store.sweep() == 1
+    assert store.load("old", "book")["sticky"] == {}
+    assert store.load("new", "book")["sticky"] == {"python": 3}
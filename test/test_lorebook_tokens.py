@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from zdt_agent.prompt_manager import build_lorebook, load_lorebook
+from zdt_agent.prompt_manager.runtime import RuntimeContext
+from zdt_agent.prompt_manager.runtime.inject import LoreInjector
+from zdt_agent.prompt_manager.utils.tokenizer import WhitespaceTokenizer, get_tokenizer
+
+_ENTRY = """---
+triggers:
+  keywords: [python]
+budget:
+  max_tokens: 3
+  truncate: {truncate}
+---
+
+one two  three
+four five
+"""
+
+
+def _build(tmp_path: Path, truncate: str) -> Path:
+    source = tmp_path / truncate
+    (source / "entries").mkdir(parents=True)
+    (source / "entries" / "python.md").write_text(_ENTRY.format(truncate=truncate), encoding="utf-8")
+    build_lorebook(source=source, output=source / "lorebook.json", tokenizer="whitespace")
+    return source / "lorebook.json"
+
+
+@pytest.mark.parametrize(("truncate", "expected"), [("head", "one two  three"), ("tail", "three\nfour five")])
+def test_token_offsets_are_stored_and_used_for_truncation(tmp_path: Path, truncate: str, expected: str) -> None:
+    output = _build(tmp_path, truncate)
+    data = json.loads(output.read_text(encoding="utf-8"))
+    assert data["tokenizer"] == "whitespace"
+    assert data["entries"][0]["tokens"] == {"count": 5, "offsets": [0, 4, 9, 15, 20]}
+
+    entry = load_lorebook(output).entries[0]
+    context = RuntimeContext(request_id="r", session_id="s", role="user", text="python")
+    assert LoreInjector().prepare_entry_body(entry, context) == (expected, 3, True)
+
+
+def test_unknown_tokenizer_spec_is_rejected_and_unloadable_one_falls_back() -> None:
+    with pytest.raises(ValueError):
+        get_tokenizer("sentencepiece")
+    assert isinstance(get_tokenizer("tiktoken:no-such-encoding"), WhitespaceTokenizer)
+
+
+def test_default_tokenizer_does_not_import_litellm() -> None:
+    # In a fresh interpreter: importing LiteLLM starts its model-cost-map download thread
+    code = (
+        "import sys\n"
+        "from zdt_agent.prompt_manager.utils.tokenizer import DEFAULT_TOKENIZER, get_tokenizer\n"
+        "get_tokenizer(DEFAULT_TOKENIZER)\n"
+        "print(DEFAULT_TOKENIZER, 'litellm' in sys.modules)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.split() == ["tiktoken:cl100k_base", "False"]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import random
+import re
+
+from zdt_agent.prompt_manager.runtime import LoreBookRuntimeEngine, RuntimeContext
+from zdt_agent.prompt_manager.runtime.trigger_index import TriggerIndex
+from zdt_agent.prompt_manager.types import (
+    EntryAdvanced,
+    EntryBudget,
+    EntryFilters,
+    EntryInjection,
+    EntryResolved,
+    EntryTriggers,
+    LoreBook,
+    LoreBookBudget,
+    LoreEntry,
+)
+
+
+def _entry(
+    entry_id: str, triggers: EntryTriggers, content: str = "", advanced: EntryAdvanced | None = None
+) -> LoreEntry:
+    resolved = EntryResolved(triggers, EntryFilters(), EntryInjection(), advanced or EntryAdvanced(), EntryBudget())
+    return LoreEntry(id=entry_id, path=f"entries/{entry_id}.md", enabled=True, content=content, resolved=resolved)
+
+
+def _reference(triggers: EntryTriggers, text: str) -> tuple[int, str | None]:
+    """Per-keyword scan the index replaces."""
+    flags = 0 if triggers.case_sensitive else re.IGNORECASE
+    score, reason = 0, None
+    for keyword in triggers.keywords:
+        if triggers.whole_word:
+            hits = len(re.compile(rf"\b{re.escape(keyword)}\b", flags=flags).findall(text))
+        elif triggers.case_sensitive:
+            hits = text.count(keyword)
+        else:
+            hits = text.lower().count(keyword.lower())
+        if hits:
+            score += hits
+            reason = reason or "keyword_hit"
+    for pattern in triggers.regex:
+        hits = len(re.findall(pattern, text, flags=flags))
+        if hits:
+            score += hits
+            reason = reason or "regex_hit"
+    return score, reason
+
+
+def test_index_matches_per_keyword_scan() -> None:
+    rng = random.Random(7)
+    alphabet = "aAb _-.\n"
+    words = ["a", "aa", "Ab", "ab a", "b_", "-a", "a.b", "python", "Python3"]
+    entries = []
+    for n in range(60):
+        triggers = EntryTriggers(
+            keywords=rng.sample(words, rng.randint(0, 3)),
+            regex=[r"a+b"] if n % 7 == 0 else [],
+            case_sensitive=rng.random() < 0.5,
+            whole_word=rng.random() < 0.5,
+        )
+        entries.append(_entry(f"e{n}", triggers))
+    index = TriggerIndex(entries)
+    # The compiled-artifact form scans identically
+    restored = TriggerIndex.from_data(json.loads(json.dumps(index.to_data())))
+
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) + rng.choice(["", " Python3 python"])
+        scanned = index.scan(text)
+        assert restored.scan(text) == scanned
+        for entry in entries:
+            assert scanned.get(entry.id, (0, None)) == _reference(entry.resolved.triggers, text), (
+                entry.resolved.triggers,
+                text,
+            )
+
+
+def test_recursive_expansion_walks_the_trigger_graph() -> None:
+    entries = [
+        _entry("alpha", EntryTriggers(keywords=["alpha"]), "see beta", EntryAdvanced(recursive=True)),
+        _entry("beta", EntryTriggers(keywords=["beta"]), "then gamma, gamma", EntryAdvanced(recursive=True)),
+        _entry("gamma", EntryTriggers(keywords=["gamma"]), "leaf"),
+        _entry("shallow", EntryTriggers(keywords=["gamma"]), "", EntryAdvanced(max_recursion_depth=1)),
+        _entry("delayed", EntryTriggers(keywords=["beta"]), "", EntryAdvanced(delay_turns=5)),
+    ]
+    lorebook = LoreBook(id="book", name="book", enabled=True, description="", budget=LoreBookBudget(), entries=entries)
+
+    graph = TriggerIndex(entries).trigger_graph(entries)
+    assert {parent: [(e.id, score) for e, score, _ in edges] for parent, edges in graph.items()} == {
+        "alpha": [("beta", 1), ("delayed", 1)],
+        "beta": [("gamma", 2), ("shallow", 2)],
+    }
+
+    context = RuntimeContext(request_id="r", session_id="s", role="user", text="alpha", turn_index=1)
+    result = LoreBookRuntimeEngine(lorebook).run_pre_inject(context)
+    assert [entry.id for entry in result.expanded] == ["alpha", "beta", "gamma"]
+    assert result.match_scores == {"alpha": 1, "beta": 1, "gamma": 2}
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from zdt_agent.prompt_manager.preset import PresetPromptReader, PresetSegmentAssembler, PresetSegmentConfig
+
+_FILES = {
+    "core/role_play.md": "Play the role.",
+    "core/ai-ok2.md": "OK.",
+    "chars/main.md": "You are Main.",
+    "personas/me.md": "I am the user.",
+}
+
+
+def test_unchanged_prompt_files_are_not_reread(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    for relative_path, text in _FILES.items():
+        (tmp_path / relative_path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / relative_path).write_text(text, encoding="utf-8")
+    reads: list[str] = []
+    real_read_text = Path.read_text
+
+    def counting_read_text(self: Path, *args: object, **kwargs: object) -> str:
+        reads.append(self.relative_to(tmp_path).as_posix())
+        return real_read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", counting_read_text)
+    assembler = PresetSegmentAssembler(PresetSegmentConfig, PresetPromptReader(tmp_path))
+
+    def resolve() -> object:
+        return assembler.resolve_segments(None, "personas/me.md", {"persona": True})
+
+    first = resolve()
+    assert sorted(reads) == sorted(_FILES)
+    # LangGraph's add_messages sets ids in place; that must not leak into the next turn
+    first.segment_messages["core"][0].id = "turn-1"
+    again = resolve()
+    assert len(reads) == len(_FILES)
+    assert again.segment_messages["core"][0].id is None
+    assert again.segment_messages["core"][0].content == "Play the role."
+
+    (tmp_path / "chars/main.md").write_text("You are Main, revised.", encoding="utf-8")
+    reads.clear()
+    second = resolve()
+    assert reads == ["chars/main.md"]
+    assert second.segment_messages["character"][0].content == "You are Main, revised."